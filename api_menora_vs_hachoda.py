@@ -1,14 +1,16 @@
 #from playwright.sync_api import sync_playwright
 import logging
-import pyodbc
 import os
 from dotenv import load_dotenv
-from logging_utils import log_and_print
-from pymongo import MongoClient
+from mongo_client_factory import create_mongo_client
 from request_status_mapping import request_status_mapping,request_type_mapping  # Import the mapping
 from logging_utils import log_and_print, BOLD_YELLOW, BOLD_GREEN, BOLD_RED, normalize_hebrew, logger
-from pymongo.database import Database
 from task_module_manager import fetch_decisions_by_case_id, check_assignments_for_decisions
+from sql_connection_manager import get_sql_pool, close_all_sql_connections
+from sql_query_catalog import execute_query
+from report_output import emit_record
+from backend_recorder import install_backend_recorder
+from case_context import CaseContext
 import pandas as pd
 
 # Set up logging
@@ -87,7 +89,7 @@ def connect_to_mongodb():
     try:
         mongo_connection = os.getenv("MONGO_CONNECTION_STRING", "")
         log_and_print("Connecting to MongoDB...")
-        mongo_client = MongoClient(mongo_connection, minPoolSize=5)
+        mongo_client = create_mongo_client(mongo_connection)
         db = mongo_client["CaseManagement"]
         log_and_print("Connected to MongoDB successfully.")
         return mongo_client, db
@@ -96,21 +98,9 @@ def connect_to_mongodb():
         return None, None
 
 def connect_to_sql_server():
-    """Establish a connection to SQL Server."""
+    """Borrow a pooled connection to SQL Server (DB_SERVER / DB_NAME from .env)."""
     try:
-        server = os.getenv("DB_SERVER")
-        database = os.getenv("DB_NAME")
-        user = os.getenv("DB_USER")
-        password = os.getenv("DB_PASS")
-
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server};"
-            f"DATABASE={database};"
-            f"UID={user};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
+        connection = get_sql_pool().acquire()
         log_and_print("Connection to SQL Server established successfully.")
         return connection
     except Exception as e:
@@ -151,17 +141,8 @@ def connect_to_sql_server():
 def fetch_request_status_from_menora(cursor, case_id):
     request_status_id = 16
     """Retrieve request status for each appeal ID and print them."""
-    sql_query_2 = """
-      SELECT r.Description_Heb
-        FROM Menora_Conversion.dbo.Appeal a 
-        JOIN External_Courts.cnvrt.Case_Status_To_Case_Status_BO cn ON a.Appeal_Status = cn.Case_Status_BO
-        JOIN cases_bo.dbo.CT_Case_Status_Types c ON c.Case_Status_Type_Id = cn.Case_Status_Type_Id
-        JOIN cases_bo.dbo.CT_Request_Status_Types r ON r.Request_Status_Type_Id = c.Request_Status_Type_Id
-        WHERE cn.Court_Id = 11 AND a.Case_Id = ?
-    """
     try:
-        cursor.execute(sql_query_2, case_id)
-        menora_status_per_case = cursor.fetchall()
+        menora_status_per_case = execute_query(cursor, "menora.request_status_by_case", case_id)
         if menora_status_per_case:
             status_heb = menora_status_per_case[0][0]  # Assuming you're interested in the first description
             return status_heb
@@ -173,26 +154,23 @@ def fetch_request_status_from_menora(cursor, case_id):
         return None
 
 
-def parse_requests_by_case_id(case_id: str, db: Database) -> None:
+def parse_requests_by_case_id(case: CaseContext) -> None:
     """
-    Parse the Requests array for a given Case ID and display specified fields using log_and_print.
+    Parse the Requests array of the case and display specified fields using log_and_print.
 
     Args:
-        case_id (str): The Case ID to fetch data for.
-        db (Database): The MongoDB database connection.
+        case (CaseContext): The case to compare.
 
     Returns:
         None
     """
+    case_id = case.case_id
     try:
-        collection = db["Case"]
-        document = collection.find_one({"_id": case_id}, {"Requests": 1, "_id": 0})
-
-        if not document:
+        if not case.exists:
             log_and_print(f"No document found for Case ID {case_id}.", "info", BOLD_RED, is_hebrew=True)
             return
 
-        requests = document.get("Requests", [])
+        requests = case.requests
         if not isinstance(requests, list):
             log_and_print(f"Invalid 'Requests' field format for Case ID {case_id}.", "info", is_hebrew=True)
             return
@@ -267,12 +245,16 @@ def main():
 
     cursor = connection.cursor()
 
+    # One round trip reads the Requests and Decisions of every case, for the status and the decisions
+    cases = CaseContext.load_many(cases_list, db, sections=("Requests", "Decisions"))
+
     for case_id in cases_list:
+        case = cases[case_id]
 
         ######################  סטטוס מוביל #########################
 
         # Fetch Hachoda status from MongoDB
-        main_hachoda_Status = parse_requests_by_case_id(case_id, db)
+        main_hachoda_Status = parse_requests_by_case_id(case)
 
         # Check if main_hachoda_Status is valid before proceeding
         if main_hachoda_Status is None or len(main_hachoda_Status) < 2:
@@ -301,11 +283,14 @@ def main():
             })
 
             log_and_print(f"בתיק {case_id} ==> מצב תיק באחודה={main_hachoda_Status[1]} , מצב תיק במנורה={main_menora_heb}", is_hebrew=True)
+
+        emit_record("menora_comparison", case_id=case_id, hachoda_status=main_hachoda_Status[1],
+                    menora_status=main_menora_heb, is_match=main_hachoda_Status[1] == main_menora_heb)
         
         
         log_and_print(f"\n##########-- מטלות בתיק  --##########", is_hebrew=True)
         
-        decisions_list = fetch_decisions_by_case_id(case_id, db)
+        decisions_list = fetch_decisions_by_case_id(case)
         # Call the function with required arguments
         check_assignments_for_decisions(decisions_list, server_name, database_name, user_name, password)
         #log_and_print(f"מספר החלטות בתיק הוא :{results}",is_hebrew=True)
@@ -332,8 +317,10 @@ def main():
 
     # Close connections
     cursor.close()
-    connection.close()
+    get_sql_pool().release(connection)
+    close_all_sql_connections()
     mongo_client.close()
 
 if __name__ == "__main__":
+    install_backend_recorder()
     main()
@@ -0,0 +1,191 @@
+import contextvars
+import os
+import threading
+import time
+import bson
+from pymongo import monitoring
+from logging_utils import log_and_print, BOLD_YELLOW, BOLD_RED
+
+# Print a round trips / rows / bytes / latency table per backend after each menu action
+BACKEND_METRICS = os.getenv("BACKEND_METRICS", "0") == "1"
+
+# Prometheus textfile (node_exporter textfile collector) rewritten after each action with the cumulative counters
+BACKEND_METRICS_TEXTFILE = os.getenv("BACKEND_METRICS_TEXTFILE", "")
+
+# The listeners and hooks are only installed when one of the outputs is on
+BACKEND_METRICS_ENABLED = BACKEND_METRICS or bool(BACKEND_METRICS_TEXTFILE)
+
+BACKENDS = ("mongo", "sql", "http")
+
+
+class ActionMetrics:
+    """Round trips, rows / documents, bytes and seconds per backend of one menu action."""
+
+    def __init__(self, action):
+        self.action = action
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.backends = {}  # backend -> [calls, rows, bytes, seconds]
+        self._lock = threading.Lock()
+
+    def record(self, backend, rows, nbytes, seconds):
+        with self._lock:
+            entry = self.backends.setdefault(backend, [0, 0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += rows
+            entry[2] += nbytes
+            entry[3] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {backend: tuple(entry) for backend, entry in self.backends.items()}
+
+
+# The action being measured; asyncio.to_thread copies it into the diagnosis worker threads
+_current_action = contextvars.ContextVar("_current_action", default=None)
+
+_totals_lock = threading.Lock()
+_backend_totals = {}  # (action, backend) -> [calls, rows, bytes, seconds]
+_action_totals = {}   # action -> [runs, seconds]
+
+
+def record_backend_call(backend, rows=0, nbytes=0, seconds=0.0):
+    """Add one round trip to the current action (no-op outside begin_action / end_action)."""
+    action = _current_action.get()
+    if action is not None:
+        action.record(backend, rows, nbytes, seconds)
+
+
+def measuring():
+    """True while an action is being measured in this context."""
+    return _current_action.get() is not None
+
+
+def begin_action(action):
+    """Start measuring a menu action; every Mongo command, catalog query and HTTP call until end_action() is counted."""
+    if BACKEND_METRICS_ENABLED:
+        _current_action.set(ActionMetrics(action))
+
+
+def end_action():
+    """Stop measuring the current action, print its summary and update the Prometheus textfile."""
+    action = _current_action.get()
+    if action is None:
+        return
+    _current_action.set(None)
+    action.seconds = time.perf_counter() - action.started
+    stats = action.snapshot()
+
+    with _totals_lock:
+        runs = _action_totals.setdefault(action.action, [0, 0.0])
+        runs[0] += 1
+        runs[1] += action.seconds
+        for backend, values in stats.items():
+            entry = _backend_totals.setdefault((action.action, backend), [0, 0, 0, 0.0])
+            for index, value in enumerate(values):
+                entry[index] += value
+
+    if BACKEND_METRICS:
+        print_action_summary(action.action, action.seconds, stats)
+    if BACKEND_METRICS_TEXTFILE:
+        write_prometheus_textfile(BACKEND_METRICS_TEXTFILE)
+
+
+def print_action_summary(action, seconds, stats):
+    """Print (and log) the per-backend table of one action."""
+    log_and_print(f"\n##### backend metrics: {action} ({seconds:.2f} s) #####", "info", BOLD_YELLOW)
+    log_and_print(f"{'backend':<10}{'calls':>8}{'rows':>10}{'KB':>12}{'total ms':>12}{'avg ms':>10}")
+    for backend in BACKENDS:
+        if backend in stats:
+            calls, rows, nbytes, backend_seconds = stats[backend]
+            log_and_print(f"{backend:<10}{calls:>8}{rows:>10}{nbytes / 1024:>12.1f}{backend_seconds * 1000:>12.1f}{backend_seconds * 1000 / calls:>10.1f}")
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def write_prometheus_textfile(path):
+    """Write the cumulative counters in the Prometheus text format (atomically, as node_exporter expects)."""
+    with _totals_lock:
+        backend_totals = {key: tuple(entry) for key, entry in _backend_totals.items()}
+        action_totals = {key: tuple(entry) for key, entry in _action_totals.items()}
+
+    lines = []
+    for index, (metric, help_text) in enumerate((
+            ("case_tool_backend_calls_total", "Backend round trips per menu action."),
+            ("case_tool_backend_rows_total", "Rows / documents returned per menu action."),
+            ("case_tool_backend_bytes_total", "Response bytes per menu action."),
+            ("case_tool_backend_seconds_total", "Time spent waiting on the backend per menu action."))):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for (action, backend), values in sorted(backend_totals.items()):
+            lines.append(f'{metric}{{action="{_label(action)}",backend="{backend}"}} {values[index]}')
+    for index, (metric, help_text) in enumerate((
+            ("case_tool_action_runs_total", "Menu actions run."),
+            ("case_tool_action_seconds_total", "Wall time of the menu actions."))):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for action, values in sorted(action_totals.items()):
+            lines.append(f'{metric}{{action="{_label(action)}"}} {values[index]}')
+
+    try:
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as output:
+            output.write("\n".join(lines) + "\n")
+        os.replace(temporary_path, path)
+    except OSError as e:
+        log_and_print(f"Error writing metrics file {path}: {e}", "error", BOLD_RED)
+
+
+############################# backends #########################
+
+def _value_bytes(value):
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    return 8  # numbers, dates, uniqueidentifiers: close enough for a size estimate
+
+
+def record_sql_call(rows, seconds):
+    """Catalog query hook: one execute + fetchall; bytes are estimated from the fetched values."""
+    if measuring():
+        nbytes = sum(_value_bytes(value) for row in rows for value in row)
+        record_backend_call("sql", len(rows), nbytes, seconds)
+
+
+def record_http_response(response, *args, **kwargs):
+    """requests response hook: status line to headers latency, body size and JSON array length."""
+    if not measuring():
+        return
+    rows = 0
+    if response.headers.get("Content-Type", "").startswith("application/json"):
+        try:
+            body = response.json()
+            rows = len(body) if isinstance(body, list) else 1
+        except ValueError:
+            pass
+    record_backend_call("http", rows, len(response.content), response.elapsed.total_seconds())
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Counts every command sent by the client as one round trip of the current action."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if not measuring():
+            return
+        reply = event.reply
+        cursor = reply.get("cursor")
+        if isinstance(cursor, dict):
+            rows = len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+        else:
+            rows = reply.get("n", 0) if isinstance(reply.get("n"), int) else 0
+        record_backend_call("mongo", rows, len(bson.encode(reply)), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        record_backend_call("mongo", 0, 0, event.duration_micros / 1e6)
+
+
+mongo_command_listener = MongoCommandListener()
@@ -0,0 +1,381 @@
+import atexit
+import collections
+import gzip
+import io
+import os
+import pickle
+import threading
+import time
+from datetime import datetime, timedelta
+import pyodbc
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+from pymongo import MongoClient
+from logging_utils import log_and_print, logger, BOLD_YELLOW, BOLD_RED
+from http_client import http_session
+from mongo_client_factory import set_mongo_client_factory
+from sql_connection_manager import set_connection_factory
+
+# Record / replay of the backend responses: "" (off), "record" or "replay"
+BACKEND_RECORD_MODE = os.getenv("BACKEND_RECORD_MODE", "").strip().lower()
+
+# Fixture file written by record mode and read by replay mode (gzip compressed pickle)
+BACKEND_FIXTURE = os.getenv("BACKEND_FIXTURE", "backend_fixture.pkl.gz")
+
+# Replay latency: "original" waits as long as the recorded call took, "zero" answers at once
+BACKEND_REPLAY_LATENCY = os.getenv("BACKEND_REPLAY_LATENCY", "zero").strip().lower()
+
+FIXTURE_VERSION = 1
+
+# Cursor calls that only change how results are fetched, not which results (left out of the keys)
+_TRANSPORT_CURSOR_CALLS = ("batch_size", "max_time_ms")
+
+
+class FixtureMiss(LookupError):
+    """Replay mode got a call the fixture has no recorded response for."""
+
+
+class RecordedCall:
+    """The response of one backend call: its result or exception and how long it took."""
+
+    def __init__(self, result=None, error=None, seconds=0.0):
+        self.result = result
+        self.error = error
+        self.seconds = seconds
+
+
+class BackendFixture:
+    """
+    Recorded responses by call key. A key can be called several times (retries, the NTLM
+    handshake, the same query in two menu actions): responses are replayed in the recorded
+    order and the last one is repeated when the replay asks for more.
+    """
+
+    def __init__(self, path=BACKEND_FIXTURE):
+        self.path = path
+        self.calls = {}      # key text -> [RecordedCall]
+        self._replayed = {}  # key text -> responses already served
+        self._lock = threading.Lock()
+
+    def add(self, key, recorded):
+        with self._lock:
+            self.calls.setdefault(key, []).append(recorded)
+
+    def next(self, key):
+        with self._lock:
+            responses = self.calls.get(key)
+            if not responses:
+                raise FixtureMiss(f"No recorded response in {self.path} for {key:.300}")
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+            recorded = responses[min(index, len(responses) - 1)]
+        if BACKEND_REPLAY_LATENCY == "original":
+            time.sleep(recorded.seconds)
+        return recorded
+
+    def save(self):
+        with self._lock:
+            calls = dict(self.calls)
+        try:
+            with gzip.open(self.path, "wb") as output:
+                pickle.dump({"version": FIXTURE_VERSION, "recorded_at": datetime.now(), "calls": calls},
+                            output, protocol=pickle.HIGHEST_PROTOCOL)
+            log_and_print(f"Recorded {sum(len(responses) for responses in calls.values())} backend calls to {self.path}.",
+                          "info", BOLD_YELLOW)
+        except (OSError, pickle.PicklingError) as e:
+            log_and_print(f"Error writing backend fixture {self.path}: {e}", "error", BOLD_RED)
+
+    def load(self):
+        with gzip.open(self.path, "rb") as fixture_file:
+            content = pickle.load(fixture_file)
+        if content.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"{self.path} is a version {content.get('version')} fixture, expected {FIXTURE_VERSION}.")
+        self.calls = content["calls"]
+        log_and_print(f"Replaying {len(self.calls)} recorded backend calls from {self.path} "
+                      f"(recorded {content['recorded_at']:%d/%m/%Y %H:%M}, latency {BACKEND_REPLAY_LATENCY}).",
+                      "info", BOLD_YELLOW)
+
+
+fixture = BackendFixture()
+
+
+def _recordable_error(error):
+    """The exception itself when it can be pickled (pyodbc / pymongo errors), else its text."""
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _record(key, call):
+    """Record mode: run `call`, store its result (or exception) and duration under `key`."""
+    start = time.perf_counter()
+    try:
+        result = call()
+    except Exception as e:
+        fixture.add(key, RecordedCall(error=_recordable_error(e), seconds=time.perf_counter() - start))
+        raise
+    fixture.add(key, RecordedCall(result=result, seconds=time.perf_counter() - start))
+    return result
+
+
+def _replay(key):
+    recorded = fixture.next(key)
+    if recorded.error is not None:
+        raise recorded.error
+    return recorded.result
+
+
+def _backend_call(key, call):
+    key = repr(key)  # queries are dicts: the key is their text, in the order the code builds them
+    return _replay(key) if BACKEND_RECORD_MODE == "replay" else _record(key, call)
+
+
+############################# MongoDB #########################
+
+class _RecordedCursor:
+    """
+    Stands in for a pymongo Cursor: sort / limit / skip... calls are collected and the query
+    runs (or is replayed) as a whole when the cursor is first iterated.
+    """
+
+    def __init__(self, collection, args, kwargs):
+        self._collection = collection
+        self._args = args
+        self._kwargs = kwargs
+        self._chain = []
+        self._documents = None
+
+    def __getattr__(self, name):
+        def chained(*args, **kwargs):
+            self._chain.append((name, args, kwargs))
+            return self
+        return chained
+
+    def _key(self):
+        chain = tuple((name, args, tuple(kwargs.items())) for name, args, kwargs in self._chain
+                      if name not in _TRANSPORT_CURSOR_CALLS)
+        return self._collection._key("find", self._args, self._kwargs) + (chain,)
+
+    def _run(self):
+        cursor = self._collection._real.find(*self._args, **self._kwargs)
+        for name, args, kwargs in self._chain:
+            cursor = getattr(cursor, name)(*args, **kwargs)
+        return list(cursor)
+
+    def __iter__(self):
+        if self._documents is None:
+            self._documents = _backend_call(self._key(), self._run)
+        return iter(self._documents)
+
+    def close(self):
+        pass
+
+
+class _RecordedCollection:
+    def __init__(self, database, name):
+        self._database = database
+        self._name = name
+        self._real = None if database._real is None else database._real[name]
+
+    def _key(self, method, args, kwargs):
+        return ("mongo", self._database._name, self._name, method, args, tuple(kwargs.items()))
+
+    def find(self, *args, **kwargs):
+        return _RecordedCursor(self, args, kwargs)
+
+    def aggregate(self, *args, **kwargs):
+        return iter(_backend_call(self._key("aggregate", args, kwargs),
+                                  lambda: list(self._real.aggregate(*args, **kwargs))))
+
+    def __getattr__(self, method):
+        # find_one, count_documents, distinct...: the result is recorded as returned
+        def call(*args, **kwargs):
+            return _backend_call(self._key(method, args, kwargs), lambda: getattr(self._real, method)(*args, **kwargs))
+        return call
+
+
+class _RecordedDatabase:
+    def __init__(self, client, name):
+        self._name = name
+        self._real = None if client._real is None else client._real[name]
+
+    def __getitem__(self, name):
+        return _RecordedCollection(self, name)
+
+    def get_collection(self, name, **options):
+        return _RecordedCollection(self, name)
+
+    def command(self, *args, **kwargs):
+        return _backend_call(("mongo", self._name, None, "command", args, tuple(kwargs.items())),
+                             lambda: self._real.command(*args, **kwargs))
+
+
+class RecordingMongoClient:
+    """The MongoClient of record / replay mode; in replay mode no server is contacted."""
+
+    def __init__(self, mongo_connection, **options):
+        self._real = MongoClient(mongo_connection, **options) if BACKEND_RECORD_MODE == "record" else None
+
+    def __getitem__(self, name):
+        return _RecordedDatabase(self, name)
+
+    def get_database(self, name, **options):
+        return _RecordedDatabase(self, name)
+
+    def close(self):
+        if self._real is not None:
+            self._real.close()
+
+
+############################# SQL Server #########################
+
+_row_types = {}
+
+
+def _row_type(columns):
+    """pyodbc rows are tuples whose columns are also attributes (row.Start_Time)."""
+    row_type = _row_types.get(columns)
+    if row_type is None:
+        row_type = _row_types[columns] = collections.namedtuple("Row", columns, rename=True)
+    return row_type
+
+
+class RecordingCursor:
+    """
+    pyodbc cursor of record / replay mode. execute() reads every result set at once, so the
+    recorded response is (description, rows, messages) per result set.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._real = None if connection._real is None else connection._real.cursor()
+        self._result_sets = []
+        self._rows = []
+        self.description = None
+        self.messages = []
+
+    def _run(self, sql, params):
+        self._real.execute(sql, *params)
+        result_sets = []
+        while True:
+            description = tuple(tuple(column) for column in self._real.description) if self._real.description else None
+            rows = [tuple(row) for row in self._real.fetchall()] if description else []
+            result_sets.append((description, rows, list(getattr(self._real, "messages", None) or [])))
+            if not self._real.nextset():
+                return result_sets
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = tuple(params[0])
+        self._result_sets = list(_backend_call(("sql", sql, params), lambda: self._run(sql, params)))
+        self.nextset()
+        return self
+
+    def nextset(self):
+        if not self._result_sets:
+            return False
+        description, rows, self.messages = self._result_sets.pop(0)
+        self.description = description
+        row_type = _row_type(tuple(column[0] for column in description or ()))
+        self._rows = [row_type(*row) for row in rows]
+        return True
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self):
+        if self._real is not None:
+            self._real.close()
+
+
+class RecordingConnection:
+    """pyodbc connection of record / replay mode; in replay mode no server is contacted."""
+
+    def __init__(self, connection_string):
+        self._real = pyodbc.connect(connection_string) if BACKEND_RECORD_MODE == "record" else None
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def commit(self):
+        if self._real is not None:
+            self._real.commit()
+
+    def rollback(self):
+        if self._real is not None:
+            self._real.rollback()
+
+    def close(self):
+        if self._real is not None:
+            self._real.close()
+
+
+############################# HTTP #########################
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Transport adapter of http_session (Task API, NTLM calls). The response hooks, including the
+    NTLM handshake of requests_ntlm, still run on the replayed responses.
+    """
+
+    def _key(self, request):
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        return ("http", request.method, request.url, body)
+
+    def _run(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        return {"status_code": response.status_code, "headers": dict(response.headers), "content": response.content,
+                "url": response.url, "reason": response.reason, "elapsed": response.elapsed.total_seconds()}
+
+    def send(self, request, **kwargs):
+        recorded = _backend_call(self._key(request), lambda: self._run(request, **kwargs))
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.headers.update(recorded["headers"])
+        response._content = recorded["content"]
+        # requests_ntlm releases the connection of the 401 before answering the challenge
+        response.raw = HTTPResponse(body=io.BytesIO(recorded["content"]), headers=recorded["headers"],
+                                    status=recorded["status_code"], preload_content=False)
+        response.url = recorded["url"]
+        response.reason = recorded["reason"]
+        response.elapsed = timedelta(seconds=recorded["elapsed"])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = request
+        response.connection = self
+        return response
+
+
+############################# install #########################
+
+def install_backend_recorder():
+    """
+    Route the Mongo clients, SQL connections and http_session calls through the recorder when
+    BACKEND_RECORD_MODE is "record" or "replay". Call before the first backend call.
+
+    Example:
+        BACKEND_RECORD_MODE=record BACKEND_FIXTURE=case_1018.pkl.gz python case_management_app.py
+        BACKEND_RECORD_MODE=replay BACKEND_FIXTURE=case_1018.pkl.gz python case_management_app.py
+    """
+    if BACKEND_RECORD_MODE not in ("record", "replay"):
+        if BACKEND_RECORD_MODE:
+            log_and_print(f"Unknown BACKEND_RECORD_MODE {BACKEND_RECORD_MODE}, expected record or replay.", "warning", BOLD_RED)
+        return
+
+    if BACKEND_RECORD_MODE == "replay":
+        fixture.load()
+    else:
+        atexit.register(fixture.save)
+
+    set_connection_factory(RecordingConnection)
+    set_mongo_client_factory(RecordingMongoClient)
+    adapter = RecordingAdapter()
+    http_session.mount("http://", adapter)
+    http_session.mount("https://", adapter)
+    logger.info(f"Backend recorder installed: {BACKEND_RECORD_MODE} {BACKEND_FIXTURE}")
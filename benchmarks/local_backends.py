@@ -0,0 +1,302 @@
+"""
+Local stand-ins for the backends of the tool, installed through the factory hooks of
+sql_connection_manager and mongo_client_factory:
+
+- SQL Server: one SQLite file holding the BPM / Responses / Discussions / CaseManagement_BO /
+  Menora tables the catalog queries read. Three-part names become "<db>__<schema>__<table>"
+  and the few T-SQL constructs the catalog uses are rewritten (TOP (n), COUNT_BIG, CHECKSUM_AGG).
+- MongoDB: mongomock in memory, or a local mongod (localhost only, its CaseManagement database
+  is replaced).
+- Task API: a stub HTTP server on 127.0.0.1 answering API_URL with the generated tasks.
+"""
+import collections
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from mongo_client_factory import set_mongo_client_factory
+from sql_connection_manager import set_connection_factory
+from lookup_snapshot import lookup_snapshot
+
+# Tables of the SQLite emulation; columns in the order the catalog and the generator use them
+SQL_SCHEMA = {
+    "BPM__dbo__Processes": "ProcessID TEXT PRIMARY KEY, ProcessTypeID INTEGER, LdapLeafID INTEGER",
+    "BPM__dbo__ProcessSteps": "ProcessStepID INTEGER PRIMARY KEY, ProcessID TEXT, ProcessTypeActivityID INTEGER, "
+                              "ProcessTypeGatewayID INTEGER, DateForBPETreatment TIMESTAMP",
+    "BPM__dbo__ProcessTypeActivities": "ProcessTypeActivityID INTEGER PRIMARY KEY, ProcessTypeID INTEGER, ActivityTypeID INTEGER",
+    "BPM__dbo__ProcessStepStatuses": "ProcessStepStatusID INTEGER PRIMARY KEY, ProcessStepID INTEGER, StatusTypeID INTEGER",
+    "BPM__dbo__StatusTypes": "StatusTypeID INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "BPM__dbo__ActivityTypes": "ActivityTypeID INTEGER PRIMARY KEY, ActivityTypeName TEXT",
+    "BPM__dbo__ProcessTypes": "ProcessTypeID INTEGER PRIMARY KEY, ProcessTypeName TEXT",
+    "Responses__dbo__Assignments": "Assignment_Id INTEGER PRIMARY KEY, Case_Id INTEGER, Request_Id INTEGER, Decision_Id INTEGER, "
+                                   "Decision_Moj_Id TEXT, Assignment_Type_Id INTEGER, Due_Date TIMESTAMP, Assignment_Status_Id INTEGER, "
+                                   "Is_Active INTEGER, Site_Action_Id INTEGER, Process_Step_Id INTEGER, Process_Id TEXT",
+    "Responses__dbo__CT_Assignment_Types": "Assignment_Type_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "Responses__dbo__CT_Assignment_Status_Types": "Assignment_Status_Type_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "Discussions__dbo__Discussions": "Discussion_Id INTEGER PRIMARY KEY, Start_Time TIMESTAMP, Discussion_Type_Id INTEGER, Discussion_Status_Id INTEGER",
+    "Discussions__dbo__Request_To_Discussions": "Discussion_Id INTEGER, Case_Id INTEGER, Request_Id INTEGER",
+    "Discussions__code__CT_Discussion_Types": "Discussion_Type_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "Discussions__code__CT_Discussion_Statuses": "Discussion_Status_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "CaseManagement_BO__dbo__BO_Actions": "BO_Actions_Id INTEGER PRIMARY KEY, Bo_Action_Type_Id INTEGER, Action_Description TEXT, "
+                                          "Case_ID INTEGER, Request_Id INTEGER, Action_Create_User TEXT, Involved_Category_Type_Id INTEGER, "
+                                          "Action_Time TIMESTAMP, Entity_Type_Id INTEGER, Entity_value TEXT, Source_Description TEXT, "
+                                          "Source_Entity_Type_Id INTEGER, Source_Entity_Value TEXT, Source_Create_Date TIMESTAMP",
+    "CaseManagement_BO__dbo__CT_Document_Types": "Document_Type_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "CaseManagement_BO__dbo__CT_Decision_Types": "Decision_Type_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "CaseManagement_BO__dbo__lt_decision_type_to_court": "Decision_Type_To_Court_ID INTEGER, Decision_Type_Id INTEGER, "
+                                                         "Description_Heb TEXT, Court_Id INTEGER",
+    "CaseManagement_BO__dbo__CT_BO_Action_Types": "BO_Action_Type_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+    "CaseManagement_BO__doc__Entity": "EntityID INTEGER PRIMARY KEY, EntityName TEXT",
+    "Menora_Conversion__dbo__Appeal": "Case_Id INTEGER, Appeal_Status INTEGER",
+    "External_Courts__cnvrt__Case_Status_To_Case_Status_BO": "Case_Status_BO INTEGER, Case_Status_Type_Id INTEGER, Court_Id INTEGER",
+    "cases_bo__dbo__CT_Case_Status_Types": "Case_Status_Type_Id INTEGER PRIMARY KEY, Request_Status_Type_Id INTEGER",
+    "cases_bo__dbo__CT_Request_Status_Types": "Request_Status_Type_Id INTEGER PRIMARY KEY, Description_Heb TEXT",
+}
+
+# Indexes matching the production access paths, so the emulation seeks where SQL Server seeks
+SQL_INDEXES = (
+    "CREATE INDEX ix_steps_process ON BPM__dbo__ProcessSteps (ProcessID, ProcessStepID)",
+    "CREATE INDEX ix_statuses_step ON BPM__dbo__ProcessStepStatuses (ProcessStepID, ProcessStepStatusID)",
+    "CREATE INDEX ix_assignments_case ON Responses__dbo__Assignments (Case_Id)",
+    "CREATE INDEX ix_assignments_decision ON Responses__dbo__Assignments (Decision_Id, Assignment_Type_Id)",
+    "CREATE INDEX ix_assignments_process ON Responses__dbo__Assignments (Process_Id)",
+    "CREATE INDEX ix_request_discussions_case ON Discussions__dbo__Request_To_Discussions (Case_Id)",
+    "CREATE INDEX ix_bo_actions_case ON CaseManagement_BO__dbo__BO_Actions (Case_ID)",
+    "CREATE INDEX ix_appeal_case ON Menora_Conversion__dbo__Appeal (Case_Id)",
+)
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+_THREE_PART_NAME = re.compile(r"(?:\[(\w+)\]|\b(\w+))\.(?:\[(\w*)\]|(\w*))\.(?:\[(\w+)\]|(\w+)\b)")
+_TOP = re.compile(r"\bTOP\s*\(\s*\d+\s*\)", re.IGNORECASE)
+_CHECKSUM = re.compile(r"CHECKSUM_AGG\s*\(\s*BINARY_CHECKSUM\s*\(\s*\*\s*\)\s*\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def translate_tsql(sql):
+    """Rewrite a catalog statement for SQLite; raises NotImplementedError for constructs it cannot emulate."""
+    if re.search(r"\bCROSS\s+APPLY\b|\bTOP\s*\(\s*\?", sql, re.IGNORECASE):
+        raise NotImplementedError("CROSS APPLY / TOP (?) statements (stuck step scanner) are not emulated.")
+    sql = _CHECKSUM.sub("COUNT(*)", sql)
+    sql = re.sub(r"\bCOUNT_BIG\s*\(", "COUNT(", sql, flags=re.IGNORECASE)
+    sql = _TOP.sub("", sql)
+
+    def table(match):
+        database = match.group(1) or match.group(2)
+        schema = match.group(3) or match.group(4) or "dbo"
+        name = match.group(5) or match.group(6)
+        return f"[{database}__{schema}__{name}]"
+
+    return _THREE_PART_NAME.sub(table, sql)
+
+
+@lru_cache(maxsize=256)
+def _row_type(columns):
+    """pyodbc rows are tuples whose columns are also attributes (row.Start_Time)."""
+    return collections.namedtuple("Row", columns, rename=True)
+
+
+class EmulatedCursor:
+    """The part of the pyodbc cursor interface the tool uses."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.sqlite.cursor()
+        self.description = None
+        self.messages = []
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = tuple(params[0])  # pyodbc accepts both execute(sql, a, b) and execute(sql, (a, b))
+        self._cursor.execute(translate_tsql(sql), params)
+        self.description = self._cursor.description
+        return self
+
+    def _rows(self, rows):
+        row_type = _row_type(tuple(column[0] for column in self.description or ()))
+        return [row_type(*row) for row in rows]
+
+    def fetchall(self):
+        return self._rows(self._cursor.fetchall())
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._rows([row])[0]
+
+    def nextset(self):
+        return False
+
+    def close(self):
+        self._cursor.close()
+
+
+class EmulatedConnection:
+    """A pyodbc-like connection to the SQLite emulation (the connection string is ignored)."""
+
+    def __init__(self, path):
+        self.sqlite = sqlite3.connect(path, timeout=30, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+
+    def cursor(self):
+        return EmulatedCursor(self)
+
+    def commit(self):
+        self.sqlite.commit()
+
+    def rollback(self):
+        self.sqlite.rollback()
+
+    def close(self):
+        self.sqlite.close()
+
+
+def create_sql_emulation(path, data):
+    """Create the SQLite file with the schema, the generated rows and the indexes."""
+    if os.path.exists(path):
+        os.remove(path)
+    db = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        with db:
+            for table, columns in SQL_SCHEMA.items():
+                db.execute(f"CREATE TABLE [{table}] ({columns})")
+            for table, rows in data.sql.items():
+                placeholders = ", ".join("?" for _ in rows[0])
+                db.executemany(f"INSERT INTO [{table}] VALUES ({placeholders})", rows)
+            for statement in SQL_INDEXES:
+                db.execute(statement)
+        db.execute("ANALYZE")
+    finally:
+        db.close()
+
+
+############################# MongoDB #########################
+
+def create_mongo_emulation(data, mongo_uri=None):
+    """
+    Load the generated documents and return the client every create_mongo_client() call gets.
+    Without `mongo_uri` the data lives in mongomock; a local mongod must be on localhost.
+    """
+    if mongo_uri:
+        import pymongo
+        host = urlparse(mongo_uri).hostname
+        if host not in ("localhost", "127.0.0.1", "::1"):
+            raise ValueError(f"Benchmarks replace the CaseManagement database, refusing non-local host {host}.")
+        client = pymongo.MongoClient(mongo_uri)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+
+    db = client["CaseManagement"]
+    for collection_name, documents in data.mongo.items():
+        db.drop_collection(collection_name)
+        if documents:
+            db[collection_name].insert_many(documents)
+    db["Case"].create_index("CaseDisplayId")
+    db["Case"].create_index("Requests.RequestId")
+    db["Case"].create_index("Requests.SiteActionId")
+    db["Document"].create_index([("Entities.EntityTypeId", 1), ("Entities.EntityValue", 1)])
+    return client
+
+
+class _SharedMongoClient:
+    """Hands the emulation client to the tool; close() is ignored so it survives between actions."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getitem__(self, name):
+        return self._client[name]
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def close(self):
+        pass
+
+
+############################# Task API #########################
+
+class _TaskApiHandler(BaseHTTPRequestHandler):
+    tasks = {}
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        case_id = int(query.get("CaseId", ["0"])[0])
+        body = json.dumps(self.tasks.get(case_id, []), ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_task_api(tasks):
+    """Start the stub Task API in a daemon thread; returns (server, API_URL)."""
+    handler = type("TaskApiHandler", (_TaskApiHandler,), {"tasks": tasks})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/Tasks"
+
+
+############################# install #########################
+
+class LocalBackends:
+    """
+    Load `data` into the stand-ins and point the tool at them; close() restores the real factories.
+
+    Example:
+        backends = LocalBackends(generate_cases(CaseProfile(), case_count=5, court_id=1), court_id=1)
+        db = backends.db
+        ...
+        backends.close()
+    """
+
+    def __init__(self, data, court_id=0, node_id=0, mongo_uri=None, work_dir=None):
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="case_tool_bench_")
+        self.sql_path = os.path.join(self.work_dir, "sql_emulation.sqlite")
+        create_sql_emulation(self.sql_path, data)
+        set_connection_factory(lambda connection_string: EmulatedConnection(self.sql_path))
+
+        self.mongo_client = create_mongo_emulation(data, mongo_uri)
+        shared_client = _SharedMongoClient(self.mongo_client)
+        set_mongo_client_factory(lambda mongo_connection, **options: shared_client)
+        self.db = shared_client["CaseManagement"]
+
+        self.task_api, self.api_url = start_task_api(data.tasks)
+        self.environment = {
+            "API_URL": self.api_url,
+            "COURT_ID": str(court_id),
+            "NODEID": str(node_id),
+            "BEARER_TOKEN": "benchmark",
+            # Only checked for presence, the factories ignore them
+            "MONGO_CONNECTION_STRING": "mongodb://local-emulation",
+            "DB_SERVER": "local-emulation",
+            "DB_NAME": "local-emulation",
+            "DB_USER": "benchmark",
+            "DB_PASS": "benchmark",
+        }
+        self.apply_environment()
+
+        # Lookup snapshot of the emulation, never the shared one of the real servers
+        lookup_snapshot.path = os.path.join(self.work_dir, "lookup_snapshot.sqlite")
+        lookup_snapshot.refresh()
+
+    def apply_environment(self):
+        """Set the environment the stand-ins need (again, after a module reloaded .env with override)."""
+        os.environ.update(self.environment)
+
+    def close(self):
+        self.task_api.shutdown()
+        set_connection_factory(None)
+        set_mongo_client_factory(None)
+        self.mongo_client.close()
@@ -0,0 +1,239 @@
+"""
+Time the menu actions of case_management_app and the stages of api_menora_vs_hachoda.main
+against synthetic cases loaded into the local stand-ins (see local_backends.py).
+
+Run from the project directory:
+    python -m benchmarks.run_benchmarks --cases 10 --documents 200 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --cases 10 --documents 200 --baseline benchmarks/baseline.json
+
+"cold" is the first run of an action after the caches were dropped (menu 13), "warm" the median
+of the following runs. With --baseline the run fails (exit code 1) when a timing is more than
+--max-regression slower than the baseline.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from benchmarks.synthetic_case import CaseProfile, generate_cases
+from benchmarks.local_backends import LocalBackends
+
+import api_menora_vs_hachoda
+from bpm_utils import (print_process_info,
+                       filter_population_process_status,
+                       filter_internal_judge_task_process_status,
+                       fetch_all_discussion_by_case, parse_requestsLog_by_case_id,
+                       parse_case_involved_representors_by_case_id,
+                       getAllAssignmentsTasks, getBOActions)
+from case_context import CaseContext
+from case_diagnosis_engine import run_case_diagnosis
+from case_management_app import get_case_id_from_displayed
+from code_table_cache import refresh_code_tables
+from decision_data_manager import fetch_decisions_and_documents_by_case_id
+from document_data_manager import fetch_documents_by_case_id
+from logging_utils import flush_console
+from lookup_snapshot import lookup_snapshot
+from process_data_manager import get_case_processes
+from process_snapshot_cache import process_snapshot_cache
+from request_data_manager import parse_requests_by_case_id
+from sql_connection_manager import close_all_sql_connections
+from task_module_manager import fetch_tasks_by_case
+
+# Differences below this many seconds are noise, never a regression
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def _sql_args():
+    return os.getenv("DB_SERVER"), os.getenv("DB_NAME"), os.getenv("DB_USER"), os.getenv("DB_PASS")
+
+
+def _menu_processes(case, report, process_filter=None):
+    processes_dic = get_case_processes(case, *_sql_args())
+    if process_filter:
+        processes_dic = process_filter(processes_dic)
+    print_process_info(processes_dic, report=report, case_id=case.case_id)
+
+
+# Benchmark name -> action(case, display_id); the same calls as the menu of case_management_app
+ACTIONS = {
+    "case_lookup": lambda case, display_id: get_case_id_from_displayed(display_id, case.db),
+    "menu_1": lambda case, display_id: parse_requests_by_case_id(case),
+    "menu_2": lambda case, display_id: fetch_decisions_and_documents_by_case_id(case),
+    "menu_3": lambda case, display_id: fetch_documents_by_case_id(case),
+    "menu_4": lambda case, display_id: _menu_processes(case, "processes"),
+    "menu_5": lambda case, display_id: getAllAssignmentsTasks(case.case_id),
+    "menu_6": lambda case, display_id: _menu_processes(case, "judge_tasks", filter_internal_judge_task_process_status),
+    "menu_7": lambda case, display_id: fetch_all_discussion_by_case(case.case_id, *_sql_args()),
+    "menu_8": lambda case, display_id: _menu_processes(case, "distributions", filter_population_process_status),
+    "menu_9": lambda case, display_id: parse_requestsLog_by_case_id(case),
+    "menu_10": lambda case, display_id: parse_case_involved_representors_by_case_id(case),
+    "menu_11": lambda case, display_id: getBOActions(case.case_id),
+    "menu_15": lambda case, display_id: run_case_diagnosis(case, *_sql_args()),
+    "task_api": lambda case, display_id: fetch_tasks_by_case(case.case_id),
+}
+
+# api_menora_vs_hachoda.main stages: module attribute timed while main() runs
+MENORA_STAGES = ("parse_requests_by_case_id", "fetch_request_status_from_menora",
+                 "fetch_decisions_by_case_id", "check_assignments_for_decisions")
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Send the console output of the actions to /dev/null (the file log is kept)."""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+        flush_console()
+
+
+def _drop_caches(cases):
+    """What menu 13 does, for every benchmark case."""
+    for case in cases:
+        case.refresh()
+        process_snapshot_cache.invalidate(case.case_id)
+    refresh_code_tables()
+    lookup_snapshot.refresh()
+
+
+def time_action(action, cases, data):
+    """Seconds to run `action` once for every case."""
+    start = time.perf_counter()
+    with _quiet():
+        for case in cases:
+            action(case, data.display_ids[case.case_id])
+    return time.perf_counter() - start
+
+
+def run_menu_benchmarks(data, db, repeat):
+    """{"menu_1": {"cold": s, "warm": s}, ...} over all the cases."""
+    cases = [CaseContext(case_id, db) for case_id in data.case_ids]
+    results = {}
+    for name, action in ACTIONS.items():
+        _drop_caches(cases)
+        try:
+            runs = [time_action(action, cases, data) for _ in range(repeat)]
+        except Exception as e:
+            print(f"{name}: failed ({e})")
+            continue
+        results[name] = {"cold": runs[0], "warm": statistics.median(runs[1:]) if len(runs) > 1 else runs[0]}
+    return results
+
+
+def _timed(stage_seconds, name, func):
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stage_seconds[name] += time.perf_counter() - start
+    return timed
+
+
+def run_menora_benchmark(data, backends):
+    """Run api_menora_vs_hachoda.main over the benchmark cases; seconds per stage, "other" and "total"."""
+    stage_seconds = {name: 0.0 for name in MENORA_STAGES}
+    originals = {name: getattr(api_menora_vs_hachoda, name) for name in MENORA_STAGES}
+    original_cases = api_menora_vs_hachoda.cases_list
+    original_cwd = os.getcwd()
+    try:
+        for name, func in originals.items():
+            setattr(api_menora_vs_hachoda, name, _timed(stage_seconds, name, func))
+        api_menora_vs_hachoda.cases_list = list(data.case_ids)
+        os.chdir(backends.work_dir)  # convertion_report.xlsx
+        _drop_caches([])
+        start = time.perf_counter()
+        with _quiet():
+            api_menora_vs_hachoda.main()
+        total = time.perf_counter() - start
+    finally:
+        os.chdir(original_cwd)
+        for name, func in originals.items():
+            setattr(api_menora_vs_hachoda, name, func)
+        api_menora_vs_hachoda.cases_list = original_cases
+        backends.apply_environment()  # main() loads .env
+
+    return {**stage_seconds, "other": total - sum(stage_seconds.values()), "total": total}
+
+
+def print_results(results):
+    print(f"\n{'action':<22}{'cold ms':>12}{'warm ms':>12}")
+    for name, timing in results["actions"].items():
+        print(f"{name:<22}{timing['cold'] * 1000:>12.1f}{timing['warm'] * 1000:>12.1f}")
+    if results.get("menora"):
+        print(f"\n{'api_menora stage':<36}{'ms':>12}")
+        for name, seconds in results["menora"].items():
+            print(f"{name:<36}{seconds * 1000:>12.1f}")
+
+
+def _flatten(results):
+    values = {f"{name}.{kind}": seconds for name, timing in results["actions"].items() for kind, seconds in timing.items()}
+    values.update({f"api_menora.{name}": seconds for name, seconds in results.get("menora", {}).items()})
+    return values
+
+
+def compare_with_baseline(results, baseline, max_regression):
+    """Lines describing every timing more than `max_regression` (0.25 = 25%) slower than the baseline."""
+    if baseline.get("profile") != results["profile"] or baseline.get("cases") != results["cases"]:
+        print("Warning: the baseline was recorded with another profile / case count.")
+    current = _flatten(results)
+    regressions = []
+    for key, old in _flatten(baseline).items():
+        new = current.get(key)
+        if new is None:
+            continue
+        if new > old * (1 + max_regression) and new - old > NOISE_FLOOR_SECONDS:
+            regressions.append(f"{key}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for field, default in CaseProfile().as_dict().items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=default, help=f"per case (default {default})")
+    parser.add_argument("--cases", type=int, default=5, help="number of synthetic cases (default 5)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per action, the first one cold (default 5)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--court-id", type=int, default=1)
+    parser.add_argument("--node-id", type=int, default=802)
+    parser.add_argument("--mongo-uri", help="local mongod to load the cases into instead of mongomock")
+    parser.add_argument("--skip-menora", action="store_true", help="do not run api_menora_vs_hachoda.main")
+    parser.add_argument("--baseline", help="baseline JSON to gate against")
+    parser.add_argument("--save-baseline", help="write the results as a baseline JSON")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed slowdown vs the baseline (default 0.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = CaseProfile(**{field: getattr(args, field) for field in CaseProfile().as_dict()})
+    data = generate_cases(profile, case_count=args.cases, seed=args.seed, court_id=args.court_id, node_id=args.node_id)
+    backends = LocalBackends(data, court_id=args.court_id, node_id=args.node_id, mongo_uri=args.mongo_uri)
+    try:
+        results = {"profile": profile.as_dict(), "cases": args.cases, "repeat": args.repeat,
+                   "actions": run_menu_benchmarks(data, backends.db, max(args.repeat, 1))}
+        if not args.skip_menora:
+            results["menora"] = run_menora_benchmark(data, backends)
+    finally:
+        close_all_sql_connections()
+        backends.close()
+
+    print_results(results)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare_with_baseline(results, json.load(baseline_file), args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regression against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Synthetic cases for the benchmarks: Mongo documents (Case, Document, vSearchCase), rows of the
+SQL Server tables the catalog queries read, and Task API responses, all generated from a seed.
+Codes are drawn from the tool's own mapping tables so every report finds its descriptions.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from bpm_utils import bpm_process_status_type, activity_type_mapping
+from doc_header_map import DOCUMENT_TYPE_MAPPING, DOCUMENT_CATEGORY_MAPPING, SOURCE_MAPPING
+from request_status_mapping import request_status_mapping, request_type_mapping, action_log_types_mapping
+from rtl_task_mappings import decision_type_mapping
+
+FIRST_CASE_ID = 3000001
+
+# Menora (api_menora_vs_hachoda) reads court 11 of the status conversion table
+MENORA_COURT_ID = 11
+
+
+class CaseProfile:
+    """Size of one synthetic case; every count is per case unless its name says otherwise."""
+
+    def __init__(self, requests=5, processes_per_request=2, steps_per_process=8, statuses_per_step=3,
+                 logs_per_request=6, decisions=4, sub_decisions_per_decision=2, documents=30,
+                 views_per_document=2, involveds=4, representors_per_involved=2, assignments=6,
+                 discussions=3, bo_actions=5, tasks=8):
+        self.requests = requests
+        self.processes_per_request = processes_per_request
+        self.steps_per_process = steps_per_process
+        self.statuses_per_step = statuses_per_step
+        self.logs_per_request = logs_per_request
+        self.decisions = decisions
+        self.sub_decisions_per_decision = sub_decisions_per_decision
+        self.documents = documents
+        self.views_per_document = views_per_document
+        self.involveds = involveds
+        self.representors_per_involved = representors_per_involved
+        self.assignments = assignments
+        self.discussions = discussions
+        self.bo_actions = bo_actions
+        self.tasks = tasks
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class SyntheticData:
+    """Everything generated for a set of cases, ready to be loaded into the local backends."""
+
+    def __init__(self):
+        self.mongo = {"Case": [], "Document": [], "vSearchCase": []}
+        self.sql = {}    # emulated table name -> [row tuple]
+        self.tasks = {}  # case_id -> Task API JSON
+        self.case_ids = []
+        self.display_ids = {}  # case_id -> CaseDisplayId
+
+    def add_row(self, table, *values):
+        self.sql.setdefault(table, []).append(values)
+
+
+def _code_table(data, table, mapping):
+    for key in mapping:
+        data.add_row(table, key, mapping.logical(key))
+
+
+def _lookup_tables(data, rng, court_id, process_type_count=12):
+    """The code and lookup tables, shared by every case."""
+    _code_table(data, "BPM__dbo__StatusTypes", bpm_process_status_type)
+    _code_table(data, "BPM__dbo__ActivityTypes", activity_type_mapping)
+    _code_table(data, "CaseManagement_BO__dbo__CT_Document_Types", DOCUMENT_TYPE_MAPPING)
+    for process_type_id in range(1, process_type_count + 1):
+        data.add_row("BPM__dbo__ProcessTypes", process_type_id, f"סוג תהליך {process_type_id}")
+    activity_ids = list(activity_type_mapping)
+    activity_id = 1
+    for process_type_id in range(1, process_type_count + 1):
+        for activity_type_id in rng.sample(activity_ids, min(10, len(activity_ids))):
+            data.add_row("BPM__dbo__ProcessTypeActivities", activity_id, process_type_id, activity_type_id)
+            activity_id += 1
+    for table, count, label in (("Responses__dbo__CT_Assignment_Types", 8, "סוג מטלה"),
+                                ("Responses__dbo__CT_Assignment_Status_Types", 4, "סטטוס מטלה"),
+                                ("Discussions__code__CT_Discussion_Types", 6, "סוג דיון"),
+                                ("Discussions__code__CT_Discussion_Statuses", 4, "סטטוס דיון"),
+                                ("CaseManagement_BO__dbo__CT_BO_Action_Types", 6, "פעולת משרד"),
+                                ("CaseManagement_BO__doc__Entity", 6, "ישות")):
+        for key in range(1, count + 1):
+            data.add_row(table, key, f"{label} {key}")
+    for position, decision_type_id in enumerate(decision_type_mapping, start=1):
+        data.add_row("CaseManagement_BO__dbo__CT_Decision_Types", decision_type_id, decision_type_mapping.logical(decision_type_id))
+        data.add_row("CaseManagement_BO__dbo__lt_decision_type_to_court", decision_type_id, decision_type_id,
+                     decision_type_mapping.logical(decision_type_id), court_id)
+    for status_bo, request_status_type_id in enumerate(list(request_status_mapping)[:10], start=1):
+        data.add_row("External_Courts__cnvrt__Case_Status_To_Case_Status_BO", status_bo, status_bo, MENORA_COURT_ID)
+        data.add_row("cases_bo__dbo__CT_Case_Status_Types", status_bo, request_status_type_id)
+        data.add_row("cases_bo__dbo__CT_Request_Status_Types", request_status_type_id, request_status_mapping.logical(request_status_type_id))
+
+
+def _random_date(rng, start):
+    return start + timedelta(days=rng.randint(0, 400), minutes=rng.randint(0, 24 * 60))
+
+
+def _case(data, rng, profile, case_id, court_id, node_id, ids):
+    start = datetime(2024, 1, 1)
+    display_id = f"{case_id % 10000}-25"
+    data.case_ids.append(case_id)
+    data.display_ids[case_id] = display_id
+
+    process_type_activities = {}
+    for activity_id, process_type_id, activity_type_id in data.sql["BPM__dbo__ProcessTypeActivities"]:
+        process_type_activities.setdefault(process_type_id, []).append(activity_id)
+    request_types = list(request_type_mapping)
+    request_statuses = list(request_status_mapping)
+    step_statuses = list(bpm_process_status_type)
+
+    requests = []
+    for _ in range(profile.requests):
+        request_id = next(ids)
+        processes = []
+        for _ in range(profile.processes_per_request):
+            process_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            process_type_id = rng.choice(list(process_type_activities))
+            processes.append({"ProcessId": process_id, "LastPublishDate": _random_date(rng, start)})
+            data.add_row("BPM__dbo__Processes", process_id, process_type_id, node_id)
+            for _ in range(profile.steps_per_process):
+                step_id = next(ids)
+                data.add_row("BPM__dbo__ProcessSteps", step_id, process_id, rng.choice(process_type_activities[process_type_id]),
+                             None, _random_date(rng, start))
+                for _ in range(profile.statuses_per_step):
+                    data.add_row("BPM__dbo__ProcessStepStatuses", next(ids), step_id, rng.choice(step_statuses))
+        leading_statuses = [{"RequestStatusTypeId": rng.choice(request_statuses), "StartDate": _random_date(rng, start),
+                             "EndDate": _random_date(rng, start)} for _ in range(3)]
+        leading_statuses[-1]["EndDate"] = None
+        requests.append({
+            "RequestId": request_id,
+            "RequestTypeId": rng.choice(request_types),
+            "SiteActionId": next(ids),
+            "RequestLeadingStatuses": leading_statuses,
+            "RequestLogs": [{
+                "RequestStatusId": rng.choice(request_statuses),
+                "ActionLogTypeId": rng.choice(list(action_log_types_mapping)),
+                "CreateActionUser": f"משתמש {rng.randint(1, 50)}",
+                "CreateActionDate": _random_date(rng, start),
+                "CreateLogDate": _random_date(rng, start),
+                "Remark": "",
+                "ProcessStepId": next(ids),
+            } for _ in range(profile.logs_per_request)],
+            "Processes": processes,
+        })
+    request_ids = [request["RequestId"] for request in requests]
+
+    decisions = []
+    for _ in range(profile.decisions):
+        decision_id = next(ids)
+        decision_requests = [{
+            "RequestId": rng.choice(request_ids),
+            "SubDecisions": [{"SubDecisionId": next(ids), "DecisionTypeToCourtId": rng.choice(list(decision_type_mapping)),
+                              "ContinuedProcessId": None} for _ in range(profile.sub_decisions_per_decision)],
+        }]
+        decisions.append({
+            "DecisionId": decision_id,
+            "DecisionStatusTypeId": rng.choice((1, 3)),
+            "PublishDate": _random_date(rng, start),
+            "Classifications": [],
+            "IsForPublication": rng.random() < 0.5,
+            "IsActive": True,
+            "DecisionRequests": decision_requests,
+        })
+
+    involveds = []
+    for _ in range(profile.involveds):
+        representors = [{
+            "CaseInvolvedName": f"מייצג {rng.randint(1, 999)}",
+            "CaseInvolvedIdentifyId": rng.randint(10000000, 99999999),
+            "IsActive": True,
+            "IsLegalAid": rng.random() < 0.2,
+            "AppointmentStartDate": _random_date(rng, start),
+            "AppointmentEndDate": None,
+        } for _ in range(profile.representors_per_involved)]
+        involveds.append({
+            "CaseInvolvedId": next(ids),
+            "CaseInvolvedName": f"מעורב {rng.randint(1, 999)}",
+            "CaseInvolvedIdentifyId": rng.randint(10000000, 99999999),
+            "IsActive": True,
+            "Representors": representors,
+        })
+    identify_ids = [involved["CaseInvolvedIdentifyId"] for involved in involveds]
+    # vSearchCase is keyed by case, so only the first representor of the case is found there
+    if involveds and involveds[0]["Representors"]:
+        data.mongo["vSearchCase"].append({"_id": case_id, "CaseInvolvedIdentifyId": involveds[0]["Representors"][0]["CaseInvolvedIdentifyId"]})
+
+    data.mongo["Case"].append({
+        "_id": case_id,
+        "CaseDisplayId": display_id,
+        "CourtId": court_id,
+        "Requests": requests,
+        "Decisions": decisions,
+        "CaseInvolveds": involveds,
+    })
+
+    for index in range(profile.documents):
+        entities = [{"EntityTypeId": 1, "EntityValue": case_id}, {"EntityTypeId": 2, "EntityValue": rng.choice(request_ids)}]
+        if decisions and index % 3 == 0:
+            entities.append({"EntityTypeId": 5, "EntityValue": rng.choice(decisions)["DecisionId"]})
+        data.mongo["Document"].append({
+            "_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "Entities": entities,
+            "DocumentTypeId": rng.choice(list(DOCUMENT_TYPE_MAPPING)),
+            "DocumentCategoryId": rng.choice(list(DOCUMENT_CATEGORY_MAPPING)),
+            "DocumentSourceTypeId": rng.choice(list(SOURCE_MAPPING)),
+            "MojId": f"MOJ{next(ids)}",
+            "FileName": f"document_{index}.pdf",
+            "CreateDate": _random_date(rng, start),
+            "DocumentReceiptTime": _random_date(rng, start),
+            "DocumentViews": [{"UserIdentifyId": rng.choice(identify_ids)} for _ in range(profile.views_per_document)] if identify_ids else [],
+        })
+
+    for _ in range(profile.assignments):
+        decision = rng.choice(decisions) if decisions else {"DecisionId": None}
+        data.add_row("Responses__dbo__Assignments", next(ids), case_id, rng.choice(request_ids), decision["DecisionId"],
+                     f"MOJ{next(ids)}", rng.randint(1, 8), _random_date(rng, start), rng.randint(1, 4),
+                     1, next(ids), next(ids), None)
+    for _ in range(profile.discussions):
+        discussion_id = next(ids)
+        data.add_row("Discussions__dbo__Discussions", discussion_id, _random_date(rng, start), rng.randint(1, 6), rng.randint(1, 4))
+        data.add_row("Discussions__dbo__Request_To_Discussions", discussion_id, case_id, rng.choice(request_ids))
+    for _ in range(profile.bo_actions):
+        data.add_row("CaseManagement_BO__dbo__BO_Actions", next(ids), rng.randint(1, 6), "שינוי סיווג", case_id,
+                     rng.choice(request_ids), "משתמש", 1, _random_date(rng, start), 2, str(rng.choice(request_ids)),
+                     "מקור", 2, str(rng.choice(request_ids)), _random_date(rng, start))
+    data.add_row("Menora_Conversion__dbo__Appeal", case_id, rng.randint(1, 10))
+
+    data.tasks[case_id] = [{"taskDetails": {
+        "taskTypeId": rng.choice((3, 4, 6, 7, 8)),
+        "taskTypeDescription": f"משימה {index}",
+        "status": rng.choice((1, 2)),
+        "dueDate": _random_date(rng, start).isoformat(),
+        "assignUserNameForDisplay": f"משתמש {rng.randint(1, 50)}",
+    }} for index in range(profile.tasks)]
+
+
+def generate_cases(profile, case_count=1, seed=1, court_id=0, node_id=0):
+    """
+    Generate `case_count` cases of `profile`. The same arguments always produce the same data.
+
+    Example:
+        data = generate_cases(CaseProfile(documents=200), case_count=10, court_id=int(os.getenv("COURT_ID")))
+    """
+    rng = random.Random(seed)
+    data = SyntheticData()
+    _lookup_tables(data, rng, court_id)
+    ids = iter(range(100000, 10 ** 12))
+    for case_id in range(FIRST_CASE_ID, FIRST_CASE_ID + case_count):
+        _case(data, rng, profile, case_id, court_id, node_id, ids)
+    return data
@@ -1,274 +1,177 @@
 
 from request_status_mapping import request_status_mapping,request_type_mapping,action_log_types_mapping  # Import the mapping
-from logging_utils import log_and_print, normalize_hebrew, logger
+from logging_utils import log_and_print, normalize_hebrew, logger, flush_console
 from logging_utils import BOLD_YELLOW, BOLD_GREEN, BOLD_RED
+from process_timeline_manager import run_process_engine, fetch_process_timeline, fetch_open_step_updates
+from process_step_table import ProcessStepTable
+from display_mapping import DisplayMapping
 import logging
-import pyodbc
+from sql_connection_manager import get_sql_pool
+from sql_query_catalog import execute_query
+from lookup_snapshot import lookup, lookup_snapshot
+from report_output import emit_record
+from case_context import CaseContext
 import os
+import time
 from dotenv import load_dotenv
 
 # Load environment variable
 load_dotenv()
 
-bpm_process_status_type = {
-    1: normalize_hebrew("חדש"),
-    2: normalize_hebrew("נפתח מחדש"),
-    3: normalize_hebrew("הופעל"),
-    4: normalize_hebrew("הורם אירוע"),
-    5: normalize_hebrew("בדחייה"),
-    6: normalize_hebrew("בהמתנה (עבור מטלה)"),
-    7: normalize_hebrew("סיום טיפול/בוצע"),
-    8: normalize_hebrew("סיום טיפול ב terminate"),
-    9: normalize_hebrew("קידום ישיר מהורם אירוע"),
-    10: normalize_hebrew("בקשה להפעלה"),
-    11: normalize_hebrew("בוצע חלקית"),
-    12: normalize_hebrew("השהייה (עבור השהייה)"),
-    13: normalize_hebrew("נסגר מביטול תהליך")
-}
-
-
-activity_type_mapping = {
-    3: normalize_hebrew("עיון והחלטה"),
-    4: normalize_hebrew("בדיקת מזכירות"),
-    5: normalize_hebrew("ניתוב לדיין"),
-    6: normalize_hebrew("קביעת דיון"),
-    7: normalize_hebrew("החלטה בבקשה חדשה"),
-    8: normalize_hebrew("בדיקת מזכירות לחריגה בהשלמת מסמכים"),
-    9: normalize_hebrew("בדיקת מזכירות להשלמת מסמכים"),
-    10: normalize_hebrew("החלטה על תגובה"),
-    11: normalize_hebrew("החלטה על תגובה בחריגה"),
-    12: normalize_hebrew("החלטה לאחר דיון"),
-    13: normalize_hebrew("הפצת החלטה"),
-    14: normalize_hebrew("מתן החלטה - פסק דין"),
-    15: normalize_hebrew("שינוי מועד דיון"),
-    16: normalize_hebrew("ביטול דיון"),
-    17: normalize_hebrew("מטלה לעורר להשלמת מסמכים"),
-    18: normalize_hebrew("הפצה להשלמת מסמכים"),
-    19: normalize_hebrew("הפצה - סגירה מנהלית"),
-    20: normalize_hebrew("הפצה - פתיחת תיק"),
-    21: normalize_hebrew("הפצת זימון דיון"),
-    22: normalize_hebrew("יצירת תהליכי המשך להחלטה"),
-    23: normalize_hebrew("מטלה לתגובת צד ב"),
-    24: normalize_hebrew("מטלה לתגובת צד א"),
-    25: normalize_hebrew("מטלה לכתב תשובה"),
-    26: normalize_hebrew("החלטה יזומה"),
-    27: normalize_hebrew("הפצה - שינוי מועד דיון"),
-    28: normalize_hebrew("המתנה עד לתחילת מועד הדיון"),
-    29: normalize_hebrew("יצירת מסמך מתבנית"),
-    30: normalize_hebrew("המתנה עד למועד סיום הדיון"),
-    31: normalize_hebrew("שרות סיום דיון"),
-    32: normalize_hebrew("שרות סגירת בקשה"),
-    33: normalize_hebrew("שרות סגירת בקשה  (בעקבות איחוד תיקים)"),
-    34: normalize_hebrew("מטלה לתגובת צד א' מתוך תגובת הצדדים"),
-    35: normalize_hebrew("מטלה לתגובת צד ב' מתוך תגובת הצדדים"),
-    36: normalize_hebrew("פרוצדורה לחישוב סוג משימת החריגה שיש לפתוח"),
-    37: normalize_hebrew("משימת החלטה על חריגה בתגובה - צד א'"),
-    38: normalize_hebrew("משימת החלטה על חריגה בתגובה - צד ב'"),
-    39: normalize_hebrew("משימת החלטה על חריגה בתגובה - 2 הצדדים"),
-    40: normalize_hebrew("משימת החלטה על תגובת צד א' מתגובת הצדדים"),
-    41: normalize_hebrew("משימת החלטה על תגובת צד ב' מתגובת הצדדים"),
-    42: normalize_hebrew("עדכון מספר תיק לתצוגה על מסמך בדוקומנטום"),
-    43: normalize_hebrew("החלטה לשינוי מותב"),
-    44: normalize_hebrew("הפצה - ביטול דיון"),
-    45: normalize_hebrew("שליחת זימון ב-OUTLOOK"),
-    46: normalize_hebrew("עדכון זימון ב-OUTLOOK"),
-    47: normalize_hebrew("ביטול דיון ב-OUTLOOK"),
-    48: normalize_hebrew("הפצה לצד שכנגד"),
-    49: normalize_hebrew("המתנה עד להחלטה מהותית / סגירת תיק מחדש"),
-    51: normalize_hebrew("הפצת שינוי סיווג"),
-    52: normalize_hebrew("סגירת בקשה (בעקבות שינוי סיווג)"),
-    53: normalize_hebrew("שינוי סיווג")
-}
-
-def fetch_process_ids_and_request_type_by_case_id_sorted(case_id, db):
+bpm_process_status_type = DisplayMapping({
+    1: "חדש",
+    2: "נפתח מחדש",
+    3: "הופעל",
+    4: "הורם אירוע",
+    5: "בדחייה",
+    6: "בהמתנה (עבור מטלה)",
+    7: "סיום טיפול/בוצע",
+    8: "סיום טיפול ב terminate",
+    9: "קידום ישיר מהורם אירוע",
+    10: "בקשה להפעלה",
+    11: "בוצע חלקית",
+    12: "השהייה (עבור השהייה)",
+    13: "נסגר מביטול תהליך"
+})
+
+# Step statuses that never change again (done / terminated / closed by process cancellation)
+BPM_TERMINAL_STATUS_TYPES = (7, 8, 13)
+
+# Seconds between refreshes of the live process watch
+WATCH_INTERVAL_SECONDS = int(os.getenv("WATCH_INTERVAL_SECONDS", "15"))
+
+
+activity_type_mapping = DisplayMapping({
+    3: "עיון והחלטה",
+    4: "בדיקת מזכירות",
+    5: "ניתוב לדיין",
+    6: "קביעת דיון",
+    7: "החלטה בבקשה חדשה",
+    8: "בדיקת מזכירות לחריגה בהשלמת מסמכים",
+    9: "בדיקת מזכירות להשלמת מסמכים",
+    10: "החלטה על תגובה",
+    11: "החלטה על תגובה בחריגה",
+    12: "החלטה לאחר דיון",
+    13: "הפצת החלטה",
+    14: "מתן החלטה - פסק דין",
+    15: "שינוי מועד דיון",
+    16: "ביטול דיון",
+    17: "מטלה לעורר להשלמת מסמכים",
+    18: "הפצה להשלמת מסמכים",
+    19: "הפצה - סגירה מנהלית",
+    20: "הפצה - פתיחת תיק",
+    21: "הפצת זימון דיון",
+    22: "יצירת תהליכי המשך להחלטה",
+    23: "מטלה לתגובת צד ב",
+    24: "מטלה לתגובת צד א",
+    25: "מטלה לכתב תשובה",
+    26: "החלטה יזומה",
+    27: "הפצה - שינוי מועד דיון",
+    28: "המתנה עד לתחילת מועד הדיון",
+    29: "יצירת מסמך מתבנית",
+    30: "המתנה עד למועד סיום הדיון",
+    31: "שרות סיום דיון",
+    32: "שרות סגירת בקשה",
+    33: "שרות סגירת בקשה  (בעקבות איחוד תיקים)",
+    34: "מטלה לתגובת צד א' מתוך תגובת הצדדים",
+    35: "מטלה לתגובת צד ב' מתוך תגובת הצדדים",
+    36: "פרוצדורה לחישוב סוג משימת החריגה שיש לפתוח",
+    37: "משימת החלטה על חריגה בתגובה - צד א'",
+    38: "משימת החלטה על חריגה בתגובה - צד ב'",
+    39: "משימת החלטה על חריגה בתגובה - 2 הצדדים",
+    40: "משימת החלטה על תגובת צד א' מתגובת הצדדים",
+    41: "משימת החלטה על תגובת צד ב' מתגובת הצדדים",
+    42: "עדכון מספר תיק לתצוגה על מסמך בדוקומנטום",
+    43: "החלטה לשינוי מותב",
+    44: "הפצה - ביטול דיון",
+    45: "שליחת זימון ב-OUTLOOK",
+    46: "עדכון זימון ב-OUTLOOK",
+    47: "ביטול דיון ב-OUTLOOK",
+    48: "הפצה לצד שכנגד",
+    49: "המתנה עד להחלטה מהותית / סגירת תיק מחדש",
+    51: "הפצת שינוי סיווג",
+    52: "סגירת בקשה (בעקבות שינוי סיווג)",
+    53: "שינוי סיווג"
+})
+
+def fetch_process_ids_and_request_type_by_case_id_sorted(case: CaseContext):
     """
-    Fetch Process IDs from MongoDB for a given Case ID (_id), sorted by LastPublishDate,
-    and return a dictionary with ProcessId as the key and RequestTypeId as the value.
+    Return the Process IDs of the case, sorted by LastPublishDate within each request,
+    as a dictionary with ProcessId as the key and RequestTypeId as the value.
+    Cases of another court than COURT_ID have no processes.
     """
-    process_dict = {}
-    #court_id = 11
     court_id = int(os.getenv("COURT_ID", "0"))
-    #log_and_print(f"court_id={court_id}")
 
+    process_dict = {}
     try:
-        collection = db["Case"]
-        document = collection.find_one(
-            {"_id": case_id, "CourtId": court_id},
-            {
-                "Requests.RequestId": 1,
-                "Requests.RequestTypeId": 1,
-                "Requests.Processes.ProcessId": 1,
-                "Requests.Processes.LastPublishDate": 1,
-                "_id": 1
-            }
-        )
-
-        if not document:
-            log_and_print(f"No document found for Case ID {case_id} with Court ID {court_id}.")
-            return {}
-
-
-
-        requests = document.get("Requests", [])
-        for request in requests:
-            request_id = request.get("RequestId", "N/A")  # Default to "N/A" if not found
-            request_type_id = request.get("RequestTypeId", "N/A")  # Default to "N/A" if not found
-
-            # Log RequestId and RequestTypeId
-            #log_and_print(f"RequestId: {request_id}, RequestTypeId: {request_type_id}")
-
-            processes = request.get("Processes", [])
-            process_list = []  # List to store processes for sorting by LastPublishDate
-
-            for process in processes:
-                process_id = process.get("ProcessId")
-                last_publish_date = process.get("LastPublishDate")
-                if process_id and last_publish_date:
-                    process_list.append((last_publish_date, process_id))
+        if case.court_id == court_id:
+            process_dict = {process_id: process["RequestTypeId"] for process_id, process in case.processes_by_id.items()}
+    except Exception as e:
+        log_and_print(f"Error processing case documents: {e}")
+    if not process_dict:
+        log_and_print(f"No processes found for Case ID {case.case_id} with Court ID {court_id}.")
+    return process_dict
 
-            # If there are valid processes for this request, sort them by LastPublishDate
-            if process_list:
-                process_list.sort(key=lambda x: x[0])  # Sort by LastPublishDate
-                sorted_process_ids = [process[1] for process in process_list]
 
-                # Store ProcessId as key and RequestTypeId as value in the dictionary
-                for process_id in sorted_process_ids:
-                    process_dict[process_id] = request_type_id
-        return process_dict
+def collect_latest_step_status(timeline):
+    """
+    Reduce a process timeline to the flat list used by print_process_info and the filter_*
+    functions: one dictionary per step with its latest StatusTypeID, in process/step order.
+    """
+    process_subprocess_count = []
+    for process in timeline:
+        if not process["steps"]:
+            log_and_print(f"No results found for ProcessID {process['process_id']}.", "warning")
+            continue
+
+        des_request_heb = normalize_hebrew(request_type_mapping.get(process["request_type_id"], "Unknown Status"))
+        for step in process["steps"]:
+            if not step["statuses"]:
+                continue
+            process_subprocess_count.append({
+                "request_type": des_request_heb,
+                "process_id": process["process_id"],
+                "process_type_name": step["process_type_name"],
+                "process_activity_name": step["activity_type_id"],
+                "process_step_status": step["statuses"][-1]["status_type_id"]
+            })
 
-    except Exception as e:
-        log_and_print(f"Error processing case document: {e}")
-        return {}
+    return ProcessStepTable(process_subprocess_count)
 
 
-def bpm_collect_all_processes_steps_and_status(server_name, database_name, user_name, password, process_ids):
-    """Execute SQL queries for each Process ID provided in the list of dictionaries."""
+def bpm_collect_all_processes_steps_and_status(server_name, database_name, user_name, password, process_ids, parallel=None):
+    """
+    Collect the steps and latest step status of every Process ID of our LdapLeafID,
+    fetched in a constant number of round trips by the process engine.
+    `parallel` splits the processes across that many SQL connections (default BPM_FETCH_WORKERS).
+    """
     if not process_ids:
         log_and_print("\nNo Process Information provided. Exiting.", "warning")
         return
 
-    process_subprocess_count = []  # List to store dictionaries with process information
     node_id = os.getenv("NODEID")
-    #log_and_print(f"NodeId={node_id}")
+    return run_process_engine(server_name, database_name, user_name, password, process_ids,
+                              collect_latest_step_status, node_id=node_id, parallel=parallel)
 
-    try:
-        # Establish connection to SQL Server
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-
-        cursor = connection.cursor()
-        #log_and_print("Connection to SQL Server established successfully.\n", "info", BOLD_GREEN)
-
-        query_2_counter = 0  # Counter for the second query
 
-        for process_id, request_type_id in process_ids.items():
-            if not process_id:
-                log_and_print("Skipping due to missing ProcessId.", "warning")
-                continue
-
-            # SQL Query 1: Get ProcessID and ProcessTypeName
-            sql_query_1 = """
-            SELECT TOP (1000) p.[ProcessID],
-                   pt.[ProcessTypeName]
-            FROM [BPM].[dbo].[Processes] AS p
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt  
-                ON pt.[ProcessTypeID] = p.[ProcessTypeID]
-            WHERE p.[ProcessID] = ? and p.[LdapLeafID] = ?;
-            """
-            cursor.execute(sql_query_1, process_id,node_id)
-            rows_1 = cursor.fetchall()
-
-            if not rows_1:
-                log_and_print(f"No results found for ProcessID {process_id}.", "warning")
-                continue
-            
-            des_request_heb = normalize_hebrew(request_type_mapping.get(request_type_id, "Unknown Status"))
-
-            # SQL Query 2: Get ProcessStep details
-            sql_query_2 = """
-            SELECT TOP (1000) ps.[ProcessStepID],
-                   ps.[ProcessID],
-                   pt.[ProcessTypeName],
-                   pta.[ActivityTypeID],
-                   ps.[ProcessTypeGatewayID],
-                   ps.[DateForBPETreatment]
-            FROM [BPM].[dbo].[ProcessSteps] AS ps
-            JOIN [BPM].[dbo].[ProcessTypeActivities] AS pta
-                ON ps.[ProcessTypeActivityID] = pta.[ProcessTypeActivityID]
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt
-                ON pt.[ProcessTypeID] = pta.[ProcessTypeID]
-            JOIN [BPM].[dbo].[ActivityTypes] AS at
-                ON at.[ActivityTypeID] = pta.[ActivityTypeID]
-            WHERE ps.[ProcessID] = ?;
-            """
-            cursor.execute(sql_query_2, process_id)
-            rows_2 = cursor.fetchall()
-
-            if not rows_2:
-                log_and_print(f"No results found for ProcessID {process_id}.", "warning")
-                continue
-            
-            for row in rows_2:
-                query_2_counter += 1
-                try:
-                    process_step_id = row[0]
-                    process_type_name = row[2].strip()
-                    process_activity_name = row[3]#.strip()
-
-                    # SQL Query 3: Get ProcessStepStatus details
-                    sql_query_3 = """
-                    SELECT TOP (1000) p.[ProcessStepStatusID],
-                           p.[ProcessStepID],
-                           p.[StatusTypeID]
-                    FROM [BPM].[dbo].[ProcessStepStatuses] AS p
-                    JOIN [BPM].[dbo].[StatusTypes] AS s
-                        ON p.[StatusTypeID] = s.[StatusTypeID]
-                    WHERE p.[ProcessStepID] = ?;
-                    """
-                    cursor.execute(sql_query_3, process_step_id)
-                    rows_4 = cursor.fetchall()
-
-                    if rows_4:
-                        process_step_status = rows_4[-1][2]
-
-                        # Append the information to the list
-                        process_subprocess_count.append({
-                            "request_type": des_request_heb,
-                            "process_id": process_id,
-                            "process_type_name": process_type_name,
-                            "process_activity_name": process_activity_name,
-                            "process_step_status": process_step_status
-                        })
-                    
-                except Exception as e:
-                    log_and_print(f"Error processing ProcessStepID {row[0]}: {e}", "error", BOLD_RED)
-        
-        # # Print each dictionary and its key-value pairs
-        # for process_info in process_subprocess_count:
-        #      log_and_print(f"{process_info['process_activity_name']}={process_info['process_step_status']} - {process_info['request_type']}", is_hebrew=True)
-
-        return process_subprocess_count  # Return the list of process information
-
-    except Exception as e:
-        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
-
-    finally:
-        # Close the SQL Server connection
-        if 'connection' in locals():
-            connection.close()
-            #log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)
+######################### print dic ######################
 
+def _emit_process_step(report, case_id, process_info):
+    """Structured record of one process step line of print_process_info / print_task_process_info."""
+    emit_record(report, case_id=case_id, process_id=process_info.get('process_id'),
+                request_type=process_info.get('request_type'), process_type_name=process_info.get('process_type_name'),
+                activity_type_id=process_info.get('process_activity_name'),
+                activity_type=activity_type_mapping.logical(process_info.get('process_activity_name'), "Unknown Status"),
+                status_type_id=process_info.get('process_step_status'),
+                status=bpm_process_status_type.logical(process_info.get('process_step_status'), "Unknown Status"),
+                valid_assignment_type=process_info.get('valid_assignment_type'))
 
-######################### print dic ######################
 
-def print_process_info(process_dict):
-    """Print all elements in the dictionary or list in a specific format."""
+def print_process_info(process_dict, report="processes", case_id=None):
+    """
+    Print all elements in the dictionary or list in a specific format.
+    With REPORT_FORMAT set, each line is also written as a record of `report`.
+    """
     try:
         # Initialize a flag to check if any data is printed
         data_printed = False
@@ -283,12 +186,13 @@ def print_process_info(process_dict):
                     heb_process_step_status = normalize_hebrew(bpm_process_status_type.get(process_info['process_step_status'], "Unknown Status"))
                     heb_activity_type = normalize_hebrew(activity_type_mapping.get(process_info['process_activity_name'], "Unknown Status"))
                     log_and_print(f"{heb_activity_type}={heb_process_step_status}-{process_info['request_type']}--{process_info['process_type_name']}", "info", indent=4,is_hebrew=True)
+                    _emit_process_step(report, case_id, process_info)
                     data_printed = True
                 else:
                     log_and_print("Missing expected keys in process info.", "warning")
 
-        # Check if process_dict is a list
-        elif isinstance(process_dict, list):
+        # Check if process_dict is a list (or a ProcessStepTable)
+        elif isinstance(process_dict, (list, ProcessStepTable)):
             for process_info in process_dict:
                 # Ensure the keys exist before accessing to avoid KeyError
                 if 'process_activity_name' in process_info and 'process_step_status' in process_info and 'process_type_name' in process_info and 'process_id' in process_info:
@@ -297,6 +201,7 @@ def print_process_info(process_dict):
                     heb_activity_type = normalize_hebrew(activity_type_mapping.get(process_info['process_activity_name'], "Unknown Status"))
                     
                     log_and_print(f"{process_info['request_type'][:15]}--{process_info['process_type_name']}---{heb_activity_type}[{heb_process_step_status}]-{process_info['process_id']}", "info", indent=4,is_hebrew=True)
+                    _emit_process_step(report, case_id, process_info)
                     data_printed = True
                 else:
                     log_and_print("Missing expected keys in process info.", "warning")
@@ -312,130 +217,177 @@ def print_process_info(process_dict):
         log_and_print(f"Error printing process info: {e}", "error")
 
 
+######################### מעקב חי ######################
+
+def _print_watched_step_change(step, old_status, indent=4):
+    """Print one changed step, highlighted, in the print_process_info line format."""
+    heb_activity_type = normalize_hebrew(activity_type_mapping.get(step['process_activity_name'], "Unknown Status"))
+    heb_new_status = normalize_hebrew(bpm_process_status_type.get(step['process_step_status'], "Unknown Status"))
+    if old_status is None:
+        change = f"[{heb_new_status}] (שלב חדש)"
+    else:
+        heb_old_status = normalize_hebrew(bpm_process_status_type.get(old_status, "Unknown Status"))
+        change = f"[{heb_old_status} -> {heb_new_status}]"
+    log_and_print(f"{step['request_type'][:15]}--{step['process_type_name']}---{heb_activity_type}{change}-{step['process_id']}", "info", BOLD_YELLOW, indent=indent, is_hebrew=True)
+    emit_record("process_watch", process_id=step['process_id'], request_type=step['request_type'],
+                process_type_name=step['process_type_name'], activity_type_id=step['process_activity_name'],
+                activity_type=activity_type_mapping.logical(step['process_activity_name'], "Unknown Status"),
+                old_status_type_id=old_status, status_type_id=step['process_step_status'],
+                status=bpm_process_status_type.logical(step['process_step_status'], "Unknown Status"))
+
+
+def watch_process_info(server_name, database_name, user_name, password, process_ids, interval_seconds=WATCH_INTERVAL_SECONDS, max_refreshes=None):
+    """
+    Live watch of the case processes: print the full process view once, then every
+    `interval_seconds` query the steps created since the last refresh (in every watched process)
+    and the new statuses of the steps that are not in a terminal status (BPM_TERMINAL_STATUS_TYPES),
+    using ProcessStepID / ProcessStepStatusID high-water marks, and print only what changed. Stops on Ctrl+C or after `max_refreshes` refreshes.
+    """
+    if not process_ids:
+        log_and_print("\nNo Process Information provided. Exiting.", "warning")
+        return
+
+    node_id = os.getenv("NODEID")
+
+    try:
+        # Borrow a pooled connection to SQL Server, kept for the whole watch
+        sql_pool = get_sql_pool(server_name, database_name, user_name, password)
+        connection = sql_pool.acquire()
+        cursor = connection.cursor()
+
+        timeline = fetch_process_timeline(cursor, process_ids, node_id=node_id)
+        print_process_info(collect_latest_step_status(timeline), report="process_watch")
+
+        # Current state per step, plus the high-water marks
+        steps = {}
+        request_types = {}
+        step_high_water = 0
+        status_high_water = 0
+        for process in timeline:
+            des_request_heb = normalize_hebrew(request_type_mapping.get(process["request_type_id"], "Unknown Status"))
+            request_types[process["process_id"]] = des_request_heb
+            for step in process["steps"]:
+                latest = step["statuses"][-1] if step["statuses"] else None
+                steps[step["process_step_id"]] = {
+                    "request_type": des_request_heb,
+                    "process_id": process["process_id"],
+                    "process_type_name": step["process_type_name"],
+                    "process_activity_name": step["activity_type_id"],
+                    "process_step_status": latest["status_type_id"] if latest else None
+                }
+                step_high_water = max(step_high_water, step["process_step_id"])
+                if latest:
+                    status_high_water = max(status_high_water, latest["process_step_status_id"])
+
+        # SQL Server returns uniqueidentifiers upper-cased, Mongo stores them lower-cased
+        known_processes = {str(process_id).lower(): process_id for process_id in request_types}
+
+        refreshes = 0
+        log_and_print(f"\nWatch mode: refreshing every {interval_seconds}s, press Ctrl+C to stop.", "info", BOLD_GREEN)
+        while max_refreshes is None or refreshes < max_refreshes:
+            flush_console()
+            time.sleep(interval_seconds)
+            refreshes += 1
+
+            # New steps can appear in any watched process, also once all of its steps are terminal
+            open_step_ids = [step_id for step_id, step in steps.items() if step["process_step_status"] not in BPM_TERMINAL_STATUS_TYPES]
+            new_steps, new_statuses = fetch_open_step_updates(cursor, list(request_types), open_step_ids, step_high_water, status_high_water)
+
+            previous_status = {}
+            for process_id, step in new_steps:
+                owner = known_processes.get(str(process_id).lower(), process_id)
+                steps[step["process_step_id"]] = {
+                    "request_type": request_types.get(owner, ""),
+                    "process_id": owner,
+                    "process_type_name": step["process_type_name"],
+                    "process_activity_name": step["activity_type_id"],
+                    "process_step_status": None
+                }
+                previous_status[step["process_step_id"]] = None
+                step_high_water = max(step_high_water, step["process_step_id"])
+
+            for status in new_statuses:
+                step = steps[status["process_step_id"]]
+                previous_status.setdefault(status["process_step_id"], step["process_step_status"])
+                step["process_step_status"] = status["status_type_id"]
+                status_high_water = max(status_high_water, status["process_step_status_id"])
+
+            changed = [step_id for step_id, old_status in previous_status.items() if steps[step_id]["process_step_status"] != old_status]
+            log_and_print(f"\n--- רענון {refreshes}: {len(open_step_ids)} שלבים פתוחים, {len(changed)} שינויים ---", "info", BOLD_GREEN, is_hebrew=True)
+            for step_id in changed:
+                _print_watched_step_change(steps[step_id], previous_status[step_id])
+
+    except KeyboardInterrupt:
+        log_and_print("\nWatch mode stopped.", "info", BOLD_GREEN)
+
+    except Exception as e:
+        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
+
+    finally:
+        # Return the connection to the pool
+        if 'connection' in locals():
+            sql_pool.release(connection)
+
+
+def _as_process_step_table(process_dict):
+    """Return `process_dict` as a ProcessStepTable, building the indexes only if it is not one already."""
+    if isinstance(process_dict, ProcessStepTable):
+        return process_dict
+    if isinstance(process_dict, (dict, list)):
+        return ProcessStepTable(process_dict)
+    log_and_print("The provided data is neither a list nor a dictionary.", "error")
+    return ProcessStepTable()
+
+
 #############################  מטלות #########################
 def filter_process_info_by_waiting_for_task_status(process_dict, statuses_to_filter=[6, 7]):
     """Filter process info and return a list of items where process_step_status is in the provided list."""
     # 6= בהמתנה (עבור מטלה)
     # 7= סיום טיפול/בוצע
-    filtered_items = []
-  
     try:
-        # Ensure input is a list or dict
-        if isinstance(process_dict, dict):
-            log_and_print(f"process_dict={process_dict}")
-            for process_info in process_dict.values():
-                if 'process_step_status' in process_info and process_info['process_step_status'] in statuses_to_filter:
-                    filtered_items.append(process_info)
-
-        elif isinstance(process_dict, list):
-            log_and_print(f"pprocess_dict={process_dict}")
-            for process_info in process_dict:
-                if 'process_step_status' in process_info and process_info['process_step_status'] in statuses_to_filter:
-                    filtered_items.append(process_info)
-
-        else:
-            log_and_print("The provided data is neither a list nor a dictionary.", "error")
+        table = _as_process_step_table(process_dict)
+        return table.select(table.positions(status_ids=statuses_to_filter))
 
     except Exception as e:
         log_and_print(f"Error filtering process info: {e}", "error")
-
-    return filtered_items
+        return []
 
 
 
 #############################  הפצה #########################
 def filter_population_process_status(process_dict):
-    """Filter process info and return a list of items where process_step_status equals status_to_filter."""
-    filtered_items = []  # List to store items that match the filter condition
-
+    """Filter process info and return a list of items whose activity is a distribution (הפצה) activity."""
     try:
-        # Check if process_dict is a dictionary
-        if isinstance(process_dict, dict):
-            # Iterate over the dictionary values
-            for process_info in process_dict.values():
-                if 'process_step_status' in process_info and process_info['process_activity_name'] in [13, 18, 19, 20, 21,27,44,48]:
-                    filtered_items.append(process_info)
-
-        # Check if process_dict is a list
-        elif isinstance(process_dict, list):
-            for process_info in process_dict:
-                if 'process_step_status' in process_info and process_info['process_activity_name'] in [13, 18, 19, 20, 21,27,44,48]:
-                    filtered_items.append(process_info)
-
-        else:
-            log_and_print("The provided data is neither a list nor a dictionary.", "error")
+        table = _as_process_step_table(process_dict)
+        return table.select(table.role_positions("population"))
 
     except Exception as e:
         log_and_print(f"Error filtering process info: {e}", "error")
-
-    # Return the filtered list
-    return filtered_items
+        return []
 
 ############################# דיין משימות #########################
 def filter_internal_judge_task_process_status(process_dict):
-    """Filter process info and return a list of items where process_step_status equals status_to_filter."""
-    filtered_items = []  # List to store items that match the filter condition
-
+    """Filter process info and return a list of open items whose activity is a judge task."""
     try:
-        # Check if process_dict is a dictionary
-        if isinstance(process_dict, dict):
-            # Iterate over the dictionary values
-            for process_info in process_dict.values():
-                if 'process_step_status' in process_info and process_info['process_activity_name'] in [3,7, 10, 11, 12, 14, 26, 37, 38, 39, 40, 41, 43] and process_info['process_step_status'] <4:
-                    filtered_items.append(process_info)
-
-        # Check if process_dict is a list
-        elif isinstance(process_dict, list):
-            for process_info in process_dict:
-                if 'process_step_status' in process_info and process_info['process_activity_name'] in [3,7, 10, 11, 12, 14, 26, 37, 38, 39, 40, 41, 43] and process_info['process_step_status'] <4:
-                    filtered_items.append(process_info)
-
-        else:
-            log_and_print("The provided data is neither a list nor a dictionary.", "error")
-
-        # # Check if no items were found
-        # if not filtered_items:
-        #     log_and_print("אין מידע רלוונטי", "info")
+        table = _as_process_step_table(process_dict)
+        return table.select(table.role_positions("judge", table.open_status_ids()))
 
     except Exception as e:
         log_and_print(f"Error filtering process info: {e}", "error")
-
-    # Return the filtered list
-    return filtered_items
+        return []
 
 
 
 ############################# מזכירה משימות #########################
 def filter_internal_secretery_task_process_status(process_dict):
-    """Filter process info and return a list of items where process_step_status equals status_to_filter."""
-    filtered_items = []  # List to store items that match the filter condition
-
+    """Filter process info and return a list of open items whose activity is a secretary task."""
     try:
-        # Check if process_dict is a dictionary
-        if isinstance(process_dict, dict):
-            # Iterate over the dictionary values
-            for process_info in process_dict.values():
-                if 'process_step_status' in process_info and process_info['process_activity_name'] in [4,6,8,9,15,16] and process_info['process_step_status'] <4:
-                    filtered_items.append(process_info)
-
-        # Check if process_dict is a list
-        elif isinstance(process_dict, list):
-            for process_info in process_dict:
-                if 'process_step_status' in process_info and process_info['process_activity_name'] in [4,6,8,9,15,16] and process_info['process_step_status'] <4:
-                    filtered_items.append(process_info)
-
-        else:
-            log_and_print("The provided data is neither a list nor a dictionary.", "error")
-
-        # # Check if no items were found
-        # if not filtered_items:
-        #     log_and_print("אין מידע מבוקש", "info",is_hebrew=True)
+        table = _as_process_step_table(process_dict)
+        return table.select(table.role_positions("secretary", table.open_status_ids()))
 
     except Exception as e:
         log_and_print(f"Error filtering process info: {e}", "error")
-
-    # Return the filtered list
-    return filtered_items
+        return []
 
 #################### דיונים #########################
 def fetch_all_discussion_by_case(case_id, server_name, database_name, user_name, password):
@@ -443,36 +395,11 @@ def fetch_all_discussion_by_case(case_id, server_name, database_name, user_name,
     valid_tasks = []  # List to store tasks with valid assignments
 
     try:
-        # Establish connection to SQL Server
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-        cursor = connection.cursor()
+        # Borrow a pooled connection to SQL Server
+        sql_pool = get_sql_pool(server_name, database_name, user_name, password)
+        connection = sql_pool.acquire()
 
-        # SQL query to check for active assignments
-        sql_query = """
-        SELECT 
-            d.[Discussion_Id], d.[Start_Time],
-            dt.[Description_Heb] AS Discussion_Type_Description_Heb,  -- Replacing d.[Discussion_Type_Id] with Description_Heb
-            ds.[Description_Heb] AS Discussion_Status_Description_Heb  -- Replacing d.[Discussion_Status_Id] with Description_Heb
-        FROM 
-            [Discussions].[dbo].[Discussions] d
-        LEFT JOIN 
-            [Discussions].[dbo].[Request_To_Discussions] r ON r.Discussion_Id = d.Discussion_Id
-        LEFT JOIN 
-            [Discussions].[code].[CT_Discussion_Types] dt ON dt.Discussion_Type_Id = d.Discussion_Type_Id
-        LEFT JOIN 
-            [Discussions].[code].[CT_Discussion_Statuses] ds ON ds.Discussion_Status_Id = d.Discussion_Status_Id
-        WHERE 
-            r.Case_Id = ?
-        """
-        cursor.execute(sql_query, case_id)
-        rows = cursor.fetchall()
+        rows = execute_query(connection, "discussions.by_case", case_id)
 
         if not rows:
             log_and_print(f"אין דיונים להציג.", is_hebrew=True)
@@ -482,16 +409,17 @@ def fetch_all_discussion_by_case(case_id, server_name, database_name, user_name,
             
             # Print each tuple's data in one line
             for row in rows:
-                log_and_print(f"דיון לתאריך: {row.Start_Time} - {row.Discussion_Type_Description_Heb} - {row.Discussion_Status_Description_Heb}", is_hebrew=True)
+                log_and_print(f"דיון לתאריך: {row.Start_Time} - {lookup('CT_Discussion_Types', row.Discussion_Type_Id, row.Discussion_Type_Id)} - {lookup('CT_Discussion_Statuses', row.Discussion_Status_Id, row.Discussion_Status_Id)}", is_hebrew=True)
+                emit_record("discussions", case_id=case_id, discussion_id=row.Discussion_Id, start_time=row.Start_Time,
+                            discussion_type_id=row.Discussion_Type_Id, discussion_type=lookup('CT_Discussion_Types', row.Discussion_Type_Id),
+                            discussion_status_id=row.Discussion_Status_Id, discussion_status=lookup('CT_Discussion_Statuses', row.Discussion_Status_Id))
     except Exception as e:
         log_and_print(f"Error querying SQL Server: {e}", "error")
 
     finally:
-        # Close the cursor and connection if they were opened
-        if 'cursor' in locals():
-            cursor.close()
+        # Return the connection to the pool
         if 'connection' in locals():
-            connection.close()
+            sql_pool.release(connection)
 
     return valid_tasks
 
@@ -502,32 +430,16 @@ def check_process_assignment_is_valid(all_waiting_tasks, server_name, database_n
     valid_tasks = []  # List to store tasks with valid assignments
     assignment_type_found = 0
     try:
-        # Establish connection to SQL Server
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-        cursor = connection.cursor()
+        # Borrow a pooled connection to SQL Server
+        sql_pool = get_sql_pool(server_name, database_name, user_name, password)
+        connection = sql_pool.acquire()
 
-        # SQL query to check for active assignments
-        sql_query = """
-        SELECT 1
-        FROM [Responses].[dbo].[Assignments]
-        WHERE Process_Id = ? AND Assignment_Status_Id = ?
-        """
-
-        
         for task in all_waiting_tasks:
             process_id = task.get('process_id')
             if process_id is not None:
                 assignment_type_found = None  # ✅ reset for each task
                 for assign_id in [1, 6]:
-                    cursor.execute(sql_query, process_id, assign_id)
-                    if cursor.fetchone():
+                    if execute_query(connection, "responses.assignment_exists_by_process", process_id, assign_id):
                         assignment_type_found = assign_id
                         break
 
@@ -547,35 +459,32 @@ def check_process_assignment_is_valid(all_waiting_tasks, server_name, database_n
         log_and_print(f"Error querying SQL Server: {e}", "error")
 
     finally:
-        # Close the SQL Server connection
+        # Return the connection to the pool
         if 'connection' in locals():
-            connection.close()
+            sql_pool.release(connection)
 
     return valid_tasks
 
 #######################  יומן תיק ##########################
 
-def parse_requestsLog_by_case_id(case_id: str, db) -> None:
+def parse_requestsLog_by_case_id(case: CaseContext) -> None:
     """
-    Parse the Requests array for a given Case ID, collect all logs, and display detailed information
+    Parse the Requests array of the case, collect all logs, and display detailed information
     including RequestStatusId, ActionLogTypeId, CreateActionUser, CreateActionDate, CreateLogDate, Remark, and ProcessStepId.
 
     Args:
-        case_id (str): The Case ID to fetch data for.
-        db (Database): The MongoDB database connection.
+        case (CaseContext): The case to display.
 
     Returns:
         None
     """
+    case_id = case.case_id
     try:
-        collection = db["Case"]
-        document = collection.find_one({"_id": case_id}, {"Requests": 1, "_id": 0})
-
-        if not document:
+        if not case.exists:
             log_and_print(f"No document found for Case ID {case_id}.", "info", is_hebrew=True)
             return
 
-        requests = document.get("Requests", [])
+        requests = case.requests
         if not isinstance(requests, list):
             log_and_print(f"Invalid 'Requests' field format for Case ID {case_id}.", "info", is_hebrew=True)
             return
@@ -618,6 +527,12 @@ def parse_requestsLog_by_case_id(case_id: str, db) -> None:
             process_step_id = log.get("ProcessStepId", "לא ידוע")
 
             log_and_print(f"תיאור פעולה: {description_action_heb} ,סטטוס: ,{description_heb}, צד:{create_action_user}, תאריך יצירת פעולה: {formatted_value}", is_hebrew=True)
+            emit_record("case_log", case_id=case_id, request_status_id=log.get("RequestStatusId"),
+                        request_status=request_status_mapping.logical(log.get("RequestStatusId"), "Unknown Status"),
+                        action_log_type_id=log.get("ActionLogTypeId"),
+                        action_log_type=action_log_types_mapping.logical(log.get("ActionLogTypeId"), "Unknown Status"),
+                        create_action_user=log.get("CreateActionUser"), create_action_date=log.get("CreateActionDate"),
+                        create_log_date=log.get("CreateLogDate"), remark=log.get("Remark"), process_step_id=log.get("ProcessStepId"))
 
     except Exception as e:
         log_and_print(f"Error parsing Requests log for Case ID {case_id}: {e}", "error",  is_hebrew=True)
@@ -659,33 +574,27 @@ def fetch_case_from_vsearchcase(case_id, involved_identify_id, db):
         log_and_print(f"Error while fetching from vSearchCase: {str(e)}", ansi_format=BOLD_RED)
         return None
 
-def parse_case_involved_representors_by_case_id(case_id: str, db) -> None:
+def parse_case_involved_representors_by_case_id(case: CaseContext) -> None:
     """
-    For a given case ID, retrieve the CaseInvolveds array and list all active representors
+    For the case, go over the CaseInvolveds array and list all active representors
     (with valid appointment period) who exist in the vSearchCase collection.
 
     Args:
-        case_id (str): The Case ID to fetch data for.
-        db (Database): The MongoDB database connection.
+        case (CaseContext): The case to display.
 
     Returns:
         None
     """
+    case_id = case.case_id
     try:
-        collection = db["Case"]
-        document = collection.find_one(
-            {"_id": case_id},
-            {"CaseInvolveds": 1, "CaseDisplayId": 1, "_id": 0}
-        )
-
-        if not document:
+        if not case.exists:
             log_and_print(f"לא נמצא מסמך עבור מספר תיק {case_id}.", "info", is_hebrew=True)
             return
 
-        case_display_id = document.get("CaseDisplayId", "לא ידוע")
+        case_display_id = case.get("CaseDisplayId", "לא ידוע")
         log_and_print(f"\n========= מספר תיק מוצג: {case_display_id} =========", "info", is_hebrew=True)
 
-        case_involveds = document.get("CaseInvolveds", [])
+        case_involveds = case.case_involveds
         if not isinstance(case_involveds, list):
             log_and_print(f"תבנית שגויה של השדה CaseInvolveds עבור תיק {case_id}.", "info", is_hebrew=True)
             return
@@ -715,7 +624,7 @@ def parse_case_involved_representors_by_case_id(case_id: str, db) -> None:
 
                 # Check in vSearchCase collection
                 
-                result = fetch_case_from_vsearchcase(case_id, rep_identify_id, db)
+                result = fetch_case_from_vsearchcase(case_id, rep_identify_id, case.db)
                 if result:
                     valid_representors.append(rep)
 
@@ -730,44 +639,26 @@ def parse_case_involved_representors_by_case_id(case_id: str, db) -> None:
                         indent=4,
                         is_hebrew=True
                     )
+                    emit_record("representors", case_id=case_id, case_display_id=case.display_id,
+                                case_involved_id=involved.get("CaseInvolvedId"), case_involved_name=involved.get("CaseInvolvedName"),
+                                representor_identify_id=rep.get("CaseInvolvedIdentifyId"), representor_name=rep.get("CaseInvolvedName"),
+                                is_legal_aid=is_legal_aid, appointment_start_date=rep.get("AppointmentStartDate"))
             else:
                 log_and_print("אין מייצגים פעילים בתיק זה לאחר אימות מול vSearchCase.", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
 
     except Exception as e:
         log_and_print(f"שגיאה בעת שליפת מידע לתיק {case_id}: {str(e)}", "error", is_hebrew=True)
         
-def get_case_involved_name_by_identify_id(case_id: str, identify_id, db) -> str:
+def get_case_involved_name_by_identify_id(case: CaseContext, identify_id) -> str:
     """
     Search in CaseInvolveds and nested Representors for a matching CaseInvolvedIdentifyId
-    and return the CaseInvolvedName.
+    and return the CaseInvolvedName (a dictionary lookup in the CaseContext index).
     """
     try:
-        collection = db["Case"]
-        document = collection.find_one({"_id": case_id}, {"CaseInvolveds": 1})
-
-        if not document:
+        if not case.exists:
             return "לא ידוע"
 
-        try:
-            identify_id = int(identify_id)
-        except:
-            return "לא ידוע"
-
-        for involved in document.get("CaseInvolveds", []):
-            try:
-                if int(involved.get("CaseInvolvedIdentifyId", -1)) == identify_id:
-                    return involved.get("CaseInvolvedName", "לא ידוע")
-            except:
-                pass
-
-            for rep in involved.get("Representors", []):
-                try:
-                    if int(rep.get("CaseInvolvedIdentifyId", -1)) == identify_id:
-                        return rep.get("CaseInvolvedName", "לא ידוע")
-                except:
-                    pass
-
-        return "לא ידוע"
+        return case.involved_name(identify_id)
 
     except Exception as e:
         log_and_print(
@@ -778,7 +669,7 @@ def get_case_involved_name_by_identify_id(case_id: str, identify_id, db) -> str:
         return "לא ידוע"
 
 
-def print_task_process_info(process_dict):
+def print_task_process_info(process_dict, report="task_processes", case_id=None):
     """Print all elements in the dictionary or list in a specific format, with assignment type prefix."""
     try:
         data_printed = False
@@ -801,6 +692,7 @@ def print_task_process_info(process_dict):
                     prefix = get_assignment_type_label(process_info['valid_assignment_type']) + " - "
 
                 log_and_print(f"{heb_activity_type}={prefix}-{process_info['request_type']} - {process_info['process_id']}", "info", indent=4, is_hebrew=True)
+                _emit_process_step(report, case_id, process_info)
                 return True
             else:
                 log_and_print("Missing expected keys in process info.", "warning")
@@ -841,51 +733,24 @@ def getAllAssignmentsTasks(Case_Id):
     password = os.getenv("DB_PASS")
 
     try:
-        # Establish connection to SQL Server
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
+        # Borrow a pooled connection to SQL Server
+        sql_pool = get_sql_pool(server_name, database_name, user_name, password)
+        connection = sql_pool.acquire()
 
-        cursor = connection.cursor()
-      
-        # SQL Query 1: Get ProcessID and ProcessTypeName
-        sql_query = """
-            SELECT TOP (1000) asg.[Assignment_Id]
-            ,asg.[Case_Id]
-            ,asg.[Request_Id]
-            ,asg.[Decision_Id]
-            ,asg.[Decision_Moj_Id]
-            ,asg.[Assignment_Type_Id]
-            ,ast.[Description_Heb]
-            ,asg.[Due_Date]
-            ,asg.[Assignment_Status_Id]
-            ,ass.[Description_Heb]
-            ,asg.[Is_Active]
-            ,asg.[Site_Action_Id]
-            
-        FROM [Responses].[dbo].[Assignments] as asg
-        left join [Responses].[dbo].[CT_Assignment_Types] as ast 
-        on ast.[Assignment_Type_Id] = asg.[Assignment_Type_Id]
-        left join [Responses].[dbo].[CT_Assignment_Status_Types] as ass			
-        on ass.[Assignment_Status_Type_Id] = asg.[Assignment_Status_Id]
-        where asg.[Case_Id]= ?;
-        """
-        
-        cursor.execute(sql_query, (Case_Id,))  # Use a tuple for parameters
-        rows = cursor.fetchall()
+        rows = execute_query(connection, "responses.assignments_by_case", Case_Id)
 
         if rows:
             for row in rows:
                 
-                due_date = row[7].strftime("%Y-%m-%d %H:%M:%S") if row[7] else "אין תאריך יעד"
+                due_date = row[6].strftime("%Y-%m-%d %H:%M:%S") if row[6] else "אין תאריך יעד"
               
                 log_and_print(
-                    f"מטלה {row[6]}-- בסטטוס: {row[9]}, תאריך יעד: {due_date}","info",BOLD_YELLOW,is_hebrew=True)
+                    f"מטלה {lookup('CT_Assignment_Types', row[5], row[5])}-- בסטטוס: {lookup('CT_Assignment_Status_Types', row[7], row[7])}, תאריך יעד: {due_date}","info",BOLD_YELLOW,is_hebrew=True)
+                emit_record("assignments", case_id=Case_Id, assignment_id=row[0], request_id=row[2], decision_id=row[3],
+                            decision_moj_id=row[4], assignment_type_id=row[5], assignment_type=lookup('CT_Assignment_Types', row[5]),
+                            due_date=row[6], assignment_status_id=row[7],
+                            assignment_status=lookup('CT_Assignment_Status_Types', row[7]),
+                            is_active=row[8], site_action_id=row[9])
         else:
             log_and_print(f"אין מטלות בתיק","info",BOLD_YELLOW, is_hebrew=True)
 
@@ -893,9 +758,9 @@ def getAllAssignmentsTasks(Case_Id):
         log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
 
     finally:
-        # Close the SQL Server connection
+        # Return the connection to the pool
         if 'connection' in locals():
-            connection.close()
+            sql_pool.release(connection)
             #log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)    
 
 
@@ -913,59 +778,32 @@ def getBOActions(Case_Id):
     password = os.getenv("DB_PASS")
 
     try:
-        # Establish connection to SQL Server
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
+        # Borrow a pooled connection to SQL Server
+        sql_pool = get_sql_pool(server_name, database_name, user_name, password)
+        connection = sql_pool.acquire()
 
-        cursor = connection.cursor()
-      
-        # SQL Query 1: Get ProcessID and ProcessTypeName
-        sql_query = """
-            SELECT TOP (1000)
-            bo_a.[BO_Actions_Id],
-            at.[Description_Heb] AS Bo_Action_Description,
-            bo_a.[Action_Description],
-        --   bo_a.[Request_Type_Id],
-            bo_a.[Case_ID],
-            bo_a.[Request_Id],
-            bo_a.[Action_Create_User],
-            bo_a.[Involved_Category_Type_Id],
-            bo_a.[Action_Time],
-        --    bo_a.[Entity_Type_Id],
-            en_main.EntityName AS Entity_Type_Description,
-            bo_a.[Entity_value],
-            bo_a.[Source_Description],
-        --  bo_a.[Source_Entity_Type_Id],
-            en_source.EntityName AS Source_Entity_Type_Description,
-            bo_a.[Source_Entity_Value],
-            bo_a.[Source_Create_Date]
-        FROM [CaseManagement_BO].[dbo].[BO_Actions] AS bo_a
-        -- Join to get Hebrew description of Bo_Action_Type_Id
-        JOIN [CaseManagement_BO].[dbo].[CT_BO_Action_Types] AS at
-            ON bo_a.[Bo_Action_Type_Id] = at.[BO_Action_Type_Id]
-        -- Join for Entity_Type_Id
-        JOIN [CaseManagement_BO].[doc].[Entity] AS en_main
-            ON en_main.EntityID = bo_a.[Entity_Type_Id]
-        -- Join for Source_Entity_Type_Id
-        LEFT JOIN [CaseManagement_BO].[doc].[Entity] AS en_source
-            ON en_source.EntityID = bo_a.[Source_Entity_Type_Id]
-        where bo_a.[Case_ID] = ?;
-        """
-        
-        cursor.execute(sql_query, (Case_Id,))  # Use a tuple for parameters
-        rows = cursor.fetchall()
+        rows = execute_query(connection, "bo.actions_by_case", Case_Id)
+
+        # The action type and the entity were INNER joins: actions without them are not listed.
+        # Only a table the snapshot holds in full can tell; otherwise the rows are kept with raw IDs.
+        if lookup_snapshot.loaded('CT_BO_Action_Types'):
+            rows = [row for row in rows if lookup('CT_BO_Action_Types', row[1]) is not None]
+        if lookup_snapshot.loaded('Entity'):
+            rows = [row for row in rows if lookup('Entity', row[8]) is not None]
 
         if rows:
             for row in rows:
+                bo_action_type = lookup('CT_BO_Action_Types', row[1])
                 action_date = row[7].strftime("%Y-%m-%d %H:%M:%S") if row[7] else "אין תאריך"
                 log_and_print(
-                    f"{row[1]}- מקור: {row[10]}, יעד: {row[2]}, בתאריך: {action_date}","info",BOLD_YELLOW,is_hebrew=True)
+                    f"{row[1] if bo_action_type is None else bo_action_type}- מקור: {row[10]}, יעד: {row[2]}, בתאריך: {action_date}","info",BOLD_YELLOW,is_hebrew=True)
+                emit_record("bo_actions", case_id=Case_Id, bo_action_id=row[0], bo_action_type_id=row[1],
+                            bo_action_type=bo_action_type, action_description=row[2], request_id=row[4],
+                            action_create_user=row[5], involved_category_type_id=row[6], action_time=row[7],
+                            entity_type_id=row[8], entity_type=lookup('Entity', row[8]), entity_value=row[9],
+                            source_description=row[10], source_entity_type_id=row[11],
+                            source_entity_type=lookup('Entity', row[11]) if row[11] is not None else None,
+                            source_entity_value=row[12], source_create_date=row[13])
         else:
             log_and_print(f"אין מידע רלוונטי","info",BOLD_YELLOW, is_hebrew=True)
 
@@ -973,8 +811,8 @@ def getBOActions(Case_Id):
         log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
 
     finally:
-        # Close the SQL Server connection
+        # Return the connection to the pool
         if 'connection' in locals():
-            connection.close()
+            sql_pool.release(connection)
             #log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)    
     
\ No newline at end of file
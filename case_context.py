@@ -0,0 +1,249 @@
+import threading
+from logging_utils import logger
+
+# Parts of the Case document the managers read; the rest of the document is never fetched
+CASE_SECTIONS = ("Requests", "Decisions", "CaseInvolveds")
+
+# Small top-level fields loaded with every section
+CASE_HEADER_FIELDS = ("CaseDisplayId", "CourtId")
+
+
+def _identify_key(value):
+    """CaseInvolvedIdentifyId as stored (int or numeric string) -> int, None when not numeric."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _process_ids_pipeline(match):
+    """
+    Aggregation pipeline that unwinds Requests.Processes server-side and returns one
+    {_id, ProcessId, RequestTypeId, LastPublishDate} document per process, ordered by case,
+    then request order, then LastPublishDate (array order breaks ties, like a stable sort).
+    """
+    return [
+        {"$match": match},
+        {"$project": {
+            "Requests.RequestTypeId": 1,
+            "Requests.Processes.ProcessId": 1,
+            "Requests.Processes.LastPublishDate": 1
+        }},
+        {"$unwind": {"path": "$Requests", "includeArrayIndex": "RequestIndex"}},
+        {"$unwind": {"path": "$Requests.Processes", "includeArrayIndex": "ProcessIndex"}},
+        {"$match": {
+            "Requests.Processes.ProcessId": {"$nin": [None, ""]},
+            "Requests.Processes.LastPublishDate": {"$ne": None}
+        }},
+        {"$sort": {"_id": 1, "RequestIndex": 1, "Requests.Processes.LastPublishDate": 1, "ProcessIndex": 1}},
+        {"$project": {
+            "_id": 1,
+            "ProcessId": "$Requests.Processes.ProcessId",
+            "RequestTypeId": {"$ifNull": ["$Requests.RequestTypeId", "N/A"]},
+            "LastPublishDate": "$Requests.Processes.LastPublishDate"
+        }}
+    ]
+
+
+def fetch_process_rows_by_case_ids(case_ids, db, court_id=None):
+    """
+    Fetch (ProcessId, RequestTypeId, LastPublishDate) of many cases in one `$in` round trip,
+    already sorted by the server.
+
+    Args:
+        case_ids (list): Case IDs (_id) to fetch.
+        db: The MongoDB database connection object.
+        court_id (int, optional): When given, only cases of this CourtId are matched.
+
+    Returns:
+        dict: {case_id: [(ProcessId, RequestTypeId, LastPublishDate), ...]}, cases without
+            processes are missing from the result.
+    """
+    match = {"_id": {"$in": list(case_ids)}}
+    if court_id is not None:
+        match["CourtId"] = court_id
+
+    rows_by_case = {}
+    for row in db["Case"].aggregate(_process_ids_pipeline(match)):
+        rows_by_case.setdefault(row["_id"], []).append((row["ProcessId"], row["RequestTypeId"], row["LastPublishDate"]))
+    return rows_by_case
+
+
+class CaseContext:
+    """
+    The Case document of one case, read once per session and shared by every manager,
+    with dictionaries indexed the way the managers look things up.
+
+    Sections (Requests, Decisions, CaseInvolveds) are loaded on first use: the ones given in
+    `sections` together in one find_one, any other one later with its own find_one. The process
+    list is read with the server-side aggregation of fetch_process_rows_by_case_ids on first use.
+    refresh() (menu 13) drops everything so the next access reads the case again.
+
+    Example:
+        case = CaseContext(case_id, db)
+        parse_requests_by_case_id(case)
+        request = case.requests_by_id.get(request_id)
+    """
+
+    def __init__(self, case_id, db, sections=CASE_SECTIONS):
+        self.case_id = case_id
+        self.db = db
+        self.sections = tuple(sections)
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def refresh(self):
+        """Forget the loaded sections and indexes."""
+        with self._lock:
+            self._document = {}
+            self._loaded = set()
+            self._found = None
+            self._indexes = {}
+
+    def _load(self, section=None):
+        """Read `section` (None: the configured sections) unless it was read already."""
+        with self._lock:
+            if section is None and self._found is not None or section in self._loaded:
+                return
+            missing = [name for name in self.sections if name not in self._loaded]
+            if section is not None and section not in missing:
+                missing = [section]
+            projection = {name: 1 for name in (*missing, *CASE_HEADER_FIELDS)}
+            document = self.db["Case"].find_one({"_id": self.case_id}, projection)
+            logger.debug(f"CaseContext {self.case_id}: loaded {', '.join(missing) or 'header'}")
+            self._fill(document, missing)
+
+    def _fill(self, document, sections):
+        """Store a (projected) Case document read for `sections`; None when the case does not exist."""
+        with self._lock:
+            self._found = document is not None
+            self._document.update(document or {})
+            self._loaded.update(sections)
+
+    @classmethod
+    def load_many(cls, case_ids, db, sections=CASE_SECTIONS):
+        """
+        Batch form for audits over many cases: read `sections` of every case in one `$in` round trip.
+
+        Returns:
+            dict: {case_id: CaseContext} in `case_ids` order, also for cases that do not exist.
+        """
+        contexts = {case_id: cls(case_id, db, sections) for case_id in case_ids}
+        projection = {name: 1 for name in (*sections, *CASE_HEADER_FIELDS)}
+        documents = {document["_id"]: document for document in db["Case"].find({"_id": {"$in": list(contexts)}}, projection)}
+        for case_id, context in contexts.items():
+            context._fill(documents.get(case_id), sections)
+        logger.debug(f"CaseContext: loaded {', '.join(sections)} of {len(documents)}/{len(contexts)} cases")
+        return contexts
+
+    def get(self, field, default=None):
+        """A top-level field of the Case document (a section, CaseDisplayId or CourtId)."""
+        self._load(field if field in CASE_SECTIONS else None)
+        return self._document.get(field, default)
+
+    @property
+    def exists(self):
+        """False when there is no Case document with this _id."""
+        self._load()
+        return self._found
+
+    @property
+    def display_id(self):
+        return self.get("CaseDisplayId")
+
+    @property
+    def court_id(self):
+        return self.get("CourtId")
+
+    @property
+    def requests(self):
+        return self.get("Requests", [])
+
+    @property
+    def decisions(self):
+        return self.get("Decisions", [])
+
+    @property
+    def case_involveds(self):
+        return self.get("CaseInvolveds", [])
+
+    ############################# indexes #########################
+
+    def _index(self, name, build):
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None:
+                index = self._indexes[name] = build()
+            return index
+
+    @staticmethod
+    def _as_list(value):
+        return value if isinstance(value, list) else []
+
+    @property
+    def requests_by_id(self):
+        """{RequestId: request}"""
+        return self._index("requests_by_id", lambda: {
+            request.get("RequestId"): request for request in self._as_list(self.requests)
+            if request.get("RequestId") is not None
+        })
+
+    @property
+    def request_type_by_id(self):
+        """{RequestId: RequestTypeId} of the requests that have both."""
+        return self._index("request_type_by_id", lambda: {
+            request_id: request.get("RequestTypeId") for request_id, request in self.requests_by_id.items()
+            if request.get("RequestTypeId") is not None
+        })
+
+    @property
+    def decisions_by_id(self):
+        """{DecisionId: decision}"""
+        return self._index("decisions_by_id", lambda: {
+            decision.get("DecisionId"): decision for decision in self._as_list(self.decisions)
+            if decision.get("DecisionId") is not None
+        })
+
+    def _build_involveds_by_identify_id(self):
+        # First match wins, in document order: an involved before its own representors
+        index = {}
+        for involved in self._as_list(self.case_involveds):
+            key = _identify_key(involved.get("CaseInvolvedIdentifyId"))
+            if key is not None:
+                index.setdefault(key, involved)
+            for representor in involved.get("Representors") or []:
+                key = _identify_key(representor.get("CaseInvolvedIdentifyId"))
+                if key is not None:
+                    index.setdefault(key, representor)
+        return index
+
+    @property
+    def involveds_by_identify_id(self):
+        """{int(CaseInvolvedIdentifyId): involved or representor}"""
+        return self._index("involveds_by_identify_id", self._build_involveds_by_identify_id)
+
+    def _build_processes_by_id(self):
+        # Sorted by the aggregation on the server; like the dictionaries it replaces, a duplicate
+        # ProcessId keeps its first position and the values of its last occurrence
+        index = {}
+        for process_id, request_type_id, last_publish_date in fetch_process_rows_by_case_ids([self.case_id], self.db).get(self.case_id, []):
+            index[process_id] = {
+                "ProcessId": process_id,
+                "RequestTypeId": request_type_id,
+                "LastPublishDate": last_publish_date,
+            }
+        return index
+
+    @property
+    def processes_by_id(self):
+        """
+        {ProcessId: {ProcessId, RequestTypeId, LastPublishDate}} in request order, then
+        LastPublishDate order; processes without ProcessId or LastPublishDate are left out.
+        Read with its own aggregation (fetch_process_rows_by_case_ids), not from the Requests section.
+        """
+        return self._index("processes_by_id", self._build_processes_by_id)
+
+    def involved_name(self, identify_id, default="לא ידוע"):
+        """CaseInvolvedName of the involved / representor with this CaseInvolvedIdentifyId."""
+        involved = self.involveds_by_identify_id.get(_identify_key(identify_id))
+        return involved.get("CaseInvolvedName", default) if involved is not None else default
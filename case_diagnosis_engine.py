@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+from logging_utils import log_and_print, capture_output, write_console, flush_console, BOLD_YELLOW, BOLD_GREEN, BOLD_RED
+from request_data_manager import parse_requests_by_case_id
+from decision_data_manager import fetch_decisions_and_documents_by_case_id
+from document_data_manager import fetch_documents_by_case_id
+from process_data_manager import get_case_processes
+from task_module_manager import fetch_tasks_by_case
+from bpm_utils import (print_process_info,
+                       filter_internal_judge_task_process_status,
+                       filter_population_process_status,
+                       fetch_all_discussion_by_case,
+                       parse_requestsLog_by_case_id,
+                       parse_case_involved_representors_by_case_id,
+                       getAllAssignmentsTasks,
+                       getBOActions)
+
+# Maximum number of sections fetched at the same time (each one holds a thread and at most one SQL connection)
+DIAGNOSIS_WORKERS = int(os.getenv("DIAGNOSIS_WORKERS", "12"))
+
+
+def _run_captured(func, *args):
+    """Run one section in the current (worker) thread with its console output captured."""
+    with capture_output() as lines:
+        try:
+            result = func(*args)
+        except Exception as e:
+            log_and_print(f"Error: {e}", "error", BOLD_RED)
+            result = None
+    return result, lines
+
+
+async def _section(semaphore, func, *args):
+    async with semaphore:
+        _, lines = await asyncio.to_thread(_run_captured, func, *args)
+    return lines
+
+
+async def _process_section(semaphore, processes_task, render, case_id):
+    """Sections 4, 6 and 8 share one process snapshot; the load output is shown with the first of them."""
+    processes, load_lines = await processes_task
+    async with semaphore:
+        _, lines = await asyncio.to_thread(_run_captured, render, processes, case_id)
+    return lines, load_lines
+
+
+def _render_processes(processes, case_id):
+    print_process_info(processes, report="processes", case_id=case_id)
+
+
+def _render_judge_tasks(processes, case_id):
+    print_process_info(filter_internal_judge_task_process_status(processes), report="judge_tasks", case_id=case_id)
+
+
+def _render_populations(processes, case_id):
+    print_process_info(filter_population_process_status(processes), report="distributions", case_id=case_id)
+
+
+async def diagnose_case_async(case, server_name, database_name, user_name, password):
+    """
+    Run every read-only section of the menu (1-11 and the Task API) for one case concurrently and
+    return [(title, lines)] in menu order. Mongo, SQL and HTTP calls are blocking, so each section runs
+    in a worker thread; total latency is the slowest section instead of the sum of all of them.
+    """
+    semaphore = asyncio.Semaphore(DIAGNOSIS_WORKERS)
+    case_id = case.case_id
+    connection_args = (server_name, database_name, user_name, password)
+
+    async def load_processes():
+        async with semaphore:
+            return await asyncio.to_thread(_run_captured, get_case_processes, case, *connection_args)
+
+    processes_task = asyncio.ensure_future(load_processes())
+
+    sections = [
+        ("שאילתת בקשות בתיק", _section(semaphore, parse_requests_by_case_id, case)),
+        ("החלטות בתיק", _section(semaphore, fetch_decisions_and_documents_by_case_id, case)),
+        ("מסמכים בתיק", _section(semaphore, fetch_documents_by_case_id, case)),
+        ("תהליכים בתיק", _process_section(semaphore, processes_task, _render_processes, case_id)),
+        ("מטלות בתיק", _section(semaphore, getAllAssignmentsTasks, case_id)),
+        ("משימות לדיין בתיק", _process_section(semaphore, processes_task, _render_judge_tasks, case_id)),
+        ("משימות ממודול המשימות", _section(semaphore, fetch_tasks_by_case, case_id)),
+        ("דיונים בתיק", _section(semaphore, fetch_all_discussion_by_case, case_id, *connection_args)),
+        ("הפצות בתיק", _process_section(semaphore, processes_task, _render_populations, case_id)),
+        ("יומן תיק", _section(semaphore, parse_requestsLog_by_case_id, case)),
+        ("מייצגים פעילים", _section(semaphore, parse_case_involved_representors_by_case_id, case)),
+        ("תור שינוי סיווג", _section(semaphore, getBOActions, case_id)),
+    ]
+    results = await asyncio.gather(*(coroutine for _, coroutine in sections))
+
+    report = []
+    load_lines_shown = False
+    for (title, _), result in zip(sections, results):
+        if isinstance(result, tuple):
+            lines, load_lines = result
+            if not load_lines_shown:
+                lines = load_lines + lines
+                load_lines_shown = True
+        else:
+            lines = result
+        report.append((title, lines))
+    return report
+
+
+def run_case_diagnosis(case, server_name, database_name, user_name, password):
+    """Full case diagnosis: fetch all sections concurrently, then print them one after the other in menu order."""
+    start = time.perf_counter()
+    report = asyncio.run(diagnose_case_async(case, server_name, database_name, user_name, password))
+
+    for title, lines in report:
+        log_and_print(f"\n##########-- {title} --##########", "info", BOLD_YELLOW, indent=4, is_hebrew=True)
+        for line in lines:
+            write_console(line)
+        flush_console()
+
+    log_and_print(f"\nאבחון התיק הושלם ב-{time.perf_counter() - start:.1f} שניות", "info", BOLD_GREEN, is_hebrew=True)
@@ -1,18 +1,17 @@
 
 import ctypes
 from config import load_configuration
-from pymongo import MongoClient
+from mongo_client_factory import create_mongo_client
 from dotenv import load_dotenv
-from process_data_manager import execute_sql_process_queries, fetch_process_ids_by_case_id_sorted,execute_sql_process_tasks,execute_sql_all_processes
+from process_data_manager import execute_sql_process_queries, fetch_process_ids_by_case_id_sorted,execute_sql_process_tasks,execute_sql_all_processes,get_case_processes
 from document_data_manager import fetch_documents_by_case_id
 from decision_data_manager import fetch_decisions_and_documents_by_case_id
 from request_data_manager import parse_requests_by_case_id
-from logging_utils import log_and_print, normalize_hebrew, BOLD_YELLOW, BOLD_GREEN, BOLD_RED
+from logging_utils import log_and_print, normalize_hebrew, prompt_input, flush_console, BOLD_YELLOW, BOLD_GREEN, BOLD_RED
 from colorama import init, Fore, Style
 from ldap import run_all_ntlm_requests
 from task_module_manager import fetch_decisions_by_case_id,check_assignments_for_decisions,fetch_tasks_by_case
 from bpm_utils import (fetch_process_ids_and_request_type_by_case_id_sorted,
-                       bpm_collect_all_processes_steps_and_status,
                        print_process_info,
                        filter_process_info_by_waiting_for_task_status,
                        check_process_assignment_is_valid,
@@ -21,10 +20,19 @@ from bpm_utils import (fetch_process_ids_and_request_type_by_case_id_sorted,
                        filter_internal_secretery_task_process_status,
                        fetch_all_discussion_by_case,parse_requestsLog_by_case_id,
                        parse_case_involved_representors_by_case_id,print_task_process_info,
-                       getAllAssignmentsTasks,getBOActions) 
+                       getAllAssignmentsTasks,getBOActions,
+                       watch_process_info) 
 
 import os
 from decision_data_manager import getDecisionHebDesc
+from process_snapshot_cache import process_snapshot_cache
+from sql_connection_manager import close_all_sql_connections
+from case_diagnosis_engine import run_case_diagnosis
+from code_table_cache import refresh_code_tables
+from lookup_snapshot import lookup_snapshot
+from backend_metrics import begin_action, end_action
+from backend_recorder import install_backend_recorder
+from case_context import CaseContext
 
 # Initialize colorama
 init(autoreset=True)
@@ -87,7 +95,7 @@ def connect_to_mongodb(mongo_connection, db_name="CaseManagement"):
     """
     try:
         log_and_print("Connecting to MongoDB...", ansi_format=BOLD_YELLOW)
-        mongo_client = MongoClient(mongo_connection,minPoolSize=5)
+        mongo_client = create_mongo_client(mongo_connection)
         db = mongo_client[db_name]
         log_and_print("Connected to MongoDB successfully.\n", ansi_format=BOLD_GREEN)
         return mongo_client, db
@@ -169,10 +177,13 @@ def display_menu():
     log_and_print("מייצגים פעילים- שיקוף לאתר - 10", "info", BOLD_GREEN, is_hebrew=True)
     log_and_print("תור שינוי סיווג - 11", "info", BOLD_GREEN, is_hebrew=True)
    # log_and_print("שינוי הרשאות - 12", "info", BOLD_GREEN, is_hebrew=True)
+    log_and_print("רענון נתוני תהליכים - 13", "info", BOLD_GREEN, is_hebrew=True)
+    log_and_print("מעקב חי אחר תהליכים - 14", "info", BOLD_GREEN, is_hebrew=True)
+    log_and_print("אבחון מלא של התיק - 15", "info", BOLD_GREEN, is_hebrew=True)
     log_and_print("יציאה - 12", "info", BOLD_GREEN, is_hebrew=True)
 
     try:
-        choice = int(input(f"Enter your choice: "))
+        choice = int(prompt_input(f"Enter your choice: "))
         return choice
     except ValueError:
         log_and_print("Invalid input. Please enter a number.", "error")
@@ -194,7 +205,7 @@ def get_case_id_by_displayed_id(db):
     while True:
         try:
             # Prompt the user for Case Displayed ID or Site Action ID
-            user_input = input("Please enter the Case Displayed ID (e.g., 1018/25) or Site Action ID (e.g., 67371): ").strip()
+            user_input = prompt_input("Please enter the Case Displayed ID (e.g., 1018/25) or Site Action ID (e.g., 67371): ").strip()
 
             if not user_input:
                 log_and_print("Input cannot be empty. Please try again.", "error")
@@ -338,6 +349,9 @@ if __name__ == "__main__":
         load_dotenv()
         load_configuration()
 
+        # Record / replay the backend calls (BACKEND_RECORD_MODE)
+        install_backend_recorder()
+
         # MongoDB connection string
         mongo_connection_string = os.getenv("MONGO_CONNECTION_STRING", "")
 
@@ -356,14 +370,18 @@ if __name__ == "__main__":
         # Request Case Display ID from the user
         case_id = get_case_id_by_displayed_id(db)
 
+        # The Case document is read once for the whole session (menu 13 reads it again)
+        case = CaseContext(case_id, db)
+
         while True:
             IsOtherTask = False
             IsJudgeTask = False
             choice = display_menu()
+            begin_action(f"menu_{choice}")
 
             if choice == 1:
                 log_and_print(f"\n##########--שאילתת בקשות בתיק--########", BOLD_YELLOW, indent=4,is_hebrew=True)
-                results = parse_requests_by_case_id(case_id, db)
+                results = parse_requests_by_case_id(case)
                 if results:
                     log_and_print(f"\nניתוח בקשות הושלם", BOLD_YELLOW, indent=4,is_hebrew=True)
                 else:
@@ -371,7 +389,7 @@ if __name__ == "__main__":
 
             elif choice == 2:
                 log_and_print(f"\n##########--  החלטות בתיק --##########", BOLD_YELLOW, indent=4,is_hebrew=True)
-                results = fetch_decisions_and_documents_by_case_id(case_id, db)
+                results = fetch_decisions_and_documents_by_case_id(case)
                 if results:
                     log_and_print(f"\nניתוח החלטות הושלם", BOLD_YELLOW, indent=4,is_hebrew=True)
                 else:
@@ -379,14 +397,13 @@ if __name__ == "__main__":
 
             elif choice == 3:
                 log_and_print(f"\n##########-- מסמכים בתיק --##########", BOLD_YELLOW, indent=4,is_hebrew=True)
-                fetch_documents_by_case_id(case_id, db)
+                fetch_documents_by_case_id(case)
 
                         
             elif choice == 4:
                 log_and_print(f"\n##########-- תהליכים בתיק --##########", "info", BOLD_YELLOW, indent=4,is_hebrew=True)
-                process_dic = fetch_process_ids_and_request_type_by_case_id_sorted(case_id, db)
-                processes_dic = bpm_collect_all_processes_steps_and_status(server_name, database_name, user_name, password, process_dic)
-                print_process_info(processes_dic)
+                processes_dic = get_case_processes(case, server_name, database_name, user_name, password)
+                print_process_info(processes_dic, report="processes", case_id=case_id)
 
             
             elif choice == 5:
@@ -404,10 +421,9 @@ if __name__ == "__main__":
             elif choice == 6:
                 #1083/tasks= fetch_tasks_by_case(case_id)
                 log_and_print(f"\n##########-- משימות לדיין בתיק  --##########", BOLD_YELLOW, indent=4,is_hebrew=True)
-                process_dic = fetch_process_ids_and_request_type_by_case_id_sorted(case_id, db)
-                processes_dic = bpm_collect_all_processes_steps_and_status(server_name, database_name, user_name, password, process_dic)
+                processes_dic = get_case_processes(case, server_name, database_name, user_name, password)
                 judge_task_processes = filter_internal_judge_task_process_status(processes_dic)
-                print_process_info(judge_task_processes)
+                print_process_info(judge_task_processes, report="judge_tasks", case_id=case_id)
 
             elif choice == 7:
                 log_and_print(f"\n##########-- דיונים בתיק  --##########", BOLD_YELLOW, indent=4,is_hebrew=True)
@@ -419,16 +435,15 @@ if __name__ == "__main__":
                 # print_process_info(sec_task_processes)
 
             elif choice == 8:
-                process_dic = fetch_process_ids_and_request_type_by_case_id_sorted(case_id, db)
-                processes_dic = bpm_collect_all_processes_steps_and_status(server_name, database_name, user_name, password, process_dic)
+                processes_dic = get_case_processes(case, server_name, database_name, user_name, password)
                 popultion_process = filter_population_process_status(processes_dic)
-                print_process_info(popultion_process)
+                print_process_info(popultion_process, report="distributions", case_id=case_id)
             
             elif choice == 9:
-                parse_requestsLog_by_case_id(case_id, db)
+                parse_requestsLog_by_case_id(case)
                         
             elif choice == 10:
-                parse_case_involved_representors_by_case_id(case_id, db)
+                parse_case_involved_representors_by_case_id(case)
 
             elif choice == 11:
                 getBOActions(case_id)
@@ -439,10 +454,34 @@ if __name__ == "__main__":
             elif choice == 12:
                 log_and_print("Exiting application.", "info")
                 break
+
+            elif choice == 13:
+                case.refresh()
+                process_snapshot_cache.invalidate(case_id)
+                refresh_code_tables()
+                lookup_snapshot.refresh()
+
+            elif choice == 14:
+                log_and_print(f"\n##########-- מעקב חי אחר תהליכים בתיק --##########", "info", BOLD_YELLOW, indent=4,is_hebrew=True)
+                # Live mode: read the processes of the case again
+                case.refresh()
+                process_dic = fetch_process_ids_and_request_type_by_case_id_sorted(case)
+                watch_process_info(server_name, database_name, user_name, password, process_dic)
+                process_snapshot_cache.invalidate(case_id)
+
+            elif choice == 15:
+                log_and_print(f"\n##########-- אבחון מלא של התיק --##########", "info", BOLD_YELLOW, indent=4,is_hebrew=True)
+                run_case_diagnosis(case, server_name, database_name, user_name, password)
+
+            end_action()
+
+            # End of the report section: show it in one write
+            flush_console()
             
     except Exception as e:
         log_and_print(f"An unexpected error occurred: {e}", "error")
     finally:
+        close_all_sql_connections()
         if mongo_client:
             mongo_client.close()
             log_and_print("MongoDB connection closed.")
@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+from logging_utils import log_and_print, BOLD_RED
+from sql_connection_manager import get_sql_pool
+from sql_query_catalog import execute_query
+
+# How long (seconds) a code table is served from memory before it is loaded again
+CODE_TABLE_TTL_SECONDS = int(os.getenv("CODE_TABLE_TTL_SECONDS", "3600"))
+
+
+class CodeTableCache:
+    """
+    One SQL Server code table held in memory as {key: description}. The whole table is loaded
+    with a single query on first use and again once it is older than the TTL, so lookups per
+    document / decision never go to the server.
+    """
+
+    def __init__(self, name, loader, ttl_seconds=CODE_TABLE_TTL_SECONDS):
+        self.name = name
+        self.loader = loader  # loader(connection) -> {key: description}
+        self.ttl_seconds = ttl_seconds
+        self._table = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        table = {}
+        try:
+            # Borrow a pooled connection to SQL Server (DB_SERVER / DB_NAME from .env)
+            sql_pool = get_sql_pool()
+            connection = sql_pool.acquire()
+            table = self.loader(connection)
+        except Exception as e:
+            # Keep serving the previous table (or an empty one) until the next TTL expiry
+            log_and_print(f"Error loading code table {self.name}: {e}", "error", BOLD_RED)
+            table = self._table or {}
+        finally:
+            if 'connection' in locals():
+                sql_pool.release(connection)
+        self._table = table
+        self._loaded_at = time.monotonic()
+
+    def get(self, key, default=None):
+        """Return the description of `key`, loading the table first when needed."""
+        with self._lock:
+            if self._table is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                self._load()
+            return self._table.get(key, default)
+
+    def invalidate(self):
+        """Drop the table; the next lookup loads it again."""
+        with self._lock:
+            self._table = None
+
+
+def _load_document_types(connection):
+    return {row[0]: row[1] for row in execute_query(connection, "bo.document_types")}
+
+
+def _load_decision_types(connection):
+    # row[3] is the column the old per-decision lookup returned as row[2]
+    court_id = int(os.getenv("COURT_ID", "0"))
+    return {row[0]: row[3] for row in execute_query(connection, "bo.decision_types_by_court", court_id)}
+
+
+document_types = CodeTableCache("CT_Document_Types", _load_document_types)
+decision_types = CodeTableCache("lt_decision_type_to_court", _load_decision_types)
+
+
+def refresh_code_tables():
+    """Manual refresh: drop every cached code table."""
+    document_types.invalidate()
+    decision_types.invalidate()
+    log_and_print("Code table cache cleared.", "info")
@@ -6,9 +6,11 @@ from logging_utils import BOLD_YELLOW, BOLD_GREEN, BOLD_RED
 from doc_header_map import DOCUMENT_TYPE_MAPPING, DOCUMENT_CATEGORY_MAPPING # Import the mapping table
 from rtl_task_mappings import decision_type_mapping
 from request_data_manager import get_request_description
+from request_status_mapping import request_type_mapping
+from case_context import CaseContext
 from config import load_configuration
-import os
-import pyodbc
+from code_table_cache import decision_types
+from report_output import emit_record
 
 # Decision status descriptions
 DECISION_STATUS_DESCRIPTIONS = {
@@ -20,84 +22,50 @@ DECISION_STATUS_DESCRIPTIONS = {
 
 
 def getDecisionHebDesc(DecTypeToCourtId):
-   
-      
-    decision_desc = ''
-    # MongoDB connection string
-    mongo_connection_string = os.getenv("MONGO_CONNECTION_STRING", "")
-
-    # SQL Server connection parameters
-    server_name = os.getenv("DB_SERVER")
-    database_name = os.getenv("DB_NAME")
-    user_name = os.getenv("DB_USER")
-    password = os.getenv("DB_PASS")
+    """Hebrew description of a court decision type, served from the in-memory decision types of COURT_ID."""
+    return decision_types.get(DecTypeToCourtId, '')
 
-    try:
-        # Establish connection to SQL Server
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-
-        cursor = connection.cursor()
-      
-        # SQL Query 1: Get ProcessID and ProcessTypeName
-        sql_query = """
-        select * from CaseManagement_BO.dbo.lt_decision_type_to_court l 
-        join CaseManagement_BO..CT_Decision_Types dc on dc.Decision_Type_Id = l.Decision_Type_Id
-        where  l.Decision_Type_To_Court_ID = ?;
-        """
-        
-        cursor.execute(sql_query, (DecTypeToCourtId,))  # Use a tuple for parameters
-        row = cursor.fetchall()
-
-        if row:
-            decision_desc =row[0][2]
-            
-    except Exception as e:
-        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
-
-    finally:
-        # Close the SQL Server connection
-        if 'connection' in locals():
-            connection.close()
-            #log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)    
-
-    return decision_desc
 
 def get_decision_status_description(status_id: Optional[int]) -> str:
     """Fetch the description for a given DecisionStatusTypeId."""
     return DECISION_STATUS_DESCRIPTIONS.get(status_id, "Unknown")
 
-def fetch_decisions_and_documents_by_case_id(case_id: str, db) -> List[Dict[str, Any]]:
+
+def _emit_decision_document(case_id, decision_id, request_id, doc):
+    """Structured record of one decision document (request_id is None for documents of the decision only)."""
+    document_type_id = doc.get("DocumentTypeId")
+    emit_record("decision_documents", case_id=case_id, decision_id=decision_id, request_id=request_id,
+                document_id=doc.get("_id"), file_name=doc.get("FileName"), moj_id=doc.get("MojId"),
+                document_type_id=document_type_id,
+                document_type=DOCUMENT_TYPE_MAPPING.logical(document_type_id, f"Unknown ({document_type_id})"))
+
+def _request_description(case: CaseContext, request_id) -> str:
+    """Hebrew description of a request of the case; requests of other cases are looked up in Mongo."""
+    request = case.requests_by_id.get(request_id)
+    if request is None:
+        return get_request_description(request_id, case.db)
+    return normalize_hebrew(request_type_mapping.get(request.get("RequestTypeId"), "Unknown Status"))
+
+
+def fetch_decisions_and_documents_by_case_id(case: CaseContext) -> List[Dict[str, Any]]:
     """
-    Fetch Decisions from MongoDB for a given Case ID (_id).
+    Show the Decisions of the case.
     Identify documents fulfilling all these conditions:
     - {'EntityTypeId': 5, 'EntityValue': Decisions[].DecisionId}
     - {'EntityTypeId': 1, 'EntityValue': case_id}
     - {'EntityTypeId': 2, 'EntityValue': DecisionRequests[].RequestId}
     """
     decisions_list = []
+    case_id = case.case_id
 
     try:
-        case_collection = db["Case"]
-        document_collection = db["Document"]
+        document_collection = case.db["Document"]
 
-        # Fetch the case document with decisions and requests
-        case_document = case_collection.find_one(
-            {"_id": case_id},
-            {"Decisions": 1, "Requests": 1, "_id": 1}
-        )
-
-        if not case_document:
+        if not case.exists:
             log_and_print(f"No document found for Case ID {case_id}.", "warning", ansi_format=BOLD_RED)
             return []
 
-        decisions = case_document.get("Decisions", [])
+        decisions = case.decisions
 
         # Sort decisions by PublishDate descending
         decisions = sorted(
@@ -135,6 +103,13 @@ def fetch_decisions_and_documents_by_case_id(case_id: str, db) -> List[Dict[str,
                     else:
                         log_and_print(f"החלטה לא פעילה", "info", BOLD_GREEN, indent=2, is_hebrew=True)
 
+            emit_record("decisions", case_id=case_id, decision_id=decision_id,
+                        decision_status_type_id=decision.get("DecisionStatusTypeId"),
+                        decision_status=get_decision_status_description(decision.get("DecisionStatusTypeId")),
+                        publish_date=decision.get("PublishDate"), classifications=decision.get("Classifications"),
+                        is_for_publication=decision.get("IsForPublication"), is_active=decision.get("IsActive"),
+                        request_ids=[request.get("RequestId") for request in decision.get("DecisionRequests", [])])
+
             # Process DecisionRequests and check documents
             decision_requests = decision.get("DecisionRequests", [])
             if decision_requests:             
@@ -151,7 +126,7 @@ def fetch_decisions_and_documents_by_case_id(case_id: str, db) -> List[Dict[str,
                                     for sub_key, sub_val in sub_decision.items():
                                         if sub_key == "SubDecisionId":
                                             log_and_print(f"\n*** {sub_idx} תת החלטה({sub_val})***", ansi_format=BOLD_YELLOW,indent=2, is_hebrew=True)
-                                            description = get_request_description(request_id,db)
+                                            description = _request_description(case, request_id)
                                             log_and_print(f"החלטה בבקשה :{description} ({request_id})", is_hebrew=True)
 
                                         elif sub_key == "DecisionTypeToCourtId":
@@ -163,6 +138,12 @@ def fetch_decisions_and_documents_by_case_id(case_id: str, db) -> List[Dict[str,
                                         elif sub_key == "ContinuedProcessId":
                                             log_and_print(f"    {sub_key}: {sub_val}", indent=12, is_hebrew=True)
 
+                                    emit_record("sub_decisions", case_id=case_id, decision_id=decision_id, request_id=request_id,
+                                                sub_decision_id=sub_decision.get("SubDecisionId"),
+                                                decision_type_to_court_id=sub_decision.get("DecisionTypeToCourtId"),
+                                                decision_type=getDecisionHebDesc(sub_decision.get("DecisionTypeToCourtId")),
+                                                continued_process_id=sub_decision.get("ContinuedProcessId"))
+
                             else:
                                 log_and_print(f"Unexpected format for 'SubDecisions', expected a list, got: {type(val)}", "warning", BOLD_RED, indent=8, is_hebrew=True)
                         #else:            
@@ -191,6 +172,7 @@ def fetch_decisions_and_documents_by_case_id(case_id: str, db) -> List[Dict[str,
                                 if key == 'DocumentTypeId' and isinstance(value, int):
                                     description = normalize_hebrew(DOCUMENT_TYPE_MAPPING.get(value, f"Unknown ({value})"))
                                     log_and_print(f"מסמך: {description}", indent=12, ansi_format=BOLD_GREEN, is_hebrew=True)
+                            _emit_decision_document(case_id, decision_id, request_id, doc)
                     else:
                         log_and_print(f"אין מסמכים בתיק", ansi_format=BOLD_RED, indent=8, is_hebrew=True)
 
@@ -212,6 +194,7 @@ def fetch_decisions_and_documents_by_case_id(case_id: str, db) -> List[Dict[str,
                                         if key == 'DocumentTypeId' and isinstance(value, int):
                                             description = normalize_hebrew(DOCUMENT_TYPE_MAPPING.get(value, f"Unknown ({value})"))
                                             log_and_print(f"מסמך: {description}({value})", indent=12, ansi_format=BOLD_GREEN, is_hebrew=True)
+                                    _emit_decision_document(case_id, decision_id, None, doc)
                             else:
                                 log_and_print(f"אין מסמכים בהחלטה בלבד", ansi_format=BOLD_RED, indent=8, is_hebrew=True)
 
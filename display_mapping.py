@@ -0,0 +1,35 @@
+from collections.abc import Mapping
+from logging_utils import normalize_hebrew
+
+
+class DisplayMapping(Mapping):
+    """
+    Read-only code -> Hebrew text table. The texts are stored in logical order and converted to
+    console display order (normalize_hebrew) the first time each one is read, so defining the
+    tables at import costs nothing. Reading it (m[key], m.get(key), iteration) behaves like the
+    dict of normalize_hebrew(...) values it replaces.
+    """
+
+    def __init__(self, logical):
+        self._logical = dict(logical)
+        self._display = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._display[key]
+        except KeyError:
+            value = self._display[key] = normalize_hebrew(self._logical[key])
+            return value
+
+    def __iter__(self):
+        return iter(self._logical)
+
+    def __len__(self):
+        return len(self._logical)
+
+    def __contains__(self, key):
+        return key in self._logical
+
+    def logical(self, key, default=None):
+        """The text of `key` in logical order, as written in the table (for logs and files)."""
+        return self._logical.get(key, default)
@@ -1,253 +1,246 @@
-from bidi.algorithm import get_display
-import unicodedata
+from display_mapping import DisplayMapping
 
-def normalize_hebrew(text):
-    """Normalize and format Hebrew text for proper RTL display."""
-    if not text:
-        return text
-    return get_display(unicodedata.normalize("NFKC", text.strip()))
-
-DOCUMENT_TYPE_MAPPING = {
-    1: normalize_hebrew("אגרה"),
-    2: normalize_hebrew("אישור תשלום שירות פרסום"),
-    3: normalize_hebrew("שובר תשלום פקדון"),
-    4: normalize_hebrew("אגרת הליך ביניים"),
-    5: normalize_hebrew("הודעה לבית הדין"),
-    6: normalize_hebrew("כתב תביעה"),
-    7: normalize_hebrew("כתב הגנה"),
-    8: normalize_hebrew("כתב תביעה מתוקן"),
-    9: normalize_hebrew("תעודה מזהה"),
-    10: normalize_hebrew("חוזה נישואין"),
-    11: normalize_hebrew("הסכם גירושין"),
-    12: normalize_hebrew("החלטת נישואין מאושרת של בי\"ד שרעי"),
-    13: normalize_hebrew("תעודת גירושין"),
-    14: normalize_hebrew("תעודת פטירה"),
-    15: normalize_hebrew("ייפוי כוח"),
-    16: normalize_hebrew("תגובה"),
-    17: normalize_hebrew("הוכחה"),
-    18: normalize_hebrew("אישור רפואי"),
-    19: normalize_hebrew("אישור מילואים"),
-    20: normalize_hebrew("אישור לידה"),
-    21: normalize_hebrew("הצהרת פטירה"),
-    22: normalize_hebrew("הזמנה לדיון"),
-    23: normalize_hebrew("אחר"),
-    24: normalize_hebrew("שיק מבוטל"),
-    25: normalize_hebrew("פרטי חשבון בנק"),
-    26: normalize_hebrew("תדפיס חשבון בנק"),
-    27: normalize_hebrew("רשיון רכב"),
-    28: normalize_hebrew("אישור הכנסות מעבודה"),
-    29: normalize_hebrew("אישור מהרווחה"),
-    30: normalize_hebrew("הסכמת היורשים על סמכות בית הדין לחלוקה שרעית"),
-    31: normalize_hebrew("תצהיר יורשים"),
-    32: normalize_hebrew("תצהיר יורשים - נכבדי הישוב"),
-    33: normalize_hebrew("אישור יורשים - מועצת העיר"),
-    34: normalize_hebrew("חשבונית"),
-    35: normalize_hebrew("נסח טאבו"),
-    36: normalize_hebrew("הסכמה למינוי אפוטרופוס"),
-    37: normalize_hebrew("אישור יציאה לחו\"ל"),
-    38: normalize_hebrew("דו\"ח סוציאלי"),
-    39: normalize_hebrew("אישור מהמשטרה על הגשת תלונה"),
-    40: normalize_hebrew("מסמך הודעת אישור קליטה"),
-    41: normalize_hebrew("כתב מינוי מהסיוע המשפטי"),
-    42: normalize_hebrew("העתק דרכון"),
-    43: normalize_hebrew("בקשה לפטור מאגרה מהסיוע המשפטי"),
-    44: normalize_hebrew("אישור קצבה מהביטוח הלאומי"),
-    45: normalize_hebrew("תצהיר הסתלקות מהירושה"),
-    46: normalize_hebrew("בקשת ביניים בתיק"),
-    200: normalize_hebrew("החלטת בוררות"),
-    201: normalize_hebrew("החלטת מגשרים"),
-    202: normalize_hebrew("בקשה למתן ארכה"),
-    203: normalize_hebrew("בקשה לדחיית הדיון"),
-    204: normalize_hebrew("בקשות שונות"),
-    206: normalize_hebrew("ערעור"),
-    207: normalize_hebrew("דחייה"),
-    208: normalize_hebrew("בקשה לתיקון החלטה/מסמך"),
-    209: normalize_hebrew("מינוי בורר"),
-    210: normalize_hebrew("תגובה לפי החלטת קאדי"),
-    211: normalize_hebrew("בקשה לקביעת דיון"),
-    212: normalize_hebrew("הקדמת מועד דיון"),
-    213: normalize_hebrew("התפטרות מייצוג"),
-    214: normalize_hebrew("איחוד תיקים"),
-    215: normalize_hebrew("בקשה לצילום תיק"),
-    216: normalize_hebrew("סגירת תיק"),
-    217: normalize_hebrew("בקשה למינוי מגשרים"),
-    218: normalize_hebrew("בקשות שהוגשו ע\"פ החלטת הקאדי"),
-    219: normalize_hebrew("תסקיר"),
-    220: normalize_hebrew("בקשה לפטור מאגרה"),
-    221: normalize_hebrew("דחיית תשלום אגרה"),
-    222: normalize_hebrew("החלטת פטור"),
-    223: normalize_hebrew("בקשת ברית זוגיות"),
-    226: normalize_hebrew("החלטה סופית לערעור"),
-    277: normalize_hebrew("החלטת דחייה"),
-    283: normalize_hebrew("זימון דיון"),
-    412: normalize_hebrew("בקשה לעיכוב ביצוע החלטה"),
-    431: normalize_hebrew("פרוטוקול דיו"),    
-    869: normalize_hebrew("נימוקי הערר"),
-    870: normalize_hebrew("החלטת רשות המיסים בהשגה"),
-    871: normalize_hebrew("הצהרת העורר"),       
-    872: normalize_hebrew("בקשה לאיסור פרסום ודיון בדלתיים סגורות"),
-    873: normalize_hebrew("פרוטוקול בעלי מניות"),
-    874: normalize_hebrew("בקשה להארכת מועד להגשת ערר"),
-    875: normalize_hebrew("בקשה לאיחוד עררים"),
-    889: normalize_hebrew("החלטה כללית"),
-    890: normalize_hebrew("פרוטוקול והחלטה"),
-    892: normalize_hebrew("ביטול דיון"),
+DOCUMENT_TYPE_MAPPING = DisplayMapping({
+    1: "אגרה",
+    2: "אישור תשלום שירות פרסום",
+    3: "שובר תשלום פקדון",
+    4: "אגרת הליך ביניים",
+    5: "הודעה לבית הדין",
+    6: "כתב תביעה",
+    7: "כתב הגנה",
+    8: "כתב תביעה מתוקן",
+    9: "תעודה מזהה",
+    10: "חוזה נישואין",
+    11: "הסכם גירושין",
+    12: "החלטת נישואין מאושרת של בי\"ד שרעי",
+    13: "תעודת גירושין",
+    14: "תעודת פטירה",
+    15: "ייפוי כוח",
+    16: "תגובה",
+    17: "הוכחה",
+    18: "אישור רפואי",
+    19: "אישור מילואים",
+    20: "אישור לידה",
+    21: "הצהרת פטירה",
+    22: "הזמנה לדיון",
+    23: "אחר",
+    24: "שיק מבוטל",
+    25: "פרטי חשבון בנק",
+    26: "תדפיס חשבון בנק",
+    27: "רשיון רכב",
+    28: "אישור הכנסות מעבודה",
+    29: "אישור מהרווחה",
+    30: "הסכמת היורשים על סמכות בית הדין לחלוקה שרעית",
+    31: "תצהיר יורשים",
+    32: "תצהיר יורשים - נכבדי הישוב",
+    33: "אישור יורשים - מועצת העיר",
+    34: "חשבונית",
+    35: "נסח טאבו",
+    36: "הסכמה למינוי אפוטרופוס",
+    37: "אישור יציאה לחו\"ל",
+    38: "דו\"ח סוציאלי",
+    39: "אישור מהמשטרה על הגשת תלונה",
+    40: "מסמך הודעת אישור קליטה",
+    41: "כתב מינוי מהסיוע המשפטי",
+    42: "העתק דרכון",
+    43: "בקשה לפטור מאגרה מהסיוע המשפטי",
+    44: "אישור קצבה מהביטוח הלאומי",
+    45: "תצהיר הסתלקות מהירושה",
+    46: "בקשת ביניים בתיק",
+    200: "החלטת בוררות",
+    201: "החלטת מגשרים",
+    202: "בקשה למתן ארכה",
+    203: "בקשה לדחיית הדיון",
+    204: "בקשות שונות",
+    206: "ערעור",
+    207: "דחייה",
+    208: "בקשה לתיקון החלטה/מסמך",
+    209: "מינוי בורר",
+    210: "תגובה לפי החלטת קאדי",
+    211: "בקשה לקביעת דיון",
+    212: "הקדמת מועד דיון",
+    213: "התפטרות מייצוג",
+    214: "איחוד תיקים",
+    215: "בקשה לצילום תיק",
+    216: "סגירת תיק",
+    217: "בקשה למינוי מגשרים",
+    218: "בקשות שהוגשו ע\"פ החלטת הקאדי",
+    219: "תסקיר",
+    220: "בקשה לפטור מאגרה",
+    221: "דחיית תשלום אגרה",
+    222: "החלטת פטור",
+    223: "בקשת ברית זוגיות",
+    226: "החלטה סופית לערעור",
+    277: "החלטת דחייה",
+    283: "זימון דיון",
+    412: "בקשה לעיכוב ביצוע החלטה",
+    431: "פרוטוקול דיו",    
+    869: "נימוקי הערר",
+    870: "החלטת רשות המיסים בהשגה",
+    871: "הצהרת העורר",       
+    872: "בקשה לאיסור פרסום ודיון בדלתיים סגורות",
+    873: "פרוטוקול בעלי מניות",
+    874: "בקשה להארכת מועד להגשת ערר",
+    875: "בקשה לאיחוד עררים",
+    889: "החלטה כללית",
+    890: "פרוטוקול והחלטה",
+    892: "ביטול דיון",
     
     # Resuming from 906 onwards
-    906: normalize_hebrew("בקשה לאיסור פרסום"),
-    907: normalize_hebrew("בקשה לצירוף מסמכים"),
-    908: normalize_hebrew("בקשה לביטול ערר"),
-    909: normalize_hebrew("בקשה לקביעת / שינוי / ביטול מועד או מיקום דיון"),
-    910: normalize_hebrew("בקשה לביטול / תיקון החלטה"),
-    911: normalize_hebrew("בקשה לפסיקת הוצאות"),
-    912: normalize_hebrew("בקשות לאחר סגירת התיק"),
-    913: normalize_hebrew("אישור קבלת תגובה"),
-    914: normalize_hebrew("אישור קבלת הודעה"),
-    915: normalize_hebrew("אישור הוספת בקשה בתיק"),
-    916: normalize_hebrew("אי תקינות מסמכים שצורפו להודעה"),
-    917: normalize_hebrew("אי תקינות מסמכים שצורפו לתגובה"),
-    918: normalize_hebrew("אי תקינות מסמכים שצורפו לבקשה"),
-    919: normalize_hebrew("החלטת הוועדה"),
-    920: normalize_hebrew("אינדיקציה למגיש"),
-    921: normalize_hebrew("החלטת רשות המיסים בבקשה למענק"),
-    922: normalize_hebrew("בקשה לדיון בדלתיים סגורות"),
-    923: normalize_hebrew("פרוטוקול - הקלדה"),
-    924: normalize_hebrew("פרוטוקול - תמליל הקלטת דיון"),
-    925: normalize_hebrew("שינוי מותב"),
-    926: normalize_hebrew("החלטת יחיד"),
-    927: normalize_hebrew("ייפוי כוח מטעם החברה"),
-    928: normalize_hebrew("פרוטוקול ישיבת דירקטוריון"),
-    929: normalize_hebrew("פרוטוקול אסיפה כללית"),
-    930: normalize_hebrew("פרוטוקול אסיפת שותפים"),
-    931: normalize_hebrew("החלטת חברה במדינת המקור"),
-    932: normalize_hebrew("החלטה בבקשה לקבלת מענק"),
-    933: normalize_hebrew("דו\"ח סיכומי דיווח (ESNA) לשנת 2020"),
-    934: normalize_hebrew("חשבוניות מס לקוחות"),
-    935: normalize_hebrew("חוזים עם ספקים / לקוחות"),
-    936: normalize_hebrew("דו\"ח על הכנסה לשנת 2020"),
-    937: normalize_hebrew("דו\"ח רב שנתי לביטוח לאומי לשנת 2020 (טופס 6101)"),
-    938: normalize_hebrew("דו\"ח רווח והפסד לשנת 2019"),
-    939: normalize_hebrew("דו\"ח רווח והפסד לשנת 2020"),
-    940: normalize_hebrew("דו\"ח מאזן בוחן לשנת 2020"),
-    941: normalize_hebrew("חוזים עם לקוחות"),
-    942: normalize_hebrew("תדפיסי עובר ושב בחשבון בנק"),
-    943: normalize_hebrew("מסמכי ביטוח לאומי"),
-    944: normalize_hebrew("בקשה להארכת מועד"),
-    945: normalize_hebrew("בקשה לעדכון פרטי מייצג / עד"),
-    946: normalize_hebrew("פתיחת תיק ערר"),
-    947: normalize_hebrew("מוסכמת מטעם הצדדים"),
-    948: normalize_hebrew("אישור קבלת ערר"),
-    949: normalize_hebrew("מסמכים שנשלחו"),
-    950: normalize_hebrew("בקשה להגשת ערר באופן לא מקוון"),
-    951: normalize_hebrew("מסמכי ייפוי כוח והסמכה"),
-    952: normalize_hebrew("מסמכי פתיחת תיק נוספים"),
-    953: normalize_hebrew("פרוטוקול ישיבת ועד מנהל"),
-    954: normalize_hebrew("אישור פתיחה מנהלית"),
-    955: normalize_hebrew("סגירת מנהלית"),
-    956: normalize_hebrew("החלטת ועדה"),
-    957: normalize_hebrew("תעודת נישואין"),
-    958: normalize_hebrew("שינוי מועד דיון"),
-    961: normalize_hebrew("החלטה בפתקית"),
-    962: normalize_hebrew("בקשה להחלפת מייצג")
-}
+    906: "בקשה לאיסור פרסום",
+    907: "בקשה לצירוף מסמכים",
+    908: "בקשה לביטול ערר",
+    909: "בקשה לקביעת / שינוי / ביטול מועד או מיקום דיון",
+    910: "בקשה לביטול / תיקון החלטה",
+    911: "בקשה לפסיקת הוצאות",
+    912: "בקשות לאחר סגירת התיק",
+    913: "אישור קבלת תגובה",
+    914: "אישור קבלת הודעה",
+    915: "אישור הוספת בקשה בתיק",
+    916: "אי תקינות מסמכים שצורפו להודעה",
+    917: "אי תקינות מסמכים שצורפו לתגובה",
+    918: "אי תקינות מסמכים שצורפו לבקשה",
+    919: "החלטת הוועדה",
+    920: "אינדיקציה למגיש",
+    921: "החלטת רשות המיסים בבקשה למענק",
+    922: "בקשה לדיון בדלתיים סגורות",
+    923: "פרוטוקול - הקלדה",
+    924: "פרוטוקול - תמליל הקלטת דיון",
+    925: "שינוי מותב",
+    926: "החלטת יחיד",
+    927: "ייפוי כוח מטעם החברה",
+    928: "פרוטוקול ישיבת דירקטוריון",
+    929: "פרוטוקול אסיפה כללית",
+    930: "פרוטוקול אסיפת שותפים",
+    931: "החלטת חברה במדינת המקור",
+    932: "החלטה בבקשה לקבלת מענק",
+    933: "דו\"ח סיכומי דיווח (ESNA) לשנת 2020",
+    934: "חשבוניות מס לקוחות",
+    935: "חוזים עם ספקים / לקוחות",
+    936: "דו\"ח על הכנסה לשנת 2020",
+    937: "דו\"ח רב שנתי לביטוח לאומי לשנת 2020 (טופס 6101)",
+    938: "דו\"ח רווח והפסד לשנת 2019",
+    939: "דו\"ח רווח והפסד לשנת 2020",
+    940: "דו\"ח מאזן בוחן לשנת 2020",
+    941: "חוזים עם לקוחות",
+    942: "תדפיסי עובר ושב בחשבון בנק",
+    943: "מסמכי ביטוח לאומי",
+    944: "בקשה להארכת מועד",
+    945: "בקשה לעדכון פרטי מייצג / עד",
+    946: "פתיחת תיק ערר",
+    947: "מוסכמת מטעם הצדדים",
+    948: "אישור קבלת ערר",
+    949: "מסמכים שנשלחו",
+    950: "בקשה להגשת ערר באופן לא מקוון",
+    951: "מסמכי ייפוי כוח והסמכה",
+    952: "מסמכי פתיחת תיק נוספים",
+    953: "פרוטוקול ישיבת ועד מנהל",
+    954: "אישור פתיחה מנהלית",
+    955: "סגירת מנהלית",
+    956: "החלטת ועדה",
+    957: "תעודת נישואין",
+    958: "שינוי מועד דיון",
+    961: "החלטה בפתקית",
+    962: "בקשה להחלפת מייצג"
+})
 
-SOURCE_MAPPING = {
-    1: normalize_hebrew("צד א"),
-    2: normalize_hebrew("צד ב"),
-    3: normalize_hebrew("בית הדין"),
-    4: normalize_hebrew("לא ידוע"),
-}
+SOURCE_MAPPING = DisplayMapping({
+    1: "צד א",
+    2: "צד ב",
+    3: "בית הדין",
+    4: "לא ידוע",
+})
 
-DOCUMENT_CATEGORY_MAPPING = {
-    1: normalize_hebrew("כתב תביעה"),
-    2: normalize_hebrew("מסמך מזהה"),
-    3: normalize_hebrew("הוכחת נישואין שרעי"),
-    4: normalize_hebrew("ייפוי כוח"),
-    5: normalize_hebrew("כתב מינוי סיוע משפטי"),
-    6: normalize_hebrew("הסכמה על סמכות בית הדין השרעי"),
-    7: normalize_hebrew("פרטי המנוח והיורשים"),
-    8: normalize_hebrew("הסכם גירושין"),
-    9: normalize_hebrew("תעודת פטירה"),
-    10: normalize_hebrew("תצהיר הסתלקות מהירושה"),
-    11: normalize_hebrew("מסמכים נוספים"),
-    12: normalize_hebrew("מסמכים נוספים להוכחת נישואין"),
-    13: normalize_hebrew("אישור תשלום שירות פרסום"),
-    14: normalize_hebrew("הסכמה על סמכות בית הדין הדרוזי"),
-    15: normalize_hebrew("הוכחת נישואין דרוזי"),
-    16: normalize_hebrew("כתב תביעה"),
-    17: normalize_hebrew("כתב בקשה"),
-    18: normalize_hebrew("אישור תשלום שירות פרסום"),
-    19: normalize_hebrew("תצהיר מבקשים"),
-    20: normalize_hebrew("מסמך מזהה"),
-    21: normalize_hebrew("מסמכים נוספים"),
-    22: normalize_hebrew("תצהיר הסתלקות מהירושה"),
-    23: normalize_hebrew("כתב מינוי מנהל עזבון"),
-    24: normalize_hebrew("השלמת מסמכים שרעיים"),
-    25: normalize_hebrew("תגובה"),
-    26: normalize_hebrew("כתב הגנה"),
-    27: normalize_hebrew("בקשה"),
-    28: normalize_hebrew("כתב תביעה"),
-    29: normalize_hebrew("פטור מאגרה"),
-    30: normalize_hebrew("השלמת מסמכים דרוזים"),
-    31: normalize_hebrew("כתב תביעה"),
-    32: normalize_hebrew("כתב תביעה לסכסוך משפחתי"),
-    33: normalize_hebrew("כתב בקשה ליישוב סכסוך"),
-    34: normalize_hebrew("השלמת מסמכים מקרקעין"),
-    35: normalize_hebrew("אישור יישוב סכסוך"),
-    36: normalize_hebrew("כתב תביעה שכנגד"),
-    37: normalize_hebrew("הודעה לצד ג'"),
-    38: normalize_hebrew("צירוף מסמך אישור תשלום אגרה"),
-    39: normalize_hebrew("השלמת מסמכים בתיק מקרקעין סטטוס לא תקין"),
-    40: normalize_hebrew("כתב הגנה במקרקעין"),
-    41: normalize_hebrew("מסמך תגובה במקרקעין"),
-    42: normalize_hebrew("ייפוי כח"),
-    43: normalize_hebrew("מסמכים לפעולה לגורם חדש בתיק"),
-    44: normalize_hebrew("מזונות אישה - החזר הוצאות"),
-    45: normalize_hebrew("מזונות אישה - שכ\"ד"),
-    46: normalize_hebrew("חוזה נישואין"),
-    47: normalize_hebrew("החלטת מזונות עדכנית"),
-    48: normalize_hebrew("תעודת גירושין / החלטת גירושין"),
-    49: normalize_hebrew("מסמכים נוספים להוכחת נישואין / גירושין"),
-    50: normalize_hebrew("מסמכים רפואיים"),
-    51: normalize_hebrew("הסכמה למינוי אפוטרופוס"),
-    52: normalize_hebrew("החלטה למינוי אפוטרופוס"),
-    53: normalize_hebrew("תעודת גירושין"),
-    54: normalize_hebrew("מסמך צוואה"),
-    55: normalize_hebrew("תמצית רישום"),
-    59: normalize_hebrew("צו למינוי אפוטרופוס"),
-    60: normalize_hebrew("תצהיר לאימות העובדות"),
-    61: normalize_hebrew("כתב הסכמה לסמכות בית הדין"),
-    62: normalize_hebrew("נימוקי הערר"),
-    63: normalize_hebrew("החלטת רשות המיסים בהשגה"),
-    64: normalize_hebrew("הצהרת העורר"),
-    65: normalize_hebrew("בקשה לאיסור פרסום ודיון בדלתיים סגורות"),
-    66: normalize_hebrew("פרוטוקול בעלי מניות"),
-    67: normalize_hebrew("מסמכים נוספים - בי\"ד לעסקים"),
-    68: normalize_hebrew("השלמת מסמכים - עסקים (קורונה וחרבות ברזל)"),
-    69: normalize_hebrew("בקשה להארכת מועד להגשת ערר"),
-    70: normalize_hebrew("בקשה להארכת מועד"),
-    71: normalize_hebrew("בקשה לסילוק על הסף"),
-    72: normalize_hebrew("בקשה לצירוף מסמכים"),
-    73: normalize_hebrew("בקשה למחיקת ערר"),
-    74: normalize_hebrew("בקשה למתן החלטה"),
-    75: normalize_hebrew("בקשה לקביעת/ שינוי/ ביטול מועד דיון"),
-    76: normalize_hebrew("בקשה לביטול/ תיקון החלטה"),
-    77: normalize_hebrew("בקשה לפסיקת הוצאות"),
-    78: normalize_hebrew("בקשה לאחר סגירת התיק"),
-    79: normalize_hebrew("בקשה לעדכון פרטי מייצג/ עד"),
-    80: normalize_hebrew("בקשה לאיסור פרסום החלטה ודיון בדלתיים סגורות"),
-    81: normalize_hebrew("בקשה לאיחוד עררים"),
-    82: normalize_hebrew("בקשה למתן תוקף של החלטה לפשרה"),
-    83: normalize_hebrew("בקשה לעיכוב ביצוע החלטה"),
-    84: normalize_hebrew("כתב תשובה בבית דין לעסקים"),
-    87: normalize_hebrew("בקשה להחלפת מייצג"),
-}
+DOCUMENT_CATEGORY_MAPPING = DisplayMapping({
+    1: "כתב תביעה",
+    2: "מסמך מזהה",
+    3: "הוכחת נישואין שרעי",
+    4: "ייפוי כוח",
+    5: "כתב מינוי סיוע משפטי",
+    6: "הסכמה על סמכות בית הדין השרעי",
+    7: "פרטי המנוח והיורשים",
+    8: "הסכם גירושין",
+    9: "תעודת פטירה",
+    10: "תצהיר הסתלקות מהירושה",
+    11: "מסמכים נוספים",
+    12: "מסמכים נוספים להוכחת נישואין",
+    13: "אישור תשלום שירות פרסום",
+    14: "הסכמה על סמכות בית הדין הדרוזי",
+    15: "הוכחת נישואין דרוזי",
+    16: "כתב תביעה",
+    17: "כתב בקשה",
+    18: "אישור תשלום שירות פרסום",
+    19: "תצהיר מבקשים",
+    20: "מסמך מזהה",
+    21: "מסמכים נוספים",
+    22: "תצהיר הסתלקות מהירושה",
+    23: "כתב מינוי מנהל עזבון",
+    24: "השלמת מסמכים שרעיים",
+    25: "תגובה",
+    26: "כתב הגנה",
+    27: "בקשה",
+    28: "כתב תביעה",
+    29: "פטור מאגרה",
+    30: "השלמת מסמכים דרוזים",
+    31: "כתב תביעה",
+    32: "כתב תביעה לסכסוך משפחתי",
+    33: "כתב בקשה ליישוב סכסוך",
+    34: "השלמת מסמכים מקרקעין",
+    35: "אישור יישוב סכסוך",
+    36: "כתב תביעה שכנגד",
+    37: "הודעה לצד ג'",
+    38: "צירוף מסמך אישור תשלום אגרה",
+    39: "השלמת מסמכים בתיק מקרקעין סטטוס לא תקין",
+    40: "כתב הגנה במקרקעין",
+    41: "מסמך תגובה במקרקעין",
+    42: "ייפוי כח",
+    43: "מסמכים לפעולה לגורם חדש בתיק",
+    44: "מזונות אישה - החזר הוצאות",
+    45: "מזונות אישה - שכ\"ד",
+    46: "חוזה נישואין",
+    47: "החלטת מזונות עדכנית",
+    48: "תעודת גירושין / החלטת גירושין",
+    49: "מסמכים נוספים להוכחת נישואין / גירושין",
+    50: "מסמכים רפואיים",
+    51: "הסכמה למינוי אפוטרופוס",
+    52: "החלטה למינוי אפוטרופוס",
+    53: "תעודת גירושין",
+    54: "מסמך צוואה",
+    55: "תמצית רישום",
+    59: "צו למינוי אפוטרופוס",
+    60: "תצהיר לאימות העובדות",
+    61: "כתב הסכמה לסמכות בית הדין",
+    62: "נימוקי הערר",
+    63: "החלטת רשות המיסים בהשגה",
+    64: "הצהרת העורר",
+    65: "בקשה לאיסור פרסום ודיון בדלתיים סגורות",
+    66: "פרוטוקול בעלי מניות",
+    67: "מסמכים נוספים - בי\"ד לעסקים",
+    68: "השלמת מסמכים - עסקים (קורונה וחרבות ברזל)",
+    69: "בקשה להארכת מועד להגשת ערר",
+    70: "בקשה להארכת מועד",
+    71: "בקשה לסילוק על הסף",
+    72: "בקשה לצירוף מסמכים",
+    73: "בקשה למחיקת ערר",
+    74: "בקשה למתן החלטה",
+    75: "בקשה לקביעת/ שינוי/ ביטול מועד דיון",
+    76: "בקשה לביטול/ תיקון החלטה",
+    77: "בקשה לפסיקת הוצאות",
+    78: "בקשה לאחר סגירת התיק",
+    79: "בקשה לעדכון פרטי מייצג/ עד",
+    80: "בקשה לאיסור פרסום החלטה ודיון בדלתיים סגורות",
+    81: "בקשה לאיחוד עררים",
+    82: "בקשה למתן תוקף של החלטה לפשרה",
+    83: "בקשה לעיכוב ביצוע החלטה",
+    84: "כתב תשובה בבית דין לעסקים",
+    87: "בקשה להחלפת מייצג",
+})
 
 
-DOCUMENT_ENTITY_MAPPING = {
-    1: normalize_hebrew("תיק"),
-    2: normalize_hebrew("בקשה"),
-    3: normalize_hebrew("בקשה"),
-    4: normalize_hebrew("מטלה"),
-    5: normalize_hebrew("החלטה")
-}
\ No newline at end of file
+DOCUMENT_ENTITY_MAPPING = DisplayMapping({
+    1: "תיק",
+    2: "בקשה",
+    3: "בקשה",
+    4: "מטלה",
+    5: "החלטה"
+})
\ No newline at end of file
@@ -1,11 +1,13 @@
 from pymongo import MongoClient
 from dotenv import load_dotenv
-from logging_utils import log_and_print, normalize_hebrew, logger
+from logging_utils import log_and_print, normalize_hebrew, logger, flush_console
 from logging_utils import BOLD_YELLOW, BOLD_GREEN, BOLD_RED
 from doc_header_map import DOCUMENT_TYPE_MAPPING, DOCUMENT_CATEGORY_MAPPING,SOURCE_MAPPING
 from request_data_manager import get_requests_by_case_id,request_type_mapping
 from bpm_utils import get_case_involved_name_by_identify_id
-import pyodbc
+from code_table_cache import document_types
+from report_output import emit_record, report_writer
+from case_context import CaseContext
 import os
 
 IsWatched = {
@@ -14,67 +16,149 @@ IsWatched = {
     "None": 'None'
 }
 
+# Documents per round trip of the document listing cursor
+DOCUMENT_BATCH_SIZE = int(os.getenv("DOCUMENT_BATCH_SIZE", "200"))
+
+# Documents printed between console flushes of the document listing
+DOCUMENT_PAGE_SIZE = int(os.getenv("DOCUMENT_PAGE_SIZE", "50"))
+
+# Fields the document listing renders or reports; the rest of the Document is never fetched
+DOCUMENT_PROJECTION = {
+    "DocumentTypeId": 1,
+    "DocumentCategoryId": 1,
+    "DocumentSourceTypeId": 1,
+    "DocumentViews.UserIdentifyId": 1,
+    "MojId": 1,
+    "FileName": 1,
+    "CreateDate": 1,
+    "DocumentReceiptTime": 1,
+    "Entities.EntityTypeId": 1,
+    "Entities.EntityValue": 1,
+}
 
 
 
 def getDocHebDesc(DocType):
-   
-      
-    doc_desc = 'לא ידוע'
-    # MongoDB connection string
-    mongo_connection_string = os.getenv("MONGO_CONNECTION_STRING", "")
-
-    # SQL Server connection parameters
-    server_name = os.getenv("DB_SERVER")
-    database_name = os.getenv("DB_NAME")
-    user_name = os.getenv("DB_USER")
-    password = os.getenv("DB_PASS")
+    """Hebrew description of a document type, served from the in-memory CT_Document_Types table."""
+    return document_types.get(DocType, 'לא ידוע')
 
-    try:
-        # Establish connection to SQL Server
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-
-        cursor = connection.cursor()
-      
-        # SQL Query 1: Get ProcessID and ProcessTypeName
-        sql_query = """
-        SELECT TOP (1000) [Document_Type_Id]      
-      ,[Description_Heb]      
-       FROM [CaseManagement_BO].[dbo].[CT_Document_Types]
-        where Document_Type_Id = ?;
-        """
-        
-        cursor.execute(sql_query, (DocType,))  # Use a tuple for parameters
-        row = cursor.fetchall()
 
-        if row:
-            doc_desc =row[0][1]
-            
-    except Exception as e:
-        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
+def _render_document(case: CaseContext, index, document, case_requests_dic):
+    """Print one (projected) document of the case and emit its report record."""
+    case_id = case.case_id
+    log_and_print(f"\nמסמך #{index}:", ansi_format=BOLD_YELLOW, is_hebrew=True)
+
+
+    # Process Entities array to find EntityValue where EntityTypeId == 2
+    entities = document.get("Entities", [])
+    entity_value_2 = None
+    for entity in entities:
+        if entity.get("EntityTypeId") == 2:
+            entity_value_2 = entity.get("EntityValue")
+            break
 
-    finally:
-        # Close the SQL Server connection
-        if 'connection' in locals():
-            connection.close()
-            #log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)    
+    if entity_value_2 is not None:
 
-    return doc_desc
 
-def fetch_documents_by_case_id(case_id, db, collection_name="Document"):
+        matching_request_id = None
+
+        # Iterate over the dictionary items to find the key with value 1
+        for request_id, request_type_id in case_requests_dic.items():
+            if request_id == entity_value_2:
+                matching_request_id = request_type_id
+                break  # Exit the loop once the first match is found
+
+        # Output the result
+        if matching_request_id:
+            description_heb = normalize_hebrew(request_type_mapping.get(matching_request_id, "Unknown Status"))
+            log_and_print(f"{description_heb} ({matching_request_id})", "info", is_hebrew=True, indent=8)
+        else:
+            log_and_print("No RequestId found with RequestTypeId 1.")
+
+
+
+    # Iterate through document fields (only the projected ones come back from MongoDB)
+    for key, value in document.items():
+        if key == "DocumentTypeId" and isinstance(value, int):
+            description = getDocHebDesc(value)
+            #description = normalize_hebrew(DOCUMENT_TYPE_MAPPING.get(value, f"לא ידוע ({value})"))
+            log_and_print(f"סוג המסמך: {description} ({value})", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
+        
+        elif key == "DocumentCategoryId":
+            description = normalize_hebrew(DOCUMENT_CATEGORY_MAPPING.get(value, 0))
+            if description == 0:                            
+                description = "לא ידוע"
+                log_and_print(f"קטגוריית המסמך: {description} ({value})", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
+
+        elif key == 'DocumentViews':
+            views = document.get("DocumentViews", [])
+            if len(views) > 0:
+                log_and_print(f"DocumentViews contains {len(views)} entries.")
+                for view in views:
+                    user_id = view.get("UserIdentifyId")
+                    if user_id is not None:
+                        identifier_name = get_case_involved_name_by_identify_id(case, user_id)
+                        log_and_print(
+                            f"צפייה על-ידי: {identifier_name} (מזהה: {user_id})",
+                            indent=2,
+                            ansi_format=BOLD_GREEN,
+                            is_hebrew=True
+                        )
+                    else:
+                        log_and_print("צפייה על-ידי: מזהה לא ידוע", indent=2, ansi_format=BOLD_YELLOW, is_hebrew=True)
+            else:
+                log_and_print(f"אין צפיות במסמך", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
+
+                # elif key == "DocumentValidityTypeId":
+            #     if value==1:
+            #         log_and_print(f"סטטוס מסמך בדוקומנטום :פעיל", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
+            #     else:
+            #         log_and_print(f"סטטוס מסמך בדוקומנטום :לא פעיל", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
+        # elif key in ["WatchedByDefendant", "WatchedByProsecutor"]:   
+        #     if key == "WatchedByDefendant":
+        #         desc = "נצפה על ידי משיבה"  # Corrected assignment
+        #     else:             
+        #         desc = "נצפה על ידי עורר"  # Corrected assignment
+            
+        #     watched = IsWatched.get(str(value), f"לא ידוע ({value})")
+        #     log_and_print(f"{desc}: {value}", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
+        elif key == 'DocumentSourceTypeId':
+             source = normalize_hebrew(SOURCE_MAPPING.get(value, 0))
+             log_and_print(f"מקור המסמך: {source}", indent=2,  is_hebrew=True)
+
+            
+        elif key in ["MojId", "FileName","CreateDate"]:                   
+            log_and_print(f"{key}: {value}", indent=2,  is_hebrew=True)
+
+    if report_writer.enabled:
+        document_type_id = document.get("DocumentTypeId")
+        emit_record("documents", case_id=case_id, index=index, document_id=document.get("_id"),
+                    request_id=entity_value_2,
+                    request_type_id=case_requests_dic.get(entity_value_2) if entity_value_2 is not None else None,
+                    document_type_id=document_type_id,
+                    document_type=getDocHebDesc(document_type_id) if isinstance(document_type_id, int) else None,
+                    document_category_id=document.get("DocumentCategoryId"),
+                    document_category=DOCUMENT_CATEGORY_MAPPING.logical(document.get("DocumentCategoryId")),
+                    document_source_type_id=document.get("DocumentSourceTypeId"),
+                    document_source=SOURCE_MAPPING.logical(document.get("DocumentSourceTypeId")),
+                    document_receipt_time=document.get("DocumentReceiptTime"),
+                    moj_id=document.get("MojId"), file_name=document.get("FileName"),
+                    create_date=document.get("CreateDate"),
+                    viewed_by=[view.get("UserIdentifyId") for view in document.get("DocumentViews") or []])
+
+
+def fetch_documents_by_case_id(case: CaseContext, collection_name="Document"):
     """
-    Fetch all documents from MongoDB where Entities array contains an object 
-    with EntityTypeId=1 and EntityValue=case_id. Results are sorted by DocumentReceiptTime in ascending order.
+    Print all documents from MongoDB where Entities array contains an object
+    with EntityTypeId=1 and EntityValue=case_id, sorted by DocumentReceiptTime in ascending order.
+
+    The documents are streamed with only the rendered fields projected (DOCUMENT_PROJECTION) and
+    printed page by page, so the first lines show up before the whole case is read and only one
+    batch of documents is held in memory. Returns the number of documents printed.
     """
+    case_id = case.case_id
     try:
-        collection = db[collection_name]
+        collection = case.db[collection_name]
 
         # Query to match documents with EntityTypeId=1 and EntityValue=case_id
         query = {
@@ -85,110 +169,32 @@ def fetch_documents_by_case_id(case_id, db, collection_name="Document"):
                 }
             }
         }
-        # retieve all requests for the specific case id {RequestId:RequestTypeId}
-        case_requests_dic = get_requests_by_case_id(case_id,db)
-     
-        # Fetch all matching documents, sorted by DocumentReceiptTime in ascending order
-        documents = collection.find(query).sort("DocumentReceiptTime", 1)
-
-        matching_documents = list(documents)  # Convert cursor to list
-
-        if not matching_documents:
+        document_count = collection.count_documents(query)
+        if not document_count:
             log_and_print(f"\nאין מסמכים בתיק : {case_id}", ansi_format=BOLD_RED, is_hebrew=True)
-        else:
-            log_and_print(f"\nמסמכים בתיק:{len(matching_documents)}", ansi_format=BOLD_GREEN, is_hebrew=True)
-            
-            for index, document in enumerate(matching_documents, start=1):
-                log_and_print(f"\nמסמך #{index}:", ansi_format=BOLD_YELLOW, is_hebrew=True)
+            return 0
 
+        log_and_print(f"\nמסמכים בתיק:{document_count}", ansi_format=BOLD_GREEN, is_hebrew=True)
 
-                # Process Entities array to find EntityValue where EntityTypeId == 2
-                entities = document.get("Entities", [])
-                entity_value_2 = None
-                for entity in entities:
-                    if entity.get("EntityTypeId") == 2:
-                        entity_value_2 = entity.get("EntityValue")
-                        break
-
-                if entity_value_2 is not None:
-                    
+        # retieve all requests for the specific case id {RequestId:RequestTypeId}
+        case_requests_dic = get_requests_by_case_id(case)
 
-                    matching_request_id = None
+        # Stream the matching documents, sorted by DocumentReceiptTime in ascending order
+        documents = (collection.find(query, DOCUMENT_PROJECTION)
+                     .sort("DocumentReceiptTime", 1)
+                     .batch_size(DOCUMENT_BATCH_SIZE))
 
-                    # Iterate over the dictionary items to find the key with value 1
-                    for request_id, request_type_id in case_requests_dic.items():
-                        if request_id == entity_value_2:
-                            matching_request_id = request_type_id
-                            break  # Exit the loop once the first match is found
+        index = 0
+        for index, document in enumerate(documents, start=1):
+            _render_document(case, index, document, case_requests_dic)
+            if index % DOCUMENT_PAGE_SIZE == 0:
+                flush_console()
+        flush_console()
 
-                    # Output the result
-                    if matching_request_id:
-                        description_heb = normalize_hebrew(request_type_mapping.get(matching_request_id, "Unknown Status"))                        
-                        log_and_print(f"{description_heb} ({matching_request_id})", "info", is_hebrew=True, indent=8)
-                    else:
-                        log_and_print("No RequestId found with RequestTypeId 1.")
-                                           
-                  
-                
-              
-               # Iterate through document fields
-                for key, value in document.items():
-                    if key == "DocumentTypeId" and isinstance(value, int):
-                        description = getDocHebDesc(value)
-                        #description = normalize_hebrew(DOCUMENT_TYPE_MAPPING.get(value, f"לא ידוע ({value})"))
-                        log_and_print(f"סוג המסמך: {description} ({value})", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
-                    
-                    elif key == "DocumentCategoryId":
-                        description = normalize_hebrew(DOCUMENT_CATEGORY_MAPPING.get(value, 0))
-                        if description == 0:                            
-                            description = "לא ידוע"
-                            log_and_print(f"קטגוריית המסמך: {description} ({value})", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
-
-                    elif key == 'DocumentViews':
-                        views = document.get("DocumentViews", [])
-                        if len(views) > 0:
-                            log_and_print(f"DocumentViews contains {len(views)} entries.")
-                            for view in views:
-                                user_id = view.get("UserIdentifyId")
-                                if user_id is not None:
-                                    identifier_name = get_case_involved_name_by_identify_id(case_id, user_id, db)
-                                    log_and_print(
-                                        f"צפייה על-ידי: {identifier_name} (מזהה: {user_id})",
-                                        indent=2,
-                                        ansi_format=BOLD_GREEN,
-                                        is_hebrew=True
-                                    )
-                                else:
-                                    log_and_print("צפייה על-ידי: מזהה לא ידוע", indent=2, ansi_format=BOLD_YELLOW, is_hebrew=True)
-                        else:
-                            log_and_print(f"אין צפיות במסמך", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
-
-                            # elif key == "DocumentValidityTypeId":
-                        #     if value==1:
-                        #         log_and_print(f"סטטוס מסמך בדוקומנטום :פעיל", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
-                        #     else:
-                        #         log_and_print(f"סטטוס מסמך בדוקומנטום :לא פעיל", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
-                    # elif key in ["WatchedByDefendant", "WatchedByProsecutor"]:   
-                    #     if key == "WatchedByDefendant":
-                    #         desc = "נצפה על ידי משיבה"  # Corrected assignment
-                    #     else:             
-                    #         desc = "נצפה על ידי עורר"  # Corrected assignment
-                        
-                    #     watched = IsWatched.get(str(value), f"לא ידוע ({value})")
-                    #     log_and_print(f"{desc}: {value}", indent=2, ansi_format=BOLD_GREEN, is_hebrew=True)
-                    elif key == 'DocumentSourceTypeId':
-                         source = normalize_hebrew(SOURCE_MAPPING.get(value, 0))
-                         log_and_print(f"מקור המסמך: {source}", indent=2,  is_hebrew=True)
-
-                        
-                    elif key in ["MojId", "FileName","CreateDate"]:                   
-                        log_and_print(f"{key}: {value}", indent=2,  is_hebrew=True)
-
-                
-        return matching_documents
+        return index
 
     except Exception as e:
         log_and_print(f"Error querying MongoDB: {e}", "error", ansi_format=BOLD_RED)
-        return []
+        return 0
 
 
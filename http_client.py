@@ -0,0 +1,7 @@
+import requests
+from backend_metrics import record_http_response
+
+# One session for every HTTP call of the tool (Task API, NTLM calls): connections are kept alive
+# between calls and each response goes through the backend metrics hook
+http_session = requests.Session()
+http_session.hooks["response"].append(record_http_response)
@@ -1,6 +1,6 @@
 import os
-import requests
 from requests_ntlm import HttpNtlmAuth
+from http_client import http_session
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -31,9 +31,9 @@ def run_ntlm_authenticated_request(method, url, description, data=None, extra_he
     print(f"Executing: {description}")
     try:
         if method == "POST":
-            response = requests.post(url, headers=headers, auth=auth, json=data)
+            response = http_session.post(url, headers=headers, auth=auth, json=data)
         elif method == "GET":
-            response = requests.get(url, headers=headers, auth=auth)
+            response = http_session.get(url, headers=headers, auth=auth)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -1,6 +1,16 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
 from bidi.algorithm import get_display
 import unicodedata
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 
 # ANSI escape codes for bold and colored formatting
 BOLD_YELLOW = '\033[1;33m'
@@ -8,25 +18,126 @@ BOLD_GREEN = '\033[1;32m'
 BOLD_RED = '\033[1;31m'
 RESET = '\033[0m'
 
+# Write application.log from a background thread instead of in every log_and_print call
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "1") == "1"
+
+# Collect console lines and write them in one go per report section (see flush_console)
+CONSOLE_BUFFERED = os.getenv("CONSOLE_BUFFERED", "1") == "1"
+
+# Flush the console buffer early once it holds this many lines
+CONSOLE_BUFFER_MAX_LINES = int(os.getenv("CONSOLE_BUFFER_MAX_LINES", "500"))
+
+_log_listener = None
+
+
 # Configure logging
 def setup_logging(log_file='application.log'):
-    logging.basicConfig(
-        filename=log_file,
-        filemode='w',
-        level=logging.INFO,
-        format='%(message)s',  # Only log the message itself
-        encoding='utf-8'
-    )
-    return logging.getLogger()
+    global _log_listener
+    if not LOG_QUEUE_ENABLED:
+        logging.basicConfig(
+            filename=log_file,
+            filemode='w',
+            level=logging.INFO,
+            format='%(message)s',  # Only log the message itself
+            encoding='utf-8'
+        )
+        return logging.getLogger()
+
+    # The file handler runs on the listener thread; callers only put records on the queue
+    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(message)s'))  # Only log the message itself
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    return root
 
 logger = setup_logging()
+
+_console_buffer = []
+_console_lock = threading.Lock()
+
+
+def flush_console():
+    """Write the buffered console lines. Called per report section, before input() and at exit."""
+    with _console_lock:
+        if not _console_buffer:
+            return
+        text = "\n".join(_console_buffer) + "\n"
+        _console_buffer.clear()
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def write_console(line):
+    """Print one console line, through the buffer when CONSOLE_BUFFERED is on."""
+    if not CONSOLE_BUFFERED:
+        print(line)
+        return
+    with _console_lock:
+        _console_buffer.append(line)
+        full = len(_console_buffer) >= CONSOLE_BUFFER_MAX_LINES
+    if full:
+        flush_console()
+
+
+def prompt_input(prompt=""):
+    """input() that first shows everything still in the console buffer."""
+    flush_console()
+    return input(prompt)
+
+
+def shutdown_logging():
+    """Flush the console buffer and write out the queued log records."""
+    flush_console()
+    if _log_listener is not None:
+        _log_listener.stop()
+
+
+def _flush_console_excepthook(exc_type, exc_value, exc_traceback, _previous_hook=sys.excepthook):
+    # Show the buffered output before the traceback of a crash
+    flush_console()
+    _previous_hook(exc_type, exc_value, exc_traceback)
+
+
+sys.excepthook = _flush_console_excepthook
+atexit.register(shutdown_logging)
+
+# When set, console lines are collected in this list instead of being printed (see capture_output)
+_captured_console = ContextVar("captured_console", default=None)
+
+
+@contextmanager
+def capture_output():
+    """
+    Collect the console lines of log_and_print in the current thread / task instead of printing them,
+    so sections that run concurrently can be printed one after the other. The file log is not affected.
+
+    Example:
+        with capture_output() as lines:
+            getBOActions(case_id)
+        print("\n".join(lines))
+    """
+    lines = []
+    token = _captured_console.set(lines)
+    try:
+        yield lines
+    finally:
+        _captured_console.reset(token)
+
+
 def log_and_print(message, level="info", ansi_format=None, is_hebrew=False, indent=0):
     """
     Log a message and print it with optional ANSI formatting and indentation.
     If the message contains Hebrew, apply RTL normalization for console output only.
     """
     # Normalize Hebrew text for console, but keep original for log
-    if is_hebrew:
+    if is_hebrew and isinstance(message, VisualStr):
+        console_message = message  # Already in display order
+        log_message = message.logical
+    elif is_hebrew:
         console_message = normalize_hebrew(message)
         log_message = message  # Original logical order for logging
     else:
@@ -40,8 +151,12 @@ def log_and_print(message, level="info", ansi_format=None, is_hebrew=False, inde
     # Apply indentation
     console_message = f"{' ' * indent}{console_message}"
 
-    # Print to the console
-    print(console_message)
+    # Print to the console, or collect the line while output is captured
+    captured = _captured_console.get()
+    if captured is not None:
+        captured.append(console_message)
+    else:
+        write_console(console_message)
 
     # Log to the file without ANSI formatting or indentation
     if level.lower() == "info":
@@ -54,8 +169,34 @@ def log_and_print(message, level="info", ansi_format=None, is_hebrew=False, inde
         logger.debug(log_message)
 
 
+# Number of distinct strings whose display form is kept in memory
+RTL_RENDER_CACHE_SIZE = int(os.getenv("RTL_RENDER_CACHE_SIZE", "4096"))
+
+# Hebrew, Arabic and their presentation forms: text without any of these needs no bidi pass
+_RTL_CHARACTERS = re.compile("[\u0590-\u08FF\uFB1D-\uFDFF\uFE70-\uFEFF]")
+
+
+class VisualStr(str):
+    """A string already in display (visual) order; `logical` is the text it was rendered from."""
+    logical = None
+
+
+@lru_cache(maxsize=RTL_RENDER_CACHE_SIZE)
+def _render_rtl(text):
+    logical = text.strip() if text.isascii() else unicodedata.normalize("NFKC", text.strip())
+    visual = VisualStr(get_display(logical) if _RTL_CHARACTERS.search(logical) else logical)
+    visual.logical = logical
+    return visual
+
+
 def normalize_hebrew(text):
-    """Normalize and format Hebrew text for proper RTL display."""
+    """
+    Normalize and format Hebrew text for proper RTL display.
+    Display forms are memoized; a VisualStr (an already normalized string) is turned back into
+    its logical text instead of running bidi over visual-order text.
+    """
     if not text:
         return text
-    return get_display(unicodedata.normalize("NFKC", text.strip()))
+    if isinstance(text, VisualStr):
+        return text.logical
+    return _render_rtl(text)
@@ -0,0 +1,210 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from logging_utils import log_and_print, logger, BOLD_RED
+from sql_connection_manager import build_connection_string, open_connection
+from sql_query_catalog import execute_query, forget_connection
+
+# Local snapshot file shared by every instance of the tool on this machine
+LOOKUP_SNAPSHOT_PATH = os.getenv("LOOKUP_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "case_tool_lookup_snapshot.sqlite"))
+
+# A snapshot synced less than this many seconds ago is used as is, without asking SQL Server for checksums
+LOOKUP_SNAPSHOT_CHECK_SECONDS = int(os.getenv("LOOKUP_SNAPSHOT_CHECK_SECONDS", "600"))
+
+# A load whose sync failed, or that found no rows, is retried after this many seconds instead of being kept
+LOOKUP_SNAPSHOT_RETRY_SECONDS = int(os.getenv("LOOKUP_SNAPSHOT_RETRY_SECONDS", "30"))
+
+# Snapshot table name -> catalog query returning (key, description) rows of the whole table.
+# The checksums of all of them come back in one round trip from "lookup.checksums", or from
+# "lookup.checksum.<table>" one by one when that fails.
+LOOKUP_TABLES = {
+    "CT_Assignment_Types": "lookup.assignment_types",
+    "CT_Assignment_Status_Types": "lookup.assignment_status_types",
+    "CT_Discussion_Types": "lookup.discussion_types",
+    "CT_Discussion_Statuses": "lookup.discussion_statuses",
+    "CT_BO_Action_Types": "lookup.bo_action_types",
+    "StatusTypes": "lookup.status_types",
+    "ActivityTypes": "lookup.activity_types",
+    "ProcessTypes": "lookup.process_types",
+    "Entity": "lookup.entities",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookup_rows (
+    table_name TEXT NOT NULL,
+    key,
+    value TEXT,
+    PRIMARY KEY (table_name, key)
+);
+CREATE TABLE IF NOT EXISTS lookup_versions (
+    table_name TEXT PRIMARY KEY,
+    checksum INTEGER,
+    row_count INTEGER,
+    synced_at REAL
+);
+"""
+
+
+class LookupSnapshot:
+    """
+    The small, static lookup tables (CT_*, BPM type tables, doc.Entity) kept in a local SQLite
+    file in WAL mode, so every instance and worker process starts warm and the SQL queries do not
+    have to join them. A table is downloaded again only when its CHECKSUM_AGG / row count on the
+    server differ from the stored version; the check itself runs at most every
+    LOOKUP_SNAPSHOT_CHECK_SECONDS. Each process keeps the tables as dictionaries and reloads them
+    (re-checking the versions) every check_seconds, or every retry_seconds while the server could
+    not be reached and the snapshot is empty.
+    """
+
+    def __init__(self, path=LOOKUP_SNAPSHOT_PATH, check_seconds=LOOKUP_SNAPSHOT_CHECK_SECONDS,
+                 retry_seconds=LOOKUP_SNAPSHOT_RETRY_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.retry_seconds = retry_seconds
+        self._tables = None  # {table_name: {key: value}}
+        self._expires_at = 0.0  # time.monotonic() after which _tables is loaded again
+        self._loaded_tables = set()  # tables downloaded from the server, now or on an earlier run
+        self._lock = threading.Lock()
+
+    def _open(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+        return db
+
+    def _versions(self, connection):
+        """
+        [(table_name, checksum, row_count)] of the lookup tables and the names of the tables whose
+        checksum could not be read. One union query, or one query per table when the union fails.
+        """
+        try:
+            return execute_query(connection, "lookup.checksums"), []
+        except Exception as e:
+            # One unreadable database (e.g. no permission) must not cost the tables of the others
+            logger.info(f"Lookup snapshot: combined checksum query failed ({e}), checking the tables one by one")
+        versions = []
+        failed = []
+        for table_name in LOOKUP_TABLES:
+            try:
+                versions.extend(execute_query(connection, f"lookup.checksum.{table_name}"))
+            except Exception as e:
+                logger.info(f"Lookup snapshot: cannot read the checksum of {table_name}: {e}")
+                failed.append(table_name)
+        return versions, failed
+
+    def _sync(self, db):
+        """
+        Compare the stored versions with the server checksums and download the tables that changed.
+        A table that cannot be read keeps its stored rows. Returns False when the server could not
+        be queried at all.
+        """
+        stored = {row[0]: (row[1], row[2]) for row in db.execute("SELECT table_name, checksum, row_count FROM lookup_versions")}
+        try:
+            # A dedicated connection: lookups run while callers hold pooled connections, borrowing
+            # one more from the same pool here could wait forever when the pool is exhausted
+            connection = open_connection(build_connection_string(
+                os.getenv("DB_SERVER"), os.getenv("DB_NAME"), os.getenv("DB_USER"), os.getenv("DB_PASS")))
+            now = time.time()
+            changed = []
+            versions, failed = self._versions(connection)
+            for table_name, checksum, row_count in versions:
+                if stored.get(table_name) != (checksum, row_count):
+                    try:
+                        rows = execute_query(connection, LOOKUP_TABLES[table_name])
+                    except Exception as e:
+                        logger.info(f"Lookup snapshot: cannot download {table_name}: {e}")
+                        failed.append(table_name)
+                        continue
+                    with db:
+                        db.execute("DELETE FROM lookup_rows WHERE table_name = ?", (table_name,))
+                        db.executemany("INSERT OR REPLACE INTO lookup_rows VALUES (?, ?, ?)",
+                                       [(table_name, row[0], row[1].strip() if row[1] else row[1]) for row in rows])
+                    changed.append(table_name)
+                with db:
+                    db.execute("INSERT OR REPLACE INTO lookup_versions VALUES (?, ?, ?, ?)", (table_name, checksum, row_count, now))
+            if changed:
+                logger.info(f"Lookup snapshot updated: {', '.join(changed)}")
+            if failed:
+                log_and_print(f"Lookup snapshot: could not sync {', '.join(failed)}, keeping the stored rows", "warning", BOLD_RED)
+            return len(failed) < len(LOOKUP_TABLES)
+        except Exception as e:
+            # An unreachable server leaves the last snapshot in use
+            log_and_print(f"Error syncing lookup snapshot: {e}", "error", BOLD_RED)
+            return False
+        finally:
+            if 'connection' in locals():
+                forget_connection(connection)
+                connection.close()
+
+    def _load(self):
+        """
+        Return ({table_name: {key: value}}, loaded table names, complete); complete is False when the
+        sync failed or no rows were found.
+        """
+        db = self._open()
+        try:
+            synced_ok = True
+            synced = db.execute("SELECT COUNT(*), MIN(synced_at) FROM lookup_versions").fetchone()
+            if synced[0] < len(LOOKUP_TABLES) or time.time() - (synced[1] or 0) >= self.check_seconds:
+                synced_ok = self._sync(db)
+            tables = {table_name: {} for table_name in LOOKUP_TABLES}
+            for table_name, key, value in db.execute("SELECT table_name, key, value FROM lookup_rows"):
+                tables.setdefault(table_name, {})[key] = value
+            # A stored version means the rows are a full copy of the server table
+            loaded = {row[0] for row in db.execute("SELECT table_name FROM lookup_versions")}
+            return tables, loaded, synced_ok and any(tables.values())
+        finally:
+            db.close()
+
+    def table(self, table_name):
+        """Return {key: description} of one lookup table."""
+        with self._lock:
+            if self._tables is None or time.monotonic() >= self._expires_at:
+                try:
+                    tables, loaded, complete = self._load()
+                except sqlite3.Error as e:
+                    log_and_print(f"Error reading lookup snapshot {self.path}: {e}", "error", BOLD_RED)
+                    tables, loaded, complete = {table_name: {} for table_name in LOOKUP_TABLES}, set(), False
+                # A failed or empty load is only kept for retry_seconds, so lookups recover once the
+                # server is back without reconnecting for every row of a listing
+                self._tables = tables
+                self._loaded_tables = loaded
+                self._expires_at = time.monotonic() + (self.check_seconds if complete else self.retry_seconds)
+            return self._tables[table_name]
+
+    def loaded(self, table_name):
+        """
+        True when `table_name` holds a full copy of the server table. Only then does a missing key
+        mean the row does not exist (what the dropped INNER JOINs filtered out).
+        """
+        self.table(table_name)
+        return table_name in self._loaded_tables
+
+    def get(self, table_name, key, default=None):
+        """Return the description of `key` in `table_name`, or `default`."""
+        value = self.table(table_name).get(key)
+        return default if value is None else value
+
+    def refresh(self):
+        """Force a checksum comparison with the server and reload the tables on the next lookup."""
+        with self._lock:
+            self._tables = None
+            try:
+                db = self._open()
+                try:
+                    with db:
+                        db.execute("UPDATE lookup_versions SET synced_at = 0")
+                finally:
+                    db.close()
+            except sqlite3.Error as e:
+                log_and_print(f"Error resetting lookup snapshot {self.path}: {e}", "error", BOLD_RED)
+
+
+lookup_snapshot = LookupSnapshot()
+
+
+def lookup(table_name, key, default=None):
+    """Shortcut for lookup_snapshot.get(table_name, key, default)."""
+    return lookup_snapshot.get(table_name, key, default)
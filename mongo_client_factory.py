@@ -0,0 +1,92 @@
+import importlib.util
+import os
+from pymongo import MongoClient
+from logging_utils import logger
+from backend_metrics import BACKEND_METRICS_ENABLED, mongo_command_listener
+from query_plan_capture import QUERY_PLAN_CAPTURE, mongo_plan_listener
+
+# Connection pool of the diagnostic client
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+
+# Wire compression, in order of preference; compressors whose python package is missing are skipped
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+
+# The tool only reads, so keep its traffic off the primary when a secondary is available
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "secondaryPreferred")
+
+# Timeouts in milliseconds
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+
+# Python package each compressor needs (zlib is part of the standard library)
+_COMPRESSOR_MODULES = {
+    "zstd": "zstandard",
+    "snappy": "snappy",
+    "zlib": "zlib",
+}
+
+
+def available_compressors(requested=MONGO_COMPRESSORS):
+    """Return the requested compressors whose python package can be imported, as pymongo expects them."""
+    compressors = []
+    for name in (part.strip() for part in requested.split(",")):
+        module = _COMPRESSOR_MODULES.get(name)
+        if module and importlib.util.find_spec(module) is not None:
+            compressors.append(name)
+    return ",".join(compressors)
+
+
+def mongo_client_options(**overrides):
+    """The MongoClient keyword arguments of the tool; `overrides` replace single settings."""
+    options = {
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    compressors = available_compressors()
+    if compressors:
+        options["compressors"] = compressors
+    event_listeners = []
+    if BACKEND_METRICS_ENABLED:
+        event_listeners.append(mongo_command_listener)
+    if QUERY_PLAN_CAPTURE:
+        event_listeners.append(mongo_plan_listener)
+    if event_listeners:
+        options["event_listeners"] = event_listeners
+    options.update(overrides)
+    return options
+
+
+# Builds every client of the tool; replaced by set_mongo_client_factory (benchmarks, replay)
+_client_factory = MongoClient
+
+
+def set_mongo_client_factory(factory=None):
+    """
+    Replace how clients are built: factory(mongo_connection, **options) returns an object with
+    MongoClient's interface. None restores pymongo.MongoClient.
+    """
+    global _client_factory
+    _client_factory = factory or MongoClient
+
+
+def create_mongo_client(mongo_connection=None, **overrides):
+    """
+    Create the MongoClient used by the tool (defaults: MONGO_CONNECTION_STRING from .env).
+    Pool size, compression, read preference and timeouts come from .env, see the MONGO_* settings above.
+
+    Example:
+        mongo_client = create_mongo_client(mongo_connection_string)
+        db = mongo_client["CaseManagement"]
+    """
+    if mongo_connection is None:
+        mongo_connection = os.getenv("MONGO_CONNECTION_STRING", "")
+    options = mongo_client_options(**overrides)
+    logger.debug(f"MongoDB client: pool {options['minPoolSize']}-{options['maxPoolSize']}, "
+                 f"read preference {options['readPreference']}, compression {options.get('compressors') or 'none'}.")
+    return _client_factory(mongo_connection, **options)
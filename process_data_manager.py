@@ -1,403 +1,139 @@
 import logging
-import pyodbc
 from request_status_mapping import request_status_mapping,request_type_mapping  # Import the mapping
 from logging_utils import log_and_print, normalize_hebrew, logger
-from logging_utils import BOLD_YELLOW, BOLD_GREEN, BOLD_RED
-
-def fetch_process_ids_by_case_id_sorted(case_id, db):
+from logging_utils import BOLD_YELLOW, BOLD_GREEN
+from process_timeline_manager import run_process_engine
+from bpm_utils import (fetch_process_ids_and_request_type_by_case_id_sorted,
+                       bpm_collect_all_processes_steps_and_status)
+from process_snapshot_cache import process_snapshot_cache
+from report_output import emit_record
+from case_context import CaseContext
+
+def fetch_process_ids_by_case_id_sorted(case: CaseContext):
     """
-    Fetch Process IDs from MongoDB for a given Case ID (_id), sorted by LastPublishDate,
-    and return a dictionary with ProcessId as the key and RequestTypeId as the value.
+    Return the Process IDs of the case, sorted by LastPublishDate within each request,
+    as a dictionary with ProcessId as the key and RequestTypeId as the value.
+    Unlike the bpm_utils variant, the case is not restricted to COURT_ID.
     """
-    process_dict = {}
-
-    try:
-        collection = db["Case"]
-        document = collection.find_one(
-            {"_id": case_id},
-            {"Requests.RequestId": 1, "Requests.RequestTypeId": 1, "Requests.Processes.ProcessId": 1, "Requests.Processes.LastPublishDate": 1, "_id": 1}
-        )
-
-        if not document:
-            log_and_print(f"No document found for Case ID {case_id}.")
-            return {}
-
-        requests = document.get("Requests", [])
-        for request in requests:
-            request_id = request.get("RequestId", "N/A")  # Default to "N/A" if not found
-            request_type_id = request.get("RequestTypeId", "N/A")  # Default to "N/A" if not found
-
-            # Log RequestId and RequestTypeId
-            #log_and_print(f"RequestId: {request_id}, RequestTypeId: {request_type_id}")
-
-            processes = request.get("Processes", [])
-            process_list = []  # List to store processes for sorting by LastPublishDate
+    process_dict = {process_id: process["RequestTypeId"] for process_id, process in case.processes_by_id.items()}
+    if not process_dict:
+        log_and_print(f"No processes found for Case ID {case.case_id}.")
+    return process_dict
 
-            for process in processes:
-                process_id = process.get("ProcessId")
-                last_publish_date = process.get("LastPublishDate")
-                if process_id and last_publish_date:
-                    process_list.append((last_publish_date, process_id))
 
-            # If there are valid processes for this request, sort them by LastPublishDate
-            if process_list:
-                process_list.sort(key=lambda x: x[0])  # Sort by LastPublishDate
-                sorted_process_ids = [process[1] for process in process_list]
+def get_case_processes(case: CaseContext, server_name, database_name, user_name, password):
+    """
+    Return the BPM process snapshot of the case (processes, steps and latest status),
+    served from the session cache when it was loaded within the TTL.
+    """
+    def load():
+        process_dic = fetch_process_ids_and_request_type_by_case_id_sorted(case)
+        return bpm_collect_all_processes_steps_and_status(server_name, database_name, user_name, password, process_dic)
 
-                # Store ProcessId as key and RequestTypeId as value in the dictionary
-                for process_id in sorted_process_ids:
-                    process_dict[process_id] = request_type_id
-        #log_and_print(f"process_dict={process_dict}")
-        # Log the final result
-        #log_and_print(f"Sorted Process IDs for Case ID {case_id}: {process_dict}")
-        return process_dict
+    return process_snapshot_cache.get(case.case_id, load)
 
-    except Exception as e:
-        log_and_print(f"Error processing case document: {e}")
-        return {}
 
+def print_process_timeline(timeline):
+    """Renderer: print every process, its steps and the statuses fetched for each step."""
+    query_2_counter = 0  # Counter for the steps
 
-def execute_sql_process_queries(server_name, database_name, user_name, password, process_ids):
-    """Execute SQL queries for each Process ID."""
-    if not process_ids:
-        log_and_print("\nNo Process IDs provided. Exiting.", "warning")
-        return
+    for process in timeline:
+        request_type_id = process["request_type_id"]
+        des_request_heb = normalize_hebrew(request_type_mapping.get(request_type_id, "Unknown Status"))
+        log_and_print(f"\n{des_request_heb}({request_type_id})", "info", BOLD_GREEN, is_hebrew=True, indent=4)
+        log_and_print(f"בקשה חדשה :{process['process_type_name']}", "info", BOLD_YELLOW, is_hebrew=True)
 
-    try:
-        #log_and_print("\nConnecting to SQL Server...", "info")
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-        cursor = connection.cursor()
-        log_and_print("Connection to SQL Server established successfully.", "info", BOLD_GREEN)
+        if not process["steps"]:
+            log_and_print(f"No results found for ProcessID {process['process_id']}.", "warning")
+            continue
 
-        query_2_counter = 0  # Counter for the second query
+        for step in process["steps"]:
+            query_2_counter += 1
+            log_and_print(f"\n************* שלב={query_2_counter} **************", "info", BOLD_GREEN, indent=4, is_hebrew=True)
+            log_and_print(f"{step['process_type_name']}", "info", BOLD_GREEN, indent=4,is_hebrew=True)
+            log_and_print(f"   --{step['activity_type_name']}--", "info", BOLD_GREEN, indent=4,is_hebrew=True)
 
-        for process_id, request_type_id in process_ids.items():
-            #log_and_print(f"\nQuerying SQL for ProcessId: {process_id}", "info", BOLD_YELLOW)
-
-        #for process_id in process_ids:
-        #    log_and_print(f"\nQuerying SQL for ProcessId: {process_id}", "info", BOLD_YELLOW)
-
-            # SQL Query 1
-            sql_query_1 = """
-            SELECT TOP (1000) p.[ProcessID],
-                   pt.[ProcessTypeName]
-            FROM [BPM].[dbo].[Processes] AS p
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt
-                ON pt.[ProcessTypeID] = p.[ProcessTypeID]
-            WHERE p.[ProcessID] = ?;
-            """
-            cursor.execute(sql_query_1, process_id)
-            rows_1 = cursor.fetchall()
-
-            if not rows_1:
-                log_and_print("No results found for the first query.", "warning")
-                continue
+            process_step_id = step["process_step_id"]
+            statuses = step["statuses"]
+            if not statuses:
+                log_and_print(f"\nאין תת תהליכים פעילים בתהליך {process_step_id}.", "warning", is_hebrew=True)
             else:
-                des_request_heb = normalize_hebrew(request_type_mapping.get(request_type_id, "Unknown Status"))
-                log_and_print(f"\n{des_request_heb}({request_type_id})", "info", BOLD_GREEN, is_hebrew=True, indent=4)
-                for row in rows_1:
-                    #log_and_print(f"תהליך = {row[0]}", is_hebrew=True)
-                    #log_and_print(f"  ProcessTypeName = {row[1]}", "info", BOLD_YELLOW, is_hebrew=True)
-                    log_and_print(f"בקשה חדשה :{row[1]}", "info", BOLD_YELLOW, is_hebrew=True)
+                log_and_print(f"\nתת תהליכים פעילים בתהליך {process_step_id} ({len(statuses)}):", "info", BOLD_GREEN, is_hebrew=True)
+                for status in statuses:
+                    log_and_print(f"     מצב = {status['status_description']}", "info", indent=4, is_hebrew=True)
 
-            # SQL Query 2
-            sql_query_2 = """
-            SELECT TOP (1000) ps.[ProcessStepID],
-                   ps.[ProcessID],
-                   pt.[ProcessTypeName],
-                   at.[ActivityTypeName],
-                   ps.[ProcessTypeGatewayID],
-                   ps.[DateForBPETreatment]
-            FROM [BPM].[dbo].[ProcessSteps] AS ps
-            JOIN [BPM].[dbo].[ProcessTypeActivities] AS pta
-                ON ps.[ProcessTypeActivityID] = pta.[ProcessTypeActivityID]
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt
-                ON pt.[ProcessTypeID] = pta.[ProcessTypeID]
-            JOIN [BPM].[dbo].[ActivityTypes] AS at
-                ON at.[ActivityTypeID] = pta.[ActivityTypeID]
-            WHERE ps.[ProcessID] = ?;
-            """
-            cursor.execute(sql_query_2, process_id)
-            rows_2 = cursor.fetchall()
+            emit_record("process_timeline", process_id=process["process_id"], request_type_id=request_type_id,
+                        request_type=request_type_mapping.logical(request_type_id, "Unknown Status"),
+                        process_step_id=process_step_id, process_type_name=step["process_type_name"],
+                        activity_type_id=step["activity_type_id"], activity_type_name=step["activity_type_name"],
+                        date_for_bpe_treatment=step["date_for_bpe_treatment"],
+                        statuses=[{"process_step_status_id": status["process_step_status_id"],
+                                   "status_type_id": status["status_type_id"],
+                                   "status": status["status_description"]} for status in statuses])
 
-            if not rows_2:
-                log_and_print(f"No results found for ProcessID {process_id}.", "warning")
-                continue
 
-            #log_and_print(f"  Results from query (Fetched {len(rows_2)} rows):", "info", BOLD_GREEN)
-            for row in rows_2:
-                query_2_counter += 1   
-                #log_and_print(f"\n", "info")
-                log_and_print(f"\n************* שלב={query_2_counter} **************", "info", BOLD_GREEN, indent=4, is_hebrew=True)            
-
-                try:
-                    process_step_id = row[0]
-                    #log_and_print(f"  ProcessStepID = {row[0]}")
-                    #log_and_print(f"  ProcessID = {row[1]}")
-                    log_and_print(f"{row[2]}", "info", BOLD_GREEN, indent=4,is_hebrew=True)
-                    log_and_print(f"   --{row[3]}--", "info", BOLD_GREEN, indent=4,is_hebrew=True)
+def collect_open_process_tasks(timeline):
+    """
+    Reducer: steps with fewer than 3 status rows are still waiting for treatment.
+    Returns {ProcessStepID: {"process": ActivityTypeName, "request": request description}}.
+    """
+    process_subprocess_count = {}
 
-                    # SQL Query 3
-                    #log_and_print(f"  Information for ProcessStepID {process_step_id}...", "info", BOLD_YELLOW)
-                    sql_query_3 = """
-                    SELECT TOP (1000) p.[ProcessStepStatusID],
-                           p.[ProcessStepID],
-                           s.[Description_Heb]
-                    FROM [BPM].[dbo].[ProcessStepStatuses] AS p
-                    JOIN [BPM].[dbo].[StatusTypes] AS s
-                        ON p.[StatusTypeID] = s.[StatusTypeID]
-                    WHERE p.[ProcessStepID] = ?;
-                    """
-                    cursor.execute(sql_query_3, process_step_id)
-                    rows_3 = cursor.fetchall()
+    for process in timeline:
+        des_request_heb = normalize_hebrew(request_type_mapping.get(process["request_type_id"], "Unknown Status"))
+        for step in process["steps"]:
+            if len(step["statuses"]) < 3:
+                # Collect the process and its associated request
+                process_subprocess_count[step["process_step_id"]] = {
+                    "process": step["activity_type_name"],  # The process name from the ActivityTypeName column
+                    "request": des_request_heb  # The request description
+                }
+                log_and_print(f"Subprocess count = {len(step['statuses'])}: Process = {step['activity_type_name']}, Request = {des_request_heb}", "info", is_hebrew=True)
 
-                    if not rows_3:
-                        log_and_print(f"\nאין תת תהליכים פעילים בתהליך {process_step_id}.", "warning", is_hebrew=True)
-                    else:
-                        log_and_print(f"\nתת תהליכים פעילים בתהליך {process_step_id} ({len(rows_3)}):", "info", BOLD_GREEN, is_hebrew=True)
-                        for row in rows_3:
-                            #log_and_print(f"  ProcessStepStatusID = {row[0]}")
-                            log_and_print(f"     מצב = {row[2]}", "info", indent=4, is_hebrew=True)
+    return process_subprocess_count
 
-                except Exception as e:
-                    log_and_print(f"Error processing ProcessStepID {row[0]}: {e}", "error", BOLD_RED)
 
-    except Exception as e:
-        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
-    finally:
-        if 'connection' in locals():
-            connection.close()
-            log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)
+def print_latest_step_statuses(timeline):
+    """Renderer: print one line per step with its latest status description and request."""
+    for process in timeline:
+        des_request_heb = normalize_hebrew(request_type_mapping.get(process["request_type_id"], "Unknown Status"))
+        for step in process["steps"]:
+            if step["statuses"]:
+                log_and_print(f"{step['activity_type_name']}={step['statuses'][-1]['status_description']}, בקשה= {des_request_heb}", "info", is_hebrew=True)
+    return {}
 
 
+def execute_sql_process_queries(server_name, database_name, user_name, password, process_ids, history=True):
+    """
+    Print the processes, steps and step statuses of each Process ID.
 
-def execute_sql_process_tasks(server_name, database_name, user_name, password, process_ids):
-    """Execute SQL queries for each Process ID."""
+    history=True prints the full ordered status history of every step,
+    history=False prints only the latest status (computed server-side).
+    """
     if not process_ids:
         log_and_print("\nNo Process IDs provided. Exiting.", "warning")
         return
 
-    process_subprocess_count = {}  # Dictionary to store process and request information for subprocess count
-
-    try:
-        #log_and_print("\nConnecting to SQL Server...", "info")
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-        cursor = connection.cursor()
-        log_and_print("Connection to SQL Server established successfully.\n", "info", BOLD_GREEN)
+    run_process_engine(server_name, database_name, user_name, password, process_ids,
+                       print_process_timeline, history=history)
 
-        query_2_counter = 0  # Counter for the second query
 
-        for process_id, request_type_id in process_ids.items():
-            
-            # SQL Query 1
-            sql_query_1 = """
-            SELECT TOP (1000) p.[ProcessID],
-                   pt.[ProcessTypeName]
-            FROM [BPM].[dbo].[Processes] AS p
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt
-                ON pt.[ProcessTypeID] = p.[ProcessTypeID]
-            WHERE p.[ProcessID] = ?;
-            """
-            cursor.execute(sql_query_1, process_id)
-            rows_1 = cursor.fetchall()
-
-            if not rows_1:
-                log_and_print("No results found for the first query.", "warning")
-                continue
-            else:
-                des_request_heb = normalize_hebrew(request_type_mapping.get(request_type_id, "Unknown Status"))
-            
-            # SQL Query 2
-            sql_query_2 = """
-            SELECT TOP (1000) ps.[ProcessStepID],
-                   ps.[ProcessID],
-                   pt.[ProcessTypeName],
-                   at.[ActivityTypeName],
-                   ps.[ProcessTypeGatewayID],
-                   ps.[DateForBPETreatment]
-            FROM [BPM].[dbo].[ProcessSteps] AS ps
-            JOIN [BPM].[dbo].[ProcessTypeActivities] AS pta
-                ON ps.[ProcessTypeActivityID] = pta.[ProcessTypeActivityID]
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt
-                ON pt.[ProcessTypeID] = pta.[ProcessTypeID]
-            JOIN [BPM].[dbo].[ActivityTypes] AS at
-                ON at.[ActivityTypeID] = pta.[ActivityTypeID]
-            WHERE ps.[ProcessID] = ?;
-            """
-            cursor.execute(sql_query_2, process_id)
-            rows_2 = cursor.fetchall()
-
-            if not rows_2:
-                log_and_print(f"No results found for ProcessID {process_id}.", "warning")
-                continue
-
-            for row in rows_2:
-                query_2_counter += 1
-               
-                try:
-                    process_step_id = row[0]
-                  
-                    # SQL Query 3
-                    sql_query_3 = """
-                    SELECT TOP (1000) p.[ProcessStepStatusID],
-                           p.[ProcessStepID],
-                           s.[Description_Heb]
-                    FROM [BPM].[dbo].[ProcessStepStatuses] AS p
-                    JOIN [BPM].[dbo].[StatusTypes] AS s
-                        ON p.[StatusTypeID] = s.[StatusTypeID]
-                    WHERE p.[ProcessStepID] = ?;
-                    """
-                    cursor.execute(sql_query_3, process_step_id)
-                    rows_4 = cursor.fetchall()
-
-                    
-                    if len(rows_4) < 3:
-                        # Collect the process and its associated request
-                        subprocess_data = {
-                            "process": row[3],  # The process name from the ActivityTypeName column
-                            "request": des_request_heb  # The request description
-                        }
-                        process_subprocess_count[process_step_id] = subprocess_data
-
-                        log_and_print(f"Subprocess count = {len(rows_4)}: Process = {row[3]}, Request = {des_request_heb}", "info", is_hebrew=True)
-
-                except Exception as e:
-                    log_and_print(f"Error processing ProcessStepID {row[0]}: {e}", "error", BOLD_RED)
-
-        return process_subprocess_count  # Return the dictionary with process and associated request information
+def execute_sql_process_tasks(server_name, database_name, user_name, password, process_ids):
+    """Return the process steps that are still waiting for treatment, keyed by ProcessStepID."""
+    if not process_ids:
+        log_and_print("\nNo Process IDs provided. Exiting.", "warning")
+        return
 
-    except Exception as e:
-        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
-    finally:
-        if 'connection' in locals():
-            connection.close()
-            log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)
+    # The reducer counts status rows per step, so it needs the full history
+    return run_process_engine(server_name, database_name, user_name, password, process_ids,
+                              collect_open_process_tasks, history=True)
 
 
 def execute_sql_all_processes(server_name, database_name, user_name, password, process_ids):
-    """Execute SQL queries for each Process ID."""
+    """Print the latest status of every step of each Process ID."""
     if not process_ids:
         log_and_print("\nNo Process IDs provided. Exiting.", "warning")
         return
 
-    process_subprocess_count = {}  # Dictionary to store process and request information for subprocess count
-
-    try:
-        #log_and_print("\nConnecting to SQL Server...", "info")
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-        
-        cursor = connection.cursor()
-        log_and_print("Connection to SQL Server established successfully.\n", "info", BOLD_GREEN)
-
-        query_2_counter = 0  # Counter for the second query
-        
-        for process_id, request_type_id in process_ids.items():
-            
-            # SQL Query 1
-            sql_query_1 = """
-            SELECT TOP (1000) p.[ProcessID],
-                   pt.[ProcessTypeName]
-            FROM [BPM].[dbo].[Processes] AS p
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt
-                ON pt.[ProcessTypeID] = p.[ProcessTypeID]
-            WHERE p.[ProcessID] = ?;
-            """
-            cursor.execute(sql_query_1, process_id)
-            rows_1 = cursor.fetchall()
-
-            if not rows_1:
-                log_and_print("No results found for the first query.", "warning")
-                continue
-            else:
-                des_request_heb = normalize_hebrew(request_type_mapping.get(request_type_id, "Unknown Status"))
-            
-            # SQL Query 2
-            sql_query_2 = """
-            SELECT TOP (1000) ps.[ProcessStepID],
-                   ps.[ProcessID],
-                   pt.[ProcessTypeName],
-                   at.[ActivityTypeName],
-                   ps.[ProcessTypeGatewayID],
-                   ps.[DateForBPETreatment]
-            FROM [BPM].[dbo].[ProcessSteps] AS ps
-            JOIN [BPM].[dbo].[ProcessTypeActivities] AS pta
-                ON ps.[ProcessTypeActivityID] = pta.[ProcessTypeActivityID]
-            JOIN [BPM].[dbo].[ProcessTypes] AS pt
-                ON pt.[ProcessTypeID] = pta.[ProcessTypeID]
-            JOIN [BPM].[dbo].[ActivityTypes] AS at
-                ON at.[ActivityTypeID] = pta.[ActivityTypeID]
-            WHERE ps.[ProcessID] = ?;
-            """
-            cursor.execute(sql_query_2, process_id)
-            rows_2 = cursor.fetchall()
-
-            if not rows_2:
-                log_and_print(f"No results found for ProcessID {process_id}.", "warning")
-                continue
-
-            for row in rows_2:
-                query_2_counter += 1
-               
-                try:
-                    process_step_id = row[0]
-                  
-                    # SQL Query 3
-                    sql_query_3 = """
-                    SELECT TOP (1000) p.[ProcessStepStatusID],
-                           p.[ProcessStepID],
-                           s.[Description_Heb]
-                    FROM [BPM].[dbo].[ProcessStepStatuses] AS p
-                    JOIN [BPM].[dbo].[StatusTypes] AS s
-                        ON p.[StatusTypeID] = s.[StatusTypeID]
-                    WHERE p.[ProcessStepID] = ?;
-                    """
-                    cursor.execute(sql_query_3, process_step_id)
-                    rows_4 = cursor.fetchall()
-                    #log_and_print(f"rows_4={rows_4[-1][2]}","info", is_hebrew=True)
-                    log_and_print(f"{row[3].strip()}={rows_4[-1][2]}, בקשה= {des_request_heb}", "info", is_hebrew=True)
-                    """
-                    if len(rows_4) < 3:
-                        # Collect the process and its associated request
-                        subprocess_data = {
-                            "process": row[3],  # The process name from the ActivityTypeName column
-                            "request": des_request_heb  # The request description
-                        }
-                        process_subprocess_count[process_step_id] = subprocess_data
-
-                        log_and_print(f"תהליך בהמתנה={row[3].strip()}, בקשה= {des_request_heb}", "info", is_hebrew=True)
-                    else:
-                        
-                        log_and_print(f"תהליך הושלם={row[3].strip()}, בקשה= {des_request_heb}", "info", is_hebrew=True)    
-                    """
-                except Exception as e:
-                    log_and_print(f"Error processing ProcessStepID {row[0]}: {e}", "error", BOLD_RED)
-
-        return process_subprocess_count  # Return the dictionary with process and associated request information
-
-    except Exception as e:
-        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
-    finally:
-        if 'connection' in locals():
-            connection.close()
-            log_and_print("\nSQL Server connection closed.", "info", BOLD_GREEN)
+    return run_process_engine(server_name, database_name, user_name, password, process_ids,
+                              print_latest_step_statuses)
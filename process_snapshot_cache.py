@@ -0,0 +1,45 @@
+import os
+import time
+from logging_utils import log_and_print
+
+# How long (seconds) a case's process snapshot is served from memory before it is fetched again
+PROCESS_SNAPSHOT_TTL_SECONDS = int(os.getenv("PROCESS_SNAPSHOT_TTL_SECONDS", "300"))
+
+
+class ProcessSnapshotCache:
+    """
+    Case-scoped cache of the BPM process snapshot (the list returned by
+    bpm_collect_all_processes_steps_and_status), shared by the menu options
+    that show processes, judge tasks and distributions.
+    """
+
+    def __init__(self, ttl_seconds=PROCESS_SNAPSHOT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # case_id -> (loaded_at, snapshot)
+
+    def get(self, case_id, loader):
+        """
+        Return the snapshot of the case, calling loader() only when there is no
+        cached snapshot or it is older than the TTL. Empty results are not cached.
+        """
+        entry = self._entries.get(case_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+
+        snapshot = loader()
+        if snapshot:
+            self._entries[case_id] = (time.monotonic(), snapshot)
+        else:
+            self._entries.pop(case_id, None)
+        return snapshot
+
+    def invalidate(self, case_id=None):
+        """Drop the snapshot of one case, or of all cases when case_id is None."""
+        if case_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(case_id, None)
+        log_and_print("Process snapshot cache cleared.", "info")
+
+
+process_snapshot_cache = ProcessSnapshotCache()
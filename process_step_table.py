@@ -0,0 +1,81 @@
+from array import array
+from collections.abc import Sequence
+from itertools import chain
+
+# Which BPM ActivityTypeIDs (see activity_type_mapping in bpm_utils) belong to each role view
+ROLE_ACTIVITY_TYPES = {
+    "population": (13, 18, 19, 20, 21, 27, 44, 48),                       # הפצה
+    "judge": (3, 7, 10, 11, 12, 14, 26, 37, 38, 39, 40, 41, 43),          # משימות דיין
+    "secretary": (4, 6, 8, 9, 15, 16),                                   # משימות מזכירה
+}
+
+# Step statuses below this StatusTypeID are still open (new / reopened / activated)
+OPEN_STATUS_LIMIT = 4
+
+
+def _union(position_arrays):
+    """Sorted positions that appear in any of `position_arrays` (each one sorted, disjoint)."""
+    return array('i', sorted(chain.from_iterable(position_arrays)))
+
+
+class ProcessStepTable(Sequence):
+    """
+    The read-only sequence of process-step dictionaries returned by
+    bpm_collect_all_processes_steps_and_status, indexed by (activity type, status): every pair
+    keeps the sorted positions of its rows, so a filter only visits the rows it returns and costs
+    time proportional to the number of matches, not to the size of the table.
+
+    Example:
+        table = ProcessStepTable(rows)
+        open_judge_steps = table.select(table.role_positions("judge", table.open_status_ids()))
+    """
+
+    def __init__(self, rows=()):
+        if isinstance(rows, dict):
+            rows = rows.values()
+        self._rows = tuple(row for row in rows if 'process_step_status' in row)
+        self._index = {}  # {ActivityTypeID: {StatusTypeID: array of row positions}}
+
+        for position, row in enumerate(self._rows):
+            by_status = self._index.setdefault(row.get('process_activity_name'), {})
+            by_status.setdefault(row['process_step_status'], array('i')).append(position)
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return f"ProcessStepTable({list(self._rows)!r})"
+
+    def positions(self, activity_ids=None, status_ids=None):
+        """
+        Sorted positions of the rows whose activity type is one of `activity_ids` and whose current
+        status is one of `status_ids`; None does not filter on that column.
+        """
+        activities = self._index if activity_ids is None else set(activity_ids)
+        statuses = None if status_ids is None else set(status_ids)
+        selected = []
+        for activity_id in activities:
+            by_status = self._index.get(activity_id)
+            if not by_status:
+                continue
+            if statuses is None:
+                selected.extend(by_status.values())
+            else:
+                selected.extend(by_status[status_id] for status_id in statuses if status_id in by_status)
+        return _union(selected)
+
+    def role_positions(self, role, status_ids=None):
+        """positions() of the activity types of `role` (see ROLE_ACTIVITY_TYPES)."""
+        return self.positions(ROLE_ACTIVITY_TYPES[role], status_ids)
+
+    def open_status_ids(self):
+        """The StatusTypeIDs in the table that are still open (below OPEN_STATUS_LIMIT)."""
+        return {status_id for by_status in self._index.values() for status_id in by_status
+                if isinstance(status_id, int) and status_id < OPEN_STATUS_LIMIT}
+
+    def select(self, positions):
+        """Return the rows at `positions`, in table order."""
+        return [self._rows[position] for position in positions]
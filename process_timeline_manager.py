@@ -0,0 +1,194 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from logging_utils import log_and_print, BOLD_RED
+from sql_connection_manager import sql_connection
+from sql_query_catalog import execute_in_query
+from lookup_snapshot import lookup
+
+# Default degree of parallelism (one SQL connection per worker) for the process engine
+BPM_FETCH_WORKERS = int(os.getenv("BPM_FETCH_WORKERS", "1"))
+
+
+def _process_key(process_id):
+    """SQL Server returns uniqueidentifiers upper-cased, Mongo stores them lower-cased."""
+    return str(process_id).lower()
+
+
+def _step_from_row(row):
+    """
+    Step dictionary of a (ProcessStepID, ProcessID, ProcessTypeID, ActivityTypeID, ProcessTypeGatewayID, DateForBPETreatment) row.
+    Names missing from the lookup snapshot show the raw ID.
+    """
+    return {
+        "process_step_id": row[0],
+        "process_type_name": lookup("ProcessTypes", row[2], row[2]),
+        "activity_type_id": row[3],
+        "activity_type_name": lookup("ActivityTypes", row[3], row[3]),
+        "process_type_gateway_id": row[4],
+        "date_for_bpe_treatment": row[5],
+        "statuses": []
+    }
+
+
+def fetch_process_timeline(cursor, process_ids, node_id=None, history=False):
+    """
+    Fetch processes, steps and step statuses for all given Process IDs with a constant
+    number of round trips.
+
+    Args:
+        cursor: An open pyodbc cursor on the BPM server.
+        process_ids (dict): {ProcessId: RequestTypeId}, in the order to return them.
+        node_id (str, optional): When given, only processes of this LdapLeafID are returned.
+        history (bool): False returns only the latest status of every step (window function
+            on the server), True returns the full status history ordered by ProcessStepStatusID.
+
+    Returns:
+        list: One dictionary per found process, in `process_ids` order:
+            {"process_id", "request_type_id", "process_type_name", "steps": [
+                {"process_step_id", "process_type_name", "activity_type_id", "activity_type_name",
+                 "process_type_gateway_id", "date_for_bpe_treatment",
+                 "statuses": [{"process_step_status_id", "status_type_id", "status_description"}]}]}
+            Processes that were not found have no entry; found processes without steps have an empty "steps".
+    """
+    process_id_list = [process_id for process_id in process_ids if process_id]
+    if not process_id_list:
+        return []
+
+    if node_id is not None:
+        process_rows = execute_in_query(cursor, "bpm.processes_by_node", process_id_list, node_id)
+    else:
+        process_rows = execute_in_query(cursor, "bpm.processes", process_id_list)
+    process_type_by_process = {_process_key(row[0]): lookup("ProcessTypes", row[1], row[1]) for row in process_rows}
+
+    found_process_ids = [process_id for process_id in process_id_list if _process_key(process_id) in process_type_by_process]
+    steps_by_process = {}
+    steps_by_id = {}
+    for row in execute_in_query(cursor, "bpm.process_steps", found_process_ids):
+        step = _step_from_row(row)
+        steps_by_process.setdefault(_process_key(row[1]), []).append(step)
+        steps_by_id[row[0]] = step
+
+    statuses_query = "bpm.step_status_history" if history else "bpm.step_status_latest"
+    for row in execute_in_query(cursor, statuses_query, list(steps_by_id)):
+        steps_by_id[row[1]]["statuses"].append({
+            "process_step_status_id": row[0],
+            "status_type_id": row[2],
+            "status_description": lookup("StatusTypes", row[2], row[2])
+        })
+
+    timeline = []
+    for process_id in process_id_list:
+        key = _process_key(process_id)
+        if key not in process_type_by_process:
+            log_and_print(f"No results found for ProcessID {process_id}.", "warning")
+            continue
+        timeline.append({
+            "process_id": process_id,
+            "request_type_id": process_ids[process_id],
+            "process_type_name": process_type_by_process[key],
+            "steps": steps_by_process.get(key, [])
+        })
+
+    return timeline
+
+
+def fetch_open_step_updates(cursor, process_ids, open_step_ids, step_high_water, status_high_water):
+    """
+    Incremental refresh for watch mode: only rows newer than the high-water marks, so a refresh
+    costs a few rows. New steps are looked up in every watched process (a process whose steps are
+    all terminal, or that has none yet, can still get a new one); statuses only for open steps.
+
+    Args:
+        process_ids (list): All watched processes.
+        open_step_ids (list): ProcessStepIDs whose latest status is not terminal.
+        step_high_water: Highest ProcessStepID already seen.
+        status_high_water: Highest ProcessStepStatusID already seen.
+
+    Returns:
+        tuple: (new_steps, new_statuses) where new_steps is a list of (process_id, step dict)
+            shaped like fetch_process_timeline steps, and new_statuses is a list of
+            {"process_step_id", "process_step_status_id", "status_type_id", "status_description"}
+            ordered by ProcessStepStatusID.
+    """
+    new_steps = []
+    if process_ids:
+        for row in execute_in_query(cursor, "bpm.new_process_steps", process_ids, step_high_water):
+            new_steps.append((row[1], _step_from_row(row)))
+
+    step_ids = list(open_step_ids) + [step["process_step_id"] for _, step in new_steps]
+    new_statuses = []
+    if step_ids:
+        for row in execute_in_query(cursor, "bpm.new_step_statuses", step_ids, status_high_water):
+            new_statuses.append({
+                "process_step_id": row[1],
+                "process_step_status_id": row[0],
+                "status_type_id": row[2],
+                "status_description": lookup("StatusTypes", row[2], row[2])
+            })
+        new_statuses.sort(key=lambda status: status["process_step_status_id"])
+
+    return new_steps, new_statuses
+
+
+def _fetch_process_timeline_on_own_connection(connection_args, process_ids, node_id, history):
+    """Worker: fetch the timeline of a slice of the processes on its own pooled connection."""
+    with sql_connection(*connection_args) as connection:
+        return fetch_process_timeline(connection.cursor(), process_ids, node_id=node_id, history=history)
+
+
+def fetch_process_timeline_parallel(connection_args, process_ids, parallel, node_id=None, history=False):
+    """
+    Split the process IDs into `parallel` slices, fetch each slice on its own pooled
+    connection in a thread pool and merge the results back in the original `process_ids` order
+    (the LastPublishDate order built from Mongo).
+    """
+    process_id_list = [process_id for process_id in process_ids if process_id]
+    workers = max(1, min(parallel, len(process_id_list)))
+    slice_size = -(-len(process_id_list) // workers)  # ceiling division
+    slices = [
+        {process_id: process_ids[process_id] for process_id in process_id_list[start:start + slice_size]}
+        for start in range(0, len(process_id_list), slice_size)
+    ]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bpm-fetch") as executor:
+        futures = [
+            executor.submit(_fetch_process_timeline_on_own_connection, connection_args, process_slice, node_id, history)
+            for process_slice in slices
+        ]
+        results = [process for future in futures for process in future.result()]
+
+    position = {_process_key(process_id): index for index, process_id in enumerate(process_id_list)}
+    results.sort(key=lambda process: position[_process_key(process["process_id"])])
+    return results
+
+
+def run_process_engine(server_name, database_name, user_name, password, process_ids, renderer, history=False, node_id=None, parallel=None):
+    """
+    The single BPM process-data engine: fetch the process timeline once and hand it to
+    `renderer`, which prints or reduces it.
+
+    Args:
+        process_ids (dict): {ProcessId: RequestTypeId}.
+        renderer (callable): Called with the timeline list, its return value is returned.
+        history (bool): Fetch the full status history instead of the latest status only.
+        node_id (str, optional): Restrict to processes of this LdapLeafID.
+        parallel (int, optional): Number of worker connections; defaults to BPM_FETCH_WORKERS.
+            With 1 the whole case is fetched on a single connection.
+
+    Returns:
+        The renderer's return value, or None if the query failed.
+    """
+    if parallel is None:
+        parallel = BPM_FETCH_WORKERS
+    connection_args = (server_name, database_name, user_name, password)
+
+    try:
+        if parallel > 1 and len(process_ids) > 1:
+            timeline = fetch_process_timeline_parallel(connection_args, process_ids, parallel, node_id=node_id, history=history)
+        else:
+            timeline = _fetch_process_timeline_on_own_connection(connection_args, process_ids, node_id, history)
+        return renderer(timeline)
+
+    except Exception as e:
+        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
+        return None
@@ -0,0 +1,262 @@
+import atexit
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from pymongo import monitoring
+from logging_utils import log_and_print, logger, BOLD_YELLOW, BOLD_GREEN, BOLD_RED
+
+# Diagnostic mode: capture the plan of each distinct SQL / Mongo query shape and write a report at exit
+QUERY_PLAN_CAPTURE = os.getenv("QUERY_PLAN_CAPTURE", "0") == "1"
+
+# Summary report (one section per shape, flagged shapes first)
+QUERY_PLAN_REPORT = os.getenv("QUERY_PLAN_REPORT", "query_plan_report.txt")
+
+# Raw plans: SHOWPLAN XML of the SQL shapes, explain("executionStats") JSON of the Mongo shapes
+QUERY_PLAN_DIR = os.getenv("QUERY_PLAN_DIR", "query_plans")
+
+# Mongo commands whose plan is captured (getMore continues a captured find / aggregate)
+_EXPLAINED_COMMANDS = ("find", "aggregate", "count", "distinct")
+
+# Parts of a command that belong to the session / wire protocol, not to the query
+_SESSION_FIELDS = ("lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern")
+
+# SQL Server operators reported as scans / lookups
+_SQL_SCAN_OPERATORS = ("Table Scan", "Index Scan", "Clustered Index Scan")
+_SQL_LOOKUP_OPERATORS = ("Key Lookup", "RID Lookup")
+
+_SHOWPLAN_NS = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"
+_LOGICAL_READS = re.compile(r"Table '([^']+)'\. Scan count (\d+), logical reads (\d+)")
+
+
+class CapturedPlan:
+    """One query shape and what its plan showed."""
+
+    def __init__(self, backend, name, shape):
+        self.backend = backend  # "sql" or "mongo"
+        self.name = name        # catalog name / "<database>.<collection>.<command>"
+        self.shape = shape      # statement text / command with the values replaced by "?"
+        self.flags = []         # e.g. "COLLSCAN", "Table Scan [Responses].[dbo].[Assignments]"
+        self.stats = {}         # rows, reads, docs examined...
+        self.plan_file = None
+        self.error = None
+
+
+_lock = threading.Lock()
+_plans = {}            # shape key -> CapturedPlan
+_pending_mongo = {}    # shape key -> (database, command) explained at exit
+
+
+def _plan_file(plan, extension, content):
+    """Save a raw plan under QUERY_PLAN_DIR and remember its path on the plan."""
+    try:
+        os.makedirs(QUERY_PLAN_DIR, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]", "_", plan.name)
+        plan.plan_file = os.path.join(QUERY_PLAN_DIR, f"{plan.backend}-{len(_plans):03d}-{safe_name}.{extension}")
+        with open(plan.plan_file, "w", encoding="utf-8") as output:
+            output.write(content)
+    except OSError as e:
+        logger.error(f"Error saving query plan {plan.name}: {e}")
+
+
+############################# SQL Server #########################
+
+def _analyze_showplan(plan, showplan_xml):
+    root = ET.fromstring(showplan_xml)
+    for rel_op in root.iter(f"{_SHOWPLAN_NS}RelOp"):
+        operator = rel_op.get("PhysicalOp")
+        index_scan = rel_op.find(f"{_SHOWPLAN_NS}IndexScan")
+        if operator == "Clustered Index Seek" and index_scan is not None and index_scan.get("Lookup") in ("1", "true"):
+            operator = "Key Lookup"  # how older servers show a key lookup
+        if operator not in _SQL_SCAN_OPERATORS and operator not in _SQL_LOOKUP_OPERATORS:
+            continue
+        table = rel_op.find(f".//{_SHOWPLAN_NS}Object")
+        table_name = "" if table is None else ".".join(table.get(part) for part in ("Database", "Schema", "Table") if table.get(part))
+        flag = f"{operator} {table_name}".strip()
+        if flag not in plan.flags:
+            plan.flags.append(flag)
+
+
+def capture_sql_plan(connection, name, sql, params):
+    """
+    Run a catalog statement once more with SET STATISTICS XML / IO ON the first time its shape
+    (statement text) is seen, and record its actual plan. Called from sql_query_catalog.
+    """
+    key = ("sql", sql)
+    with _lock:
+        if key in _plans:
+            return
+        plan = _plans[key] = CapturedPlan("sql", name, sql.strip())
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SET STATISTICS XML ON; SET STATISTICS IO ON;")
+        cursor.execute(sql, *params)
+        messages = []
+        rows = 0
+        while True:
+            messages.extend(message for _, message in getattr(cursor, "messages", None) or [])
+            if cursor.description and cursor.description[0][0].endswith("Showplan"):
+                showplan_xml = cursor.fetchone()[0]
+                _plan_file(plan, "sqlplan", showplan_xml)
+                _analyze_showplan(plan, showplan_xml)
+            elif cursor.description:
+                rows += len(cursor.fetchall())
+            if not cursor.nextset():
+                break
+        plan.stats["rows"] = rows
+        for table, scans, reads in _LOGICAL_READS.findall("\n".join(messages)):
+            plan.stats[f"logical reads {table}"] = int(reads)
+            plan.stats[f"scan count {table}"] = int(scans)
+    except Exception as e:
+        plan.error = str(e)
+    finally:
+        try:
+            cursor.execute("SET STATISTICS XML OFF; SET STATISTICS IO OFF;")
+        except Exception:
+            pass
+        cursor.close()
+
+
+############################# MongoDB #########################
+
+def _shape(value):
+    """The query with every literal replaced by "?" (operators and field names are kept)."""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shape(item) for item in value]
+    return "?"
+
+
+def _mongo_shape(command_name, command):
+    shape = {command_name: command[command_name]}
+    for field in ("filter", "query", "pipeline", "key"):
+        if field in command:
+            shape[field] = _shape(command[field]) if field != "key" else command[field]
+    for field in ("sort", "projection"):
+        if field in command:
+            shape[field] = dict(command[field])
+    return shape
+
+
+class MongoPlanListener(monitoring.CommandListener):
+    """Collects the first command of each find / aggregate / count / distinct shape for explain at exit."""
+
+    def started(self, event):
+        if event.command_name not in _EXPLAINED_COMMANDS:
+            return
+        command = {key: value for key, value in event.command.items()
+                   if not key.startswith("$") and key not in _SESSION_FIELDS}
+        shape = _mongo_shape(event.command_name, command)
+        key = ("mongo", event.database_name, json.dumps(shape, sort_keys=True, default=str))
+        with _lock:
+            if key in _plans:
+                return
+            _plans[key] = CapturedPlan("mongo", f"{event.database_name}.{command[event.command_name]}.{event.command_name}",
+                                       json.dumps(shape, ensure_ascii=False, default=str))
+            _pending_mongo[key] = (event.database_name, command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+mongo_plan_listener = MongoPlanListener()
+
+
+def _explain_stages(document, stages):
+    """Every "stage" of an explain document (classic and slot-based plans, aggregate $cursor stages)."""
+    if isinstance(document, dict):
+        if isinstance(document.get("stage"), str):
+            stages.append(document["stage"])
+        for value in document.values():
+            _explain_stages(value, stages)
+    elif isinstance(document, list):
+        for value in document:
+            _explain_stages(value, stages)
+    return stages
+
+
+def _find_execution_stats(document):
+    if isinstance(document, dict):
+        if "totalDocsExamined" in document:
+            return document
+        for value in document.values():
+            found = _find_execution_stats(value)
+            if found:
+                return found
+    elif isinstance(document, list):
+        for value in document:
+            found = _find_execution_stats(value)
+            if found:
+                return found
+    return None
+
+
+def _explain_mongo_plans():
+    with _lock:
+        pending = list(_pending_mongo.items())
+        _pending_mongo.clear()
+    if not pending:
+        return
+
+    from mongo_client_factory import create_mongo_client
+    client = create_mongo_client(event_listeners=[])
+    try:
+        for key, (database_name, command) in pending:
+            plan = _plans[key]
+            try:
+                explain = client[database_name].command("explain", command, verbosity="executionStats")
+                _plan_file(plan, "json", json.dumps(explain, ensure_ascii=False, indent=2, default=str))
+                stages = _explain_stages(explain, [])
+                if "COLLSCAN" in stages:
+                    plan.flags.append("COLLSCAN")
+                if "SORT" in stages:
+                    plan.flags.append("in-memory SORT")
+                stats = _find_execution_stats(explain) or {}
+                plan.stats = {field: stats[field] for field in ("nReturned", "totalKeysExamined", "totalDocsExamined", "executionTimeMillis") if field in stats}
+                if plan.stats.get("totalDocsExamined", 0) > 10 * max(plan.stats.get("nReturned", 0), 1):
+                    plan.flags.append("docs examined > 10 x returned")
+            except Exception as e:
+                plan.error = str(e)
+    finally:
+        client.close()
+
+
+############################# report #########################
+
+def write_query_plan_report(path=QUERY_PLAN_REPORT):
+    """Explain the collected Mongo shapes and write the report, flagged shapes first."""
+    _explain_mongo_plans()
+    with _lock:
+        plans = list(_plans.values())
+    if not plans:
+        return
+
+    plans.sort(key=lambda plan: (not plan.flags, plan.backend, plan.name))
+    flagged = sum(1 for plan in plans if plan.flags)
+    try:
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(f"Query plans: {len(plans)} shapes, {flagged} flagged (scans / lookups)\n")
+            for plan in plans:
+                output.write(f"\n=== [{plan.backend}] {plan.name} ===\n")
+                output.write(f"flags: {', '.join(plan.flags) or 'none'}\n")
+                for field, value in plan.stats.items():
+                    output.write(f"{field}: {value}\n")
+                if plan.error:
+                    output.write(f"error: {plan.error}\n")
+                if plan.plan_file:
+                    output.write(f"plan: {plan.plan_file}\n")
+                output.write(f"{plan.shape}\n")
+        log_and_print(f"Query plan report: {len(plans)} shapes, {flagged} flagged, written to {path}.", "info",
+                      BOLD_YELLOW if flagged else BOLD_GREEN)
+    except OSError as e:
+        log_and_print(f"Error writing query plan report {path}: {e}", "error", BOLD_RED)
+
+
+if QUERY_PLAN_CAPTURE:
+    atexit.register(write_query_plan_report)
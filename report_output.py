@@ -0,0 +1,128 @@
+import atexit
+import datetime
+import decimal
+import json
+import os
+import threading
+import uuid
+from logging_utils import log_and_print, VisualStr, BOLD_RED
+
+# Structured output of the reports next to the console lines: "" (off), "jsonl" or "parquet"
+REPORT_FORMAT = os.getenv("REPORT_FORMAT", "").strip().lower()
+
+# Directory the report files are written to
+REPORT_DIR = os.getenv("REPORT_DIR", "reports")
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def _plain(value):
+    """Make a field JSON / Arrow friendly: logical-order text, ISO dates, strings for ids."""
+    if isinstance(value, VisualStr):
+        return value.logical
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)  # ObjectId, uuid.UUID, bytes...
+
+
+def _arrow_column(values):
+    """Arrow array of one report column; a column whose values do not share one type is written as text."""
+    try:
+        return pyarrow.array(values)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        # e.g. request_type_id is an int for most processes and "N/A" for some
+        return pyarrow.array([value if value is None or isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+                              for value in values], pyarrow.string())
+
+
+def _arrow_table(rows):
+    """Arrow table with a column for every key of any record (missing values are null), in first-seen order."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    return pyarrow.Table.from_arrays([_arrow_column([row.get(column) for row in rows]) for column in columns], names=columns)
+
+
+class ReportWriter:
+    """
+    Writes report records, one file per report name, without any ANSI or bidi formatting.
+    JSON Lines files are appended as records arrive; Parquet records are collected and written
+    in one file per report by close() (called at exit). A report whose Parquet file cannot be
+    written is written as JSON Lines instead, so its records are not lost.
+    """
+
+    def __init__(self, report_format=REPORT_FORMAT, report_dir=REPORT_DIR):
+        if report_format == "parquet" and pyarrow is None:
+            log_and_print("REPORT_FORMAT=parquet needs pyarrow, writing JSON Lines instead.", "warning", BOLD_RED)
+            report_format = "jsonl"
+        self.report_format = report_format
+        self.report_dir = report_dir
+        self.run_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        self._files = {}    # report -> open jsonl file
+        self._records = {}  # report -> [record] for parquet
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.report_format in ("jsonl", "parquet")
+
+    def emit(self, report, record):
+        record = {"report": report, "run_id": self.run_id, **{key: _plain(value) for key, value in record.items()}}
+        with self._lock:
+            if self.report_format == "parquet":
+                self._records.setdefault(report, []).append(record)
+                return
+            output = self._files.get(report)
+            if output is None:
+                output = self._files[report] = self._open_jsonl(report)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _open_jsonl(self, report):
+        os.makedirs(self.report_dir, exist_ok=True)
+        return open(os.path.join(self.report_dir, f"{report}.jsonl"), "a", encoding="utf-8")
+
+    def close(self):
+        """Flush the JSON Lines files and write the collected Parquet files."""
+        with self._lock:
+            files, self._files = self._files, {}
+            records, self._records = self._records, {}
+        for output in files.values():
+            output.close()
+        for report, rows in records.items():
+            try:
+                os.makedirs(self.report_dir, exist_ok=True)
+                path = os.path.join(self.report_dir, f"{report}-{self.run_id}.parquet")
+                pyarrow.parquet.write_table(_arrow_table(rows), path)
+            except Exception as e:
+                log_and_print(f"Error writing report {report} as Parquet, writing JSON Lines instead: {e}", "error", BOLD_RED)
+                try:
+                    with self._open_jsonl(report) as output:
+                        output.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in rows)
+                except Exception as e:
+                    log_and_print(f"Error writing report {report}: {e}", "error", BOLD_RED)
+
+
+report_writer = ReportWriter()
+atexit.register(report_writer.close)
+
+
+def emit_record(report, **fields):
+    """
+    Add one structured record to `report` (a file name such as "requests" or "process_steps").
+    Does nothing unless REPORT_FORMAT is jsonl or parquet.
+
+    Example:
+        emit_record("assignments", case_id=case_id, assignment_id=row[0], due_date=row[6])
+    """
+    if report_writer.enabled:
+        report_writer.emit(report, fields)
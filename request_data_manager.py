@@ -2,6 +2,8 @@ from typing import List
 from pymongo.database import Database
 from logging_utils import log_and_print, BOLD_YELLOW, BOLD_GREEN, BOLD_RED, normalize_hebrew, logger  # Importing from your logging utility
 from request_status_mapping import request_status_mapping,request_type_mapping  # Import the mapping
+from report_output import emit_record, report_writer
+from case_context import CaseContext
 
 
 def get_request_description(request_id: int, db: Database) -> str:
@@ -50,26 +52,23 @@ def get_request_description(request_id: int, db: Database) -> str:
 
 
 
-def parse_requests_by_case_id(case_id: str, db: Database) -> None:
+def parse_requests_by_case_id(case: CaseContext) -> None:
     """
-    Parse the Requests array for a given Case ID and display specified fields using log_and_print.
+    Parse the Requests array of the case and display specified fields using log_and_print.
 
     Args:
-        case_id (str): The Case ID to fetch data for.
-        db (Database): The MongoDB database connection.
+        case (CaseContext): The case to display.
 
     Returns:
         None
     """
+    case_id = case.case_id
     try:
-        collection = db["Case"]
-        document = collection.find_one({"_id": case_id}, {"Requests": 1, "_id": 0})
-
-        if not document:
+        if not case.exists:
             log_and_print(f"No document found for Case ID {case_id}.", "info", BOLD_RED, is_hebrew=True)
             return
 
-        requests = document.get("Requests", [])
+        requests = case.requests
         if not isinstance(requests, list):
             log_and_print(f"Invalid 'Requests' field format for Case ID {case_id}.", "info", BOLD_RED, is_hebrew=True)
             return
@@ -124,44 +123,43 @@ def parse_requests_by_case_id(case_id: str, db: Database) -> None:
                                 
             else:
                 log_and_print("RequestLeadingStatuses: None or invalid format", "info", BOLD_RED, is_hebrew=True, indent=4)
+
+            if report_writer.enabled:
+                statuses = leading_statuses if isinstance(leading_statuses, list) else []
+                emit_record("requests", case_id=case_id, request_id=request_id, request_type_id=request_type_id,
+                            request_type=request_type_mapping.logical(request_type_id, "Unknown Status"),
+                            main_status_type_id=next((status.get("RequestStatusTypeId") for status in statuses
+                                                      if status.get("EndDate") is None), None),
+                            statuses=[{"status_type_id": status.get("RequestStatusTypeId"),
+                                       "status": request_status_mapping.logical(status.get("RequestStatusTypeId"), "Unknown Status"),
+                                       "start_date": status.get("StartDate"),
+                                       "end_date": status.get("EndDate")} for status in statuses])
         return leading_statuses
     except Exception as e:
         log_and_print(f"Error processing case document for Case ID {case_id}: {e}", "error", BOLD_RED, is_hebrew=True)
 
 
-def get_requests_by_case_id(case_id: str, db: Database) -> dict:
+def get_requests_by_case_id(case: CaseContext) -> dict:
     """
-    Fetch the Requests array for a given Case ID and return a dictionary 
-    mapping RequestId to RequestTypeId.
+    Return a dictionary mapping RequestId to RequestTypeId for the requests of the case.
 
     Args:
-        case_id (str): The Case ID to fetch data for.
-        db (Database): The MongoDB database connection.
+        case (CaseContext): The case to read.
 
     Returns:
         dict: A dictionary where keys are RequestId and values are RequestTypeId.
     """
+    case_id = case.case_id
     try:
-        collection = db["Case"]
-        document = collection.find_one({"_id": case_id}, {"Requests": 1, "_id": 0})
-
-        if not document:
+        if not case.exists:
             log_and_print(f"No document found for Case ID {case_id}.", "info", BOLD_RED, is_hebrew=True)
             return {}
 
-        requests = document.get("Requests", [])
-        if not isinstance(requests, list):
+        if not isinstance(case.requests, list):
             log_and_print(f"Invalid 'Requests' field format for Case ID {case_id}.", "info", BOLD_RED, is_hebrew=True)
             return {}
 
-        
-        request_mapping = {
-            request.get("RequestId"): request.get("RequestTypeId")
-            for request in requests
-            if request.get("RequestId") is not None and request.get("RequestTypeId") is not None
-        }
-
-        return request_mapping
+        return case.request_type_by_id
 
     except Exception as e:
         log_and_print(f"Error fetching requests for Case ID {case_id}: {e}", "error", BOLD_RED)
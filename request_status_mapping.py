@@ -1,173 +1,168 @@
 import json
-from bidi.algorithm import get_display
-import unicodedata
-
-def normalize_hebrew(text):
-    """Normalize and format Hebrew text for proper RTL display."""
-    return get_display(unicodedata.normalize("NFKC", text.strip()))
+from display_mapping import DisplayMapping
 
 # Define the mapping dictionary
-request_status_mapping = {
-    1: normalize_hebrew("ממתין לתשלום"),
-    2: normalize_hebrew("ממתין לקליטת תשלום"),
-    3: normalize_hebrew("ממתין לקליטת מסמכים"),
-    4: normalize_hebrew("ממתין לקליטת מסמכים"),
-    5: normalize_hebrew("בדיקת מזכירות"),
-    6: normalize_hebrew("ניתוב לדיין"),
-    7: normalize_hebrew("ממתין לקביעת דיון"),
-    8: normalize_hebrew("ממתין לדיון"),
-    9: normalize_hebrew("ממתין להחלטה"),
-    10: normalize_hebrew("ממתין להשלמת מסמכים"),
-    11: normalize_hebrew("ממתין לתגובת צד א'"),
-    12: normalize_hebrew("ממתין לתגובת צד ב'"),
-    13: normalize_hebrew("ממתין לתגובת הצדדים"),
-    14: normalize_hebrew("תיק מתנהל"),
-    15: normalize_hebrew("ניתן פסק דין"),
-    16: normalize_hebrew("סגור"),
-    17: normalize_hebrew("מבוטל"),
-    18: normalize_hebrew("קליטה הסתיימה"),
-    19: normalize_hebrew("תקלה בקליטת מסמכים"),
-    20: normalize_hebrew("ממתין לשינוי מועד דיון"),
-    21: normalize_hebrew("ממתין לעיון ראשוני"),
-    22: normalize_hebrew("ממתין לכתב תשובה"),
-    23: normalize_hebrew("ממתין לפסק דין"),
-    24: normalize_hebrew("אוחד"),
-    25: normalize_hebrew("ממתין לתגובת הצדדים - עורר"),
-    26: normalize_hebrew("ממתין לתגובת הצדדים - משיבה"),
-    27: normalize_hebrew("תיק מוקפא / מעוכב"),
-    28: normalize_hebrew("המשך הליכים בתיק"),
-    29: normalize_hebrew("ממתין לביטול דיון"),
-    31: normalize_hebrew("ממתין לקליטת מסמכים"),
-    32: normalize_hebrew("בדיקת מסמכים"),
-    33: normalize_hebrew("נסגרה עקב שינוי סיווג")
-}
+request_status_mapping = DisplayMapping({
+    1: "ממתין לתשלום",
+    2: "ממתין לקליטת תשלום",
+    3: "ממתין לקליטת מסמכים",
+    4: "ממתין לקליטת מסמכים",
+    5: "בדיקת מזכירות",
+    6: "ניתוב לדיין",
+    7: "ממתין לקביעת דיון",
+    8: "ממתין לדיון",
+    9: "ממתין להחלטה",
+    10: "ממתין להשלמת מסמכים",
+    11: "ממתין לתגובת צד א'",
+    12: "ממתין לתגובת צד ב'",
+    13: "ממתין לתגובת הצדדים",
+    14: "תיק מתנהל",
+    15: "ניתן פסק דין",
+    16: "סגור",
+    17: "מבוטל",
+    18: "קליטה הסתיימה",
+    19: "תקלה בקליטת מסמכים",
+    20: "ממתין לשינוי מועד דיון",
+    21: "ממתין לעיון ראשוני",
+    22: "ממתין לכתב תשובה",
+    23: "ממתין לפסק דין",
+    24: "אוחד",
+    25: "ממתין לתגובת הצדדים - עורר",
+    26: "ממתין לתגובת הצדדים - משיבה",
+    27: "תיק מוקפא / מעוכב",
+    28: "המשך הליכים בתיק",
+    29: "ממתין לביטול דיון",
+    31: "ממתין לקליטת מסמכים",
+    32: "בדיקת מסמכים",
+    33: "נסגרה עקב שינוי סיווג"
+})
 
 
 # Define the mapping dictionary
-request_type_mapping = {
-    1: normalize_hebrew("בקשה לפתיחת תיק הוכחת נישואין"),
-    2: normalize_hebrew("בקשה לפתיחת תיק בוררות לגירושין והפרדה"),
-    3: normalize_hebrew("בקשה לפתיחת תיק גירושין בהסכמה"),
-    4: normalize_hebrew("בקשה לפתיחת תיק צו קיום ירושה וצוואה"),
-    5: normalize_hebrew("בקשה לפתיחת תיק הוכחת נישואין"),
-    6: normalize_hebrew("בקשה לפתיחת תיק גירושין בהסכמה"),
-    7: normalize_hebrew("בקשה לפתיחת תיק צו ירושה"),
-    8: normalize_hebrew("בקשה לפתיחת תיק ערר על דוח תעבורה"),
-    9: normalize_hebrew("בקשה לדחיית התביעה"),
-    10: normalize_hebrew("בקשה לסגירת תיק"),
-    11: normalize_hebrew("בקשה למתן החלטה"),
-    12: normalize_hebrew("בקשה לקביעת דיון"),
-    13: normalize_hebrew("בקשה לאיחוד תיקים"),
-    14: normalize_hebrew("בקשה לתיקון החלטה/מסמך"),
-    15: normalize_hebrew("בקשה למינוי בורר"),
-    16: normalize_hebrew("בקשה לצילום תיק"),
-    17: normalize_hebrew("בקשה דחופה"),
-    18: normalize_hebrew("בקשה להתפטרות/החלפת ייצוג"),
-    19: normalize_hebrew("בקשה כללית"),
-    20: normalize_hebrew("בקשה לדחיית דיון"),
-    21: normalize_hebrew("בקשה להקדמת מועד דיון"),
-    22: normalize_hebrew("בקשה למינוי מגשרים"),
-    23: normalize_hebrew("בקשה למתן ארכה"),
-    24: normalize_hebrew("בקשת החזר אגרה/פקדון"),
-    25: normalize_hebrew("בקשה לפתיחת תיק גירושין"),
-    26: normalize_hebrew("בקשה להארכת מועד"),
-    27: normalize_hebrew("בקשה לסעד זמני"),
-    28: normalize_hebrew("בקשה לעיכוב ביצוע החלטה"),
-    29: normalize_hebrew("בקשה לביצוע תחליף המצאה"),
-    30: normalize_hebrew("בקשה להזמנת עדים"),
-    31: normalize_hebrew("בקשה לעיון בתיק"),
-    32: normalize_hebrew("בקשה לקבלת עותק תיק"),
-    33: normalize_hebrew("בקשה לאחר סגירת תיק"),
-    34: normalize_hebrew("פנייה לפתיחת תיק תביעה"),
-    35: normalize_hebrew("בקשה לפתיחת תיק סכסוך משפחתי"),
-    47: normalize_hebrew("בקשה לפתיחת תיק יישוב סכסוך"),
-    48: normalize_hebrew("פנייה לפתיחת תיק תביעה שכנגד"),
-    49: normalize_hebrew("פנייה לפתיחת תיק הודעה לצד ג'"),
-    51: normalize_hebrew("בקשה לשינוי מועד דיון"),
-    52: normalize_hebrew("בקשה לתיקון ליקויים"),
-    54: normalize_hebrew("בקשה להוספה או למחיקה של בעלי דין"),
-    55: normalize_hebrew("הודעה"),
-    56: normalize_hebrew("בקשה למתן תוקף של פסק דין להסכם פשרה"),
-    57: normalize_hebrew("בקשה אחרת על פי תקנות הסדר האזרחי"),
-    58: normalize_hebrew("הגשת כתב הגנה עם פתיחת תיק תביעה שכנגד"),
-    59: normalize_hebrew("הגשת כתב הגנה עם פתיחת תיק הודעה לצד ג'"),
-    60: normalize_hebrew("בקשה לפתיחת תיק אישור חוזה נישואין"),
-    61: normalize_hebrew("בקשה לפתיחת תיק הוכחת גירושין"),
-    62: normalize_hebrew("בקשה לפתיחת תיק מזונות עידה"),
-    63: normalize_hebrew("בקשה לפתיחת תיק מזונות אישה שכר דירה"),
-    64: normalize_hebrew("בקשה לפתיחת תיק אישור גירושין"),
-    65: normalize_hebrew("בקשה לפתיחת תיק מזונות ילדים"),
-    66: normalize_hebrew("בקשה לפתיחת תיק מזונות ילדים שכר דירה"),
-    67: normalize_hebrew("בקשה לפתיחת תיק משמורת ילדים"),
-    68: normalize_hebrew("בקשה לפתיחת תיק משמורת ילדים מסירת קטינים"),
-    69: normalize_hebrew("בקשה לפתיחת תיק משמורת ילדים פסק דין הצהרתי"),
-    70: normalize_hebrew("בקשה לפתיחת תיק משמורת ילדים - בקשה לשינוי מקום המשמורת"),
-    71: normalize_hebrew("בקשה לפתיחת תיק משמורת ילדים - סדרי ראיה ואירוח"),
-    72: normalize_hebrew("בקשה לפתיחת תיק ביטול צו קיום צוואה"),
-    73: normalize_hebrew("בקשה לפתיחת תיק ביטול צו ירושה"),
-    74: normalize_hebrew("בקשה לפתיחת תיק צו ירושה משלים"),
-    75: normalize_hebrew("בקשה לפתיחת תיק צו קיום צוואה"),
-    76: normalize_hebrew("בקשה לפתיחת תיק תיקון צו ירושה"),
-    77: normalize_hebrew("בקשה לפתיחת תיק צוואות וירושות- כל בקשה אחרת"),
-    78: normalize_hebrew("בקשה לפתיחת תיק אפוטרופסות על חולים"),
-    79: normalize_hebrew("בקשה לפתיחת תיק אפוטרופסות על קטינים"),
-    80: normalize_hebrew("בקשה לפתיחת תיק אפוטרופסות על בגירים"),
-    84: normalize_hebrew("בקשה לפתיחת תיק אפוטרופסות - בקשות שונות"),
-    85: normalize_hebrew("בקשה לפתיחת תיק מזונות אישה החזר הוצאות"),
-    86: normalize_hebrew("בקשה לפתיחת תיק מזונות אישה"),
-    87: normalize_hebrew("בקשה לפתיחת תיק מזונות ילדים החזר הוצאות"),
-    88: normalize_hebrew("בקשה לפתיחת תיק הגדלת מזונות ילדים"),
-    89: normalize_hebrew("בקשה לפתיחת תיק ביטול מזונות"),
-    90: normalize_hebrew("בקשה לפתיחת תיק צוואות וירושות - שונות"),
-    91: normalize_hebrew("בקשה לפתיחת תיק המרת דת"),
-    92: normalize_hebrew("בקשה לפתיחת תיק התנגדות / תיקון/ ביטול ירושה או צוואה"),
-    93: normalize_hebrew("בקשה לפתיחת תיק מוהר"),
-    94: normalize_hebrew("בקשה לפתיחת תיק רכוש בית"),
-    95: normalize_hebrew("בקשה לפתיחת תיק היעדר מניעה"),
-    96: normalize_hebrew("בקשה לפתיחת תיק עשיית צוואה בפני חבר בית הדין"),
-    104: normalize_hebrew("בקשה לפתיחת תיק החזקת ילדים ומשמורת קטינים"),
-    106: normalize_hebrew("בקשה לפתיחת תיק ערר חרבות ברזל - הוצאות מזכות"),
-    107: normalize_hebrew("בקשה להארכת מועד להגשת ערר"),
-    108: normalize_hebrew("בקשה לסילוק על הסף"),
-    109: normalize_hebrew("בקשה לצירוף מסמכים"),
-    110: normalize_hebrew("בקשה למחיקת ערר"),
-    111: normalize_hebrew("בקשה לקביעת/ שינוי/ ביטול מועד דיון"),
-    112: normalize_hebrew("בקשה לביטול / תיקון החלטה"),
-    113: normalize_hebrew("בקשה לפסיקת הוצאות"),
-    114: normalize_hebrew("בקשה לעדכון פרטי מייצג / עד"),
-    115: normalize_hebrew("בקשה לדיון בדלתיים סגורות ו/ או איסור פרסום פרטי החלטה"),
-    116: normalize_hebrew("בקשה לאיחוד עררים"),
-    117: normalize_hebrew("בקשה למתן תוקף של החלטה לפשרה"),
-    126: normalize_hebrew("בקשה להחלפת מייצג"),
-    128: normalize_hebrew("בקשה לפתיחת תיק ערר קורונה - מענק הוצאות קבועות"),
-    129: normalize_hebrew("בקשה לפתיחת תיק ערר קורונה - מענק פגיעה ממושכת"),
-    130: normalize_hebrew("בקשה לפתיחת תיק ערר קורונה - מענק אומיקרון")
-}
+request_type_mapping = DisplayMapping({
+    1: "בקשה לפתיחת תיק הוכחת נישואין",
+    2: "בקשה לפתיחת תיק בוררות לגירושין והפרדה",
+    3: "בקשה לפתיחת תיק גירושין בהסכמה",
+    4: "בקשה לפתיחת תיק צו קיום ירושה וצוואה",
+    5: "בקשה לפתיחת תיק הוכחת נישואין",
+    6: "בקשה לפתיחת תיק גירושין בהסכמה",
+    7: "בקשה לפתיחת תיק צו ירושה",
+    8: "בקשה לפתיחת תיק ערר על דוח תעבורה",
+    9: "בקשה לדחיית התביעה",
+    10: "בקשה לסגירת תיק",
+    11: "בקשה למתן החלטה",
+    12: "בקשה לקביעת דיון",
+    13: "בקשה לאיחוד תיקים",
+    14: "בקשה לתיקון החלטה/מסמך",
+    15: "בקשה למינוי בורר",
+    16: "בקשה לצילום תיק",
+    17: "בקשה דחופה",
+    18: "בקשה להתפטרות/החלפת ייצוג",
+    19: "בקשה כללית",
+    20: "בקשה לדחיית דיון",
+    21: "בקשה להקדמת מועד דיון",
+    22: "בקשה למינוי מגשרים",
+    23: "בקשה למתן ארכה",
+    24: "בקשת החזר אגרה/פקדון",
+    25: "בקשה לפתיחת תיק גירושין",
+    26: "בקשה להארכת מועד",
+    27: "בקשה לסעד זמני",
+    28: "בקשה לעיכוב ביצוע החלטה",
+    29: "בקשה לביצוע תחליף המצאה",
+    30: "בקשה להזמנת עדים",
+    31: "בקשה לעיון בתיק",
+    32: "בקשה לקבלת עותק תיק",
+    33: "בקשה לאחר סגירת תיק",
+    34: "פנייה לפתיחת תיק תביעה",
+    35: "בקשה לפתיחת תיק סכסוך משפחתי",
+    47: "בקשה לפתיחת תיק יישוב סכסוך",
+    48: "פנייה לפתיחת תיק תביעה שכנגד",
+    49: "פנייה לפתיחת תיק הודעה לצד ג'",
+    51: "בקשה לשינוי מועד דיון",
+    52: "בקשה לתיקון ליקויים",
+    54: "בקשה להוספה או למחיקה של בעלי דין",
+    55: "הודעה",
+    56: "בקשה למתן תוקף של פסק דין להסכם פשרה",
+    57: "בקשה אחרת על פי תקנות הסדר האזרחי",
+    58: "הגשת כתב הגנה עם פתיחת תיק תביעה שכנגד",
+    59: "הגשת כתב הגנה עם פתיחת תיק הודעה לצד ג'",
+    60: "בקשה לפתיחת תיק אישור חוזה נישואין",
+    61: "בקשה לפתיחת תיק הוכחת גירושין",
+    62: "בקשה לפתיחת תיק מזונות עידה",
+    63: "בקשה לפתיחת תיק מזונות אישה שכר דירה",
+    64: "בקשה לפתיחת תיק אישור גירושין",
+    65: "בקשה לפתיחת תיק מזונות ילדים",
+    66: "בקשה לפתיחת תיק מזונות ילדים שכר דירה",
+    67: "בקשה לפתיחת תיק משמורת ילדים",
+    68: "בקשה לפתיחת תיק משמורת ילדים מסירת קטינים",
+    69: "בקשה לפתיחת תיק משמורת ילדים פסק דין הצהרתי",
+    70: "בקשה לפתיחת תיק משמורת ילדים - בקשה לשינוי מקום המשמורת",
+    71: "בקשה לפתיחת תיק משמורת ילדים - סדרי ראיה ואירוח",
+    72: "בקשה לפתיחת תיק ביטול צו קיום צוואה",
+    73: "בקשה לפתיחת תיק ביטול צו ירושה",
+    74: "בקשה לפתיחת תיק צו ירושה משלים",
+    75: "בקשה לפתיחת תיק צו קיום צוואה",
+    76: "בקשה לפתיחת תיק תיקון צו ירושה",
+    77: "בקשה לפתיחת תיק צוואות וירושות- כל בקשה אחרת",
+    78: "בקשה לפתיחת תיק אפוטרופסות על חולים",
+    79: "בקשה לפתיחת תיק אפוטרופסות על קטינים",
+    80: "בקשה לפתיחת תיק אפוטרופסות על בגירים",
+    84: "בקשה לפתיחת תיק אפוטרופסות - בקשות שונות",
+    85: "בקשה לפתיחת תיק מזונות אישה החזר הוצאות",
+    86: "בקשה לפתיחת תיק מזונות אישה",
+    87: "בקשה לפתיחת תיק מזונות ילדים החזר הוצאות",
+    88: "בקשה לפתיחת תיק הגדלת מזונות ילדים",
+    89: "בקשה לפתיחת תיק ביטול מזונות",
+    90: "בקשה לפתיחת תיק צוואות וירושות - שונות",
+    91: "בקשה לפתיחת תיק המרת דת",
+    92: "בקשה לפתיחת תיק התנגדות / תיקון/ ביטול ירושה או צוואה",
+    93: "בקשה לפתיחת תיק מוהר",
+    94: "בקשה לפתיחת תיק רכוש בית",
+    95: "בקשה לפתיחת תיק היעדר מניעה",
+    96: "בקשה לפתיחת תיק עשיית צוואה בפני חבר בית הדין",
+    104: "בקשה לפתיחת תיק החזקת ילדים ומשמורת קטינים",
+    106: "בקשה לפתיחת תיק ערר חרבות ברזל - הוצאות מזכות",
+    107: "בקשה להארכת מועד להגשת ערר",
+    108: "בקשה לסילוק על הסף",
+    109: "בקשה לצירוף מסמכים",
+    110: "בקשה למחיקת ערר",
+    111: "בקשה לקביעת/ שינוי/ ביטול מועד דיון",
+    112: "בקשה לביטול / תיקון החלטה",
+    113: "בקשה לפסיקת הוצאות",
+    114: "בקשה לעדכון פרטי מייצג / עד",
+    115: "בקשה לדיון בדלתיים סגורות ו/ או איסור פרסום פרטי החלטה",
+    116: "בקשה לאיחוד עררים",
+    117: "בקשה למתן תוקף של החלטה לפשרה",
+    126: "בקשה להחלפת מייצג",
+    128: "בקשה לפתיחת תיק ערר קורונה - מענק הוצאות קבועות",
+    129: "בקשה לפתיחת תיק ערר קורונה - מענק פגיעה ממושכת",
+    130: "בקשה לפתיחת תיק ערר קורונה - מענק אומיקרון"
+})
 
 # Define the mapping dictionary for Action Log Types
-action_log_types_mapping = {
-    1: normalize_hebrew("הוגשה בקשה לפתיחת תיק"),
-    2: normalize_hebrew("בדיקת מזכירות"),
-    3: normalize_hebrew("ניתוב לדיין"),
-    4: normalize_hebrew("הושלמו מסמכי פתיחת תיק מהאתר"),
-    5: normalize_hebrew("בדיקת מזכירות בחריגה בהשלמת מסמכים"),
-    6: normalize_hebrew("בדיקת מזכירות השלמת מסמכים"),
-    7: normalize_hebrew("הוגשה תגובה מהאתר"),
-    8: normalize_hebrew("ניתנה החלטה"),
-    9: normalize_hebrew("הוגש כתב תשובה מהאתר"),
-    10: normalize_hebrew("בוטל דיון"),
-    11: normalize_hebrew("השתנה מועד דיון בתיק"),
-    12: normalize_hebrew("נקבע דיון"),
-    13: normalize_hebrew("הוגשה בקשה"),
-    14: normalize_hebrew("סגירת תיק"),
-    15: normalize_hebrew("שינוי סוג תיק"),
-    16: normalize_hebrew("הקפאת תיק"),
-    17: normalize_hebrew("שינוי סטטוס תיק"),
-    18: normalize_hebrew("נוסף מסמך בתיק"),
-    19: normalize_hebrew("פתיחת תיק אחרי סגירה"),
-    20: normalize_hebrew("חיווי על תקינות מסמך על ידי המזכירה"),
-    21: normalize_hebrew("סגירת טיפול במסמך"),
-    22: normalize_hebrew("שינוי החלטה"),
-    23: normalize_hebrew("אישור נתוני רשות המסים באופו ידני"),
-    24: normalize_hebrew("הפצת פרוטוקול דיון לצדדים")
-}
+action_log_types_mapping = DisplayMapping({
+    1: "הוגשה בקשה לפתיחת תיק",
+    2: "בדיקת מזכירות",
+    3: "ניתוב לדיין",
+    4: "הושלמו מסמכי פתיחת תיק מהאתר",
+    5: "בדיקת מזכירות בחריגה בהשלמת מסמכים",
+    6: "בדיקת מזכירות השלמת מסמכים",
+    7: "הוגשה תגובה מהאתר",
+    8: "ניתנה החלטה",
+    9: "הוגש כתב תשובה מהאתר",
+    10: "בוטל דיון",
+    11: "השתנה מועד דיון בתיק",
+    12: "נקבע דיון",
+    13: "הוגשה בקשה",
+    14: "סגירת תיק",
+    15: "שינוי סוג תיק",
+    16: "הקפאת תיק",
+    17: "שינוי סטטוס תיק",
+    18: "נוסף מסמך בתיק",
+    19: "פתיחת תיק אחרי סגירה",
+    20: "חיווי על תקינות מסמך על ידי המזכירה",
+    21: "סגירת טיפול במסמך",
+    22: "שינוי החלטה",
+    23: "אישור נתוני רשות המסים באופו ידני",
+    24: "הפצת פרוטוקול דיון לצדדים"
+})
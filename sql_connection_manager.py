@@ -0,0 +1,175 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+import pyodbc
+from logging_utils import log_and_print
+from sql_query_catalog import forget_connection
+
+# Maximum number of connections handed out at the same time per database
+SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "4"))
+
+# Idle connections older than this (seconds) are checked with SELECT 1 before being reused
+SQL_POOL_HEALTH_CHECK_SECONDS = int(os.getenv("SQL_POOL_HEALTH_CHECK_SECONDS", "60"))
+
+# Errors after which a connection is not returned to the pool
+_BROKEN_CONNECTION_ERRORS = (pyodbc.OperationalError, pyodbc.InterfaceError)
+
+
+def build_connection_string(server_name, database_name, user_name, password):
+    """Build the ODBC connection string used for every SQL Server connection of the tool."""
+    return (
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={server_name};"
+        f"DATABASE={database_name};"
+        f"UID={user_name};"
+        f"PWD={password};"
+        f"Trusted_Connection=yes;"
+    )
+
+
+# Opens every connection of the tool; replaced by set_connection_factory (benchmarks, replay)
+_connection_factory = pyodbc.connect
+
+
+def set_connection_factory(factory=None):
+    """
+    Replace how connections are opened: factory(connection_string) returns a connection with
+    pyodbc's interface (cursor().execute(sql, *params), fetchall, rollback, close).
+    None restores pyodbc.connect. The pooled connections of the previous factory are closed.
+    """
+    global _connection_factory
+    close_all_sql_connections()
+    _connection_factory = factory or pyodbc.connect
+
+
+def open_connection(connection_string):
+    """Open a new, unpooled connection (pyodbc unless set_connection_factory replaced it)."""
+    return _connection_factory(connection_string)
+
+
+class SqlConnectionPool:
+    """
+    A small pool of pyodbc connections to one database. Connections are opened lazily,
+    reused across menu actions, health-checked when they were idle for a while and
+    closed by close().
+    """
+
+    def __init__(self, connection_string, max_size=SQL_POOL_SIZE):
+        self.connection_string = connection_string
+        self.max_size = max_size
+        self._idle = []  # [(connection, returned_at)]
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _is_healthy(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _discard(self, connection):
+        forget_connection(connection)
+        try:
+            connection.close()
+        except pyodbc.Error:
+            pass
+
+    def acquire(self):
+        """Return an open connection, blocking while max_size connections are in use."""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned_at = self._idle.pop()
+                if time.monotonic() - returned_at < SQL_POOL_HEALTH_CHECK_SECONDS or self._is_healthy(connection):
+                    return connection
+                self._discard(connection)
+            return open_connection(self.connection_string)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, connection, broken=False):
+        """Give a connection back to the pool, or close it if it is broken."""
+        try:
+            if broken:
+                self._discard(connection)
+                return
+            try:
+                connection.rollback()  # end any implicit transaction left by the reads
+            except pyodbc.Error:
+                self._discard(connection)
+                return
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_sql_pool(server_name=None, database_name=None, user_name=None, password=None):
+    """Return the pool for these connection parameters (defaults: DB_SERVER / DB_NAME / DB_USER / DB_PASS)."""
+    connection_string = build_connection_string(
+        server_name or os.getenv("DB_SERVER"),
+        database_name or os.getenv("DB_NAME"),
+        user_name or os.getenv("DB_USER"),
+        password or os.getenv("DB_PASS"),
+    )
+    with _pools_lock:
+        pool = _pools.get(connection_string)
+        if pool is None:
+            pool = _pools[connection_string] = SqlConnectionPool(connection_string)
+        return pool
+
+
+@contextmanager
+def sql_connection(server_name=None, database_name=None, user_name=None, password=None):
+    """
+    Borrow a pooled SQL Server connection for the duration of the `with` block.
+
+    Example:
+        with sql_connection(server_name, database_name, user_name, password) as connection:
+            cursor = connection.cursor()
+    """
+    pool = get_sql_pool(server_name, database_name, user_name, password)
+    connection = pool.acquire()
+    broken = False
+    try:
+        yield connection
+    except _BROKEN_CONNECTION_ERRORS:
+        broken = True
+        raise
+    finally:
+        pool.release(connection, broken)
+
+
+def close_all_sql_connections():
+    """Close every pooled connection; registered to run at exit."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+    if pools:
+        log_and_print("SQL Server connections closed.")
+
+
+atexit.register(close_all_sql_connections)
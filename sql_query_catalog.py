@@ -0,0 +1,459 @@
+import atexit
+import os
+import threading
+import time
+from logging_utils import log_and_print, BOLD_YELLOW
+from backend_metrics import record_sql_call
+from query_plan_capture import QUERY_PLAN_CAPTURE, capture_sql_plan
+
+# SQL Server accepts at most 2100 parameters per statement, keep IN-lists well below that
+SQL_IN_LIST_CHUNK_SIZE = int(os.getenv("BPM_IN_LIST_CHUNK_SIZE", "500"))
+
+# Print the per-query statistics table when the tool exits
+SQL_QUERY_STATS = os.getenv("SQL_QUERY_STATS", "0") == "1"
+
+
+class CatalogQuery:
+    """
+    One named query of the catalog.
+
+    Attributes:
+        name (str): Catalog name, "<database>.<what it returns>".
+        database (str): The database the query reads (BPM, Responses, Discussions, CaseManagement_BO, Menora).
+        sql (str): The statement. IN-list queries contain an `{in_list}` marker.
+        params (tuple): Names of the positional parameters (for IN-list queries: the parameters after the list).
+    """
+
+    def __init__(self, name, database, sql, params=()):
+        self.name = name
+        self.database = database
+        self.sql = sql
+        self.params = tuple(params)
+        self.has_in_list = "{in_list}" in sql
+        # Number of parameters written before the IN-list (TOP (?) and keyset filters of paged queries)
+        self.params_before_in_list = sql.split("{in_list}")[0].count("?")
+
+    def check_params(self, params):
+        if len(params) != len(self.params):
+            raise ValueError(f"Query {self.name} expects parameters {self.params}, got {len(params)} values.")
+
+
+QUERY_CATALOG = {}
+
+
+def register_query(name, database, sql, params=()):
+    """Add a query to the catalog and return it."""
+    query = CatalogQuery(name, database, sql, params)
+    QUERY_CATALOG[name] = query
+    return query
+
+
+############################# BPM #########################
+
+# Type names (ProcessTypes, ActivityTypes, StatusTypes) are resolved from lookup_snapshot, not joined
+register_query("bpm.processes", "BPM", """
+SELECT p.[ProcessID],
+       p.[ProcessTypeID]
+FROM [BPM].[dbo].[Processes] AS p
+WHERE p.[ProcessID] IN ({in_list});
+""")
+
+register_query("bpm.processes_by_node", "BPM", """
+SELECT p.[ProcessID],
+       p.[ProcessTypeID]
+FROM [BPM].[dbo].[Processes] AS p
+WHERE p.[ProcessID] IN ({in_list}) and p.[LdapLeafID] = ?;
+""", params=("node_id",))
+
+register_query("bpm.process_steps", "BPM", """
+SELECT ps.[ProcessStepID],
+       ps.[ProcessID],
+       pta.[ProcessTypeID],
+       pta.[ActivityTypeID],
+       ps.[ProcessTypeGatewayID],
+       ps.[DateForBPETreatment]
+FROM [BPM].[dbo].[ProcessSteps] AS ps
+JOIN [BPM].[dbo].[ProcessTypeActivities] AS pta
+    ON ps.[ProcessTypeActivityID] = pta.[ProcessTypeActivityID]
+WHERE ps.[ProcessID] IN ({in_list})
+ORDER BY ps.[ProcessID], ps.[ProcessStepID];
+""")
+
+# Full ordered status history of every step
+register_query("bpm.step_status_history", "BPM", """
+SELECT p.[ProcessStepStatusID],
+       p.[ProcessStepID],
+       p.[StatusTypeID]
+FROM [BPM].[dbo].[ProcessStepStatuses] AS p
+WHERE p.[ProcessStepID] IN ({in_list})
+ORDER BY p.[ProcessStepID], p.[ProcessStepStatusID];
+""")
+
+# Latest status of every step, computed server-side so history rows never cross the wire
+register_query("bpm.step_status_latest", "BPM", """
+SELECT latest.[ProcessStepStatusID],
+       latest.[ProcessStepID],
+       latest.[StatusTypeID]
+FROM (
+    SELECT p.[ProcessStepStatusID],
+           p.[ProcessStepID],
+           p.[StatusTypeID],
+           ROW_NUMBER() OVER (PARTITION BY p.[ProcessStepID] ORDER BY p.[ProcessStepStatusID] DESC) AS rn
+    FROM [BPM].[dbo].[ProcessStepStatuses] AS p
+    WHERE p.[ProcessStepID] IN ({in_list})
+) AS latest
+WHERE latest.rn = 1;
+""")
+
+# Watch mode: new steps of still-open processes, above the last ProcessStepID seen
+register_query("bpm.new_process_steps", "BPM", """
+SELECT ps.[ProcessStepID],
+       ps.[ProcessID],
+       pta.[ProcessTypeID],
+       pta.[ActivityTypeID],
+       ps.[ProcessTypeGatewayID],
+       ps.[DateForBPETreatment]
+FROM [BPM].[dbo].[ProcessSteps] AS ps
+JOIN [BPM].[dbo].[ProcessTypeActivities] AS pta
+    ON ps.[ProcessTypeActivityID] = pta.[ProcessTypeActivityID]
+WHERE ps.[ProcessID] IN ({in_list}) AND ps.[ProcessStepID] > ?
+ORDER BY ps.[ProcessID], ps.[ProcessStepID];
+""", params=("step_high_water",))
+
+# Watch mode: status rows of open steps above the ProcessStepStatusID high-water mark
+register_query("bpm.new_step_statuses", "BPM", """
+SELECT p.[ProcessStepStatusID],
+       p.[ProcessStepID],
+       p.[StatusTypeID]
+FROM [BPM].[dbo].[ProcessStepStatuses] AS p
+WHERE p.[ProcessStepID] IN ({in_list}) AND p.[ProcessStepStatusID] > ?
+ORDER BY p.[ProcessStepStatusID];
+""", params=("status_high_water",))
+
+# Stuck step scanner: one keyset page of open steps of our LdapLeafID whose latest status is waiting / suspended
+register_query("bpm.stuck_steps_page", "BPM", """
+SELECT TOP (?) ps.[ProcessStepID],
+       ps.[ProcessID],
+       pta.[ProcessTypeID],
+       pta.[ActivityTypeID],
+       ps.[DateForBPETreatment],
+       latest.[StatusTypeID]
+FROM [BPM].[dbo].[ProcessSteps] AS ps
+JOIN [BPM].[dbo].[Processes] AS p
+    ON p.[ProcessID] = ps.[ProcessID]
+JOIN [BPM].[dbo].[ProcessTypeActivities] AS pta
+    ON ps.[ProcessTypeActivityID] = pta.[ProcessTypeActivityID]
+CROSS APPLY (
+    SELECT TOP (1) pss.[StatusTypeID]
+    FROM [BPM].[dbo].[ProcessStepStatuses] AS pss
+    WHERE pss.[ProcessStepID] = ps.[ProcessStepID]
+    ORDER BY pss.[ProcessStepStatusID] DESC
+) AS latest
+WHERE ps.[ProcessStepID] > ?
+  AND p.[LdapLeafID] = ?
+  AND ps.[DateForBPETreatment] < ?
+  AND latest.[StatusTypeID] IN ({in_list})
+ORDER BY ps.[ProcessStepID];
+""", params=("page_size", "last_step_id", "node_id", "cutoff"))
+
+############################# Responses #########################
+
+register_query("responses.assignment_exists_by_process", "Responses", """
+SELECT 1
+FROM [Responses].[dbo].[Assignments]
+WHERE Process_Id = ? AND Assignment_Status_Id = ?
+""", params=("process_id", "assignment_status_id"))
+
+register_query("responses.assignments_by_case", "Responses", """
+SELECT TOP (1000) asg.[Assignment_Id]
+    ,asg.[Case_Id]
+    ,asg.[Request_Id]
+    ,asg.[Decision_Id]
+    ,asg.[Decision_Moj_Id]
+    ,asg.[Assignment_Type_Id]
+    ,asg.[Due_Date]
+    ,asg.[Assignment_Status_Id]
+    ,asg.[Is_Active]
+    ,asg.[Site_Action_Id]
+FROM [Responses].[dbo].[Assignments] as asg
+where asg.[Case_Id]= ?;
+""", params=("case_id",))
+
+register_query("responses.active_assignments_by_decision", "Responses", """
+SELECT TOP (1000) [Assignment_Id]
+    ,[Case_Id]
+    ,[Request_Id]
+    ,[Decision_Id]
+    ,[Assignment_Type_Id]
+    ,[Assignment_Status_Id]
+    ,[Process_Step_Id]
+    ,[Process_Id]
+    ,[Is_Active]
+FROM [Responses].[dbo].[Assignments]
+WHERE Decision_Id = ? AND Assignment_Type_Id = ? AND Assignment_Status_Id='1'
+""", params=("decision_id", "assignment_type_id"))
+
+############################# Discussions #########################
+
+register_query("discussions.by_case", "Discussions", """
+SELECT
+    d.[Discussion_Id], d.[Start_Time],
+    d.[Discussion_Type_Id],
+    d.[Discussion_Status_Id]
+FROM
+    [Discussions].[dbo].[Discussions] d
+LEFT JOIN
+    [Discussions].[dbo].[Request_To_Discussions] r ON r.Discussion_Id = d.Discussion_Id
+WHERE
+    r.Case_Id = ?
+""", params=("case_id",))
+
+############################# CaseManagement_BO #########################
+
+register_query("bo.actions_by_case", "CaseManagement_BO", """
+SELECT TOP (1000)
+    bo_a.[BO_Actions_Id],
+    bo_a.[Bo_Action_Type_Id],
+    bo_a.[Action_Description],
+    bo_a.[Case_ID],
+    bo_a.[Request_Id],
+    bo_a.[Action_Create_User],
+    bo_a.[Involved_Category_Type_Id],
+    bo_a.[Action_Time],
+    bo_a.[Entity_Type_Id],
+    bo_a.[Entity_value],
+    bo_a.[Source_Description],
+    bo_a.[Source_Entity_Type_Id],
+    bo_a.[Source_Entity_Value],
+    bo_a.[Source_Create_Date]
+FROM [CaseManagement_BO].[dbo].[BO_Actions] AS bo_a
+where bo_a.[Case_ID] = ?;
+""", params=("case_id",))
+
+# Whole code table, loaded once by code_table_cache
+register_query("bo.document_types", "CaseManagement_BO", """
+SELECT [Document_Type_Id]
+      ,[Description_Heb]
+FROM [CaseManagement_BO].[dbo].[CT_Document_Types];
+""")
+
+# Decision types of one court, loaded once by code_table_cache. The key comes first; the
+# l.* / dc.* columns keep the layout of the old single-row lookup one position to the right.
+register_query("bo.decision_types_by_court", "CaseManagement_BO", """
+select l.Decision_Type_To_Court_ID, l.*, dc.* from CaseManagement_BO.dbo.lt_decision_type_to_court l
+join CaseManagement_BO..CT_Decision_Types dc on dc.Decision_Type_Id = l.Decision_Type_Id
+where  l.Court_Id = ?;
+""", params=("court_id",))
+
+############################# Menora #########################
+
+register_query("menora.request_status_by_case", "Menora", """
+SELECT r.Description_Heb
+  FROM Menora_Conversion.dbo.Appeal a
+  JOIN External_Courts.cnvrt.Case_Status_To_Case_Status_BO cn ON a.Appeal_Status = cn.Case_Status_BO
+  JOIN cases_bo.dbo.CT_Case_Status_Types c ON c.Case_Status_Type_Id = cn.Case_Status_Type_Id
+  JOIN cases_bo.dbo.CT_Request_Status_Types r ON r.Request_Status_Type_Id = c.Request_Status_Type_Id
+  WHERE cn.Court_Id = 11 AND a.Case_Id = ?
+""", params=("case_id",))
+
+
+############################# lookup tables #########################
+
+# Every table kept in lookup_snapshot: snapshot name -> (database, table)
+LOOKUP_SOURCE_TABLES = {
+    "CT_Assignment_Types": ("Responses", "[Responses].[dbo].[CT_Assignment_Types]"),
+    "CT_Assignment_Status_Types": ("Responses", "[Responses].[dbo].[CT_Assignment_Status_Types]"),
+    "CT_Discussion_Types": ("Discussions", "[Discussions].[code].[CT_Discussion_Types]"),
+    "CT_Discussion_Statuses": ("Discussions", "[Discussions].[code].[CT_Discussion_Statuses]"),
+    "CT_BO_Action_Types": ("CaseManagement_BO", "[CaseManagement_BO].[dbo].[CT_BO_Action_Types]"),
+    "StatusTypes": ("BPM", "[BPM].[dbo].[StatusTypes]"),
+    "ActivityTypes": ("BPM", "[BPM].[dbo].[ActivityTypes]"),
+    "ProcessTypes": ("BPM", "[BPM].[dbo].[ProcessTypes]"),
+    "Entity": ("CaseManagement_BO", "[CaseManagement_BO].[doc].[Entity]"),
+}
+
+_LOOKUP_CHECKSUM_SELECTS = {
+    table_name: f"SELECT '{table_name}', CHECKSUM_AGG(BINARY_CHECKSUM(*)), COUNT_BIG(*) FROM {table}"
+    for table_name, (_, table) in LOOKUP_SOURCE_TABLES.items()
+}
+
+# One round trip: checksum and row count of every table kept in lookup_snapshot
+register_query("lookup.checksums", "BPM", "\n" + "\nUNION ALL ".join(_LOOKUP_CHECKSUM_SELECTS.values()) + ";\n")
+
+# The same, one table at a time ("lookup.checksum.<table>"), for when one database of the union cannot be read
+for _table_name, _select in _LOOKUP_CHECKSUM_SELECTS.items():
+    register_query(f"lookup.checksum.{_table_name}", LOOKUP_SOURCE_TABLES[_table_name][0], "\n" + _select + ";\n")
+
+register_query("lookup.assignment_types", "Responses", """
+SELECT [Assignment_Type_Id], [Description_Heb] FROM [Responses].[dbo].[CT_Assignment_Types];
+""")
+
+register_query("lookup.assignment_status_types", "Responses", """
+SELECT [Assignment_Status_Type_Id], [Description_Heb] FROM [Responses].[dbo].[CT_Assignment_Status_Types];
+""")
+
+register_query("lookup.discussion_types", "Discussions", """
+SELECT [Discussion_Type_Id], [Description_Heb] FROM [Discussions].[code].[CT_Discussion_Types];
+""")
+
+register_query("lookup.discussion_statuses", "Discussions", """
+SELECT [Discussion_Status_Id], [Description_Heb] FROM [Discussions].[code].[CT_Discussion_Statuses];
+""")
+
+register_query("lookup.bo_action_types", "CaseManagement_BO", """
+SELECT [BO_Action_Type_Id], [Description_Heb] FROM [CaseManagement_BO].[dbo].[CT_BO_Action_Types];
+""")
+
+register_query("lookup.status_types", "BPM", """
+SELECT [StatusTypeID], [Description_Heb] FROM [BPM].[dbo].[StatusTypes];
+""")
+
+register_query("lookup.activity_types", "BPM", """
+SELECT [ActivityTypeID], [ActivityTypeName] FROM [BPM].[dbo].[ActivityTypes];
+""")
+
+register_query("lookup.process_types", "BPM", """
+SELECT [ProcessTypeID], [ProcessTypeName] FROM [BPM].[dbo].[ProcessTypes];
+""")
+
+register_query("lookup.entities", "CaseManagement_BO", """
+SELECT [EntityID], [EntityName] FROM [CaseManagement_BO].[doc].[Entity];
+""")
+
+
+############################# prepared handles #########################
+
+# One cursor per (connection, statement text): pyodbc keeps the last statement of a cursor
+# prepared, so re-executing the same text on the same cursor skips the prepare round trip.
+_prepared_cursors = {}
+_prepared_lock = threading.Lock()
+
+
+def _prepared_cursor(connection, sql):
+    key = (id(connection), sql)
+    with _prepared_lock:
+        cursor = _prepared_cursors.get(key)
+        if cursor is None:
+            cursor = _prepared_cursors[key] = connection.cursor()
+        return cursor
+
+
+def forget_connection(connection):
+    """Drop the prepared cursors of a connection; called by the pool before it closes one."""
+    with _prepared_lock:
+        for key in [key for key in _prepared_cursors if key[0] == id(connection)]:
+            _prepared_cursors.pop(key)
+
+
+############################# statistics #########################
+
+class QueryStats:
+    """Per-query call count, rows returned and cumulative latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}  # name -> [calls, rows, seconds]
+
+    def record(self, name, rows, seconds):
+        with self._lock:
+            entry = self._stats.setdefault(name, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += rows
+            entry[2] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {name: tuple(entry) for name, entry in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def dump_query_stats():
+    """Print (and log) calls, rows and cumulative latency per catalog query, slowest first."""
+    stats = query_stats.snapshot()
+    if not stats:
+        return
+    log_and_print("\n##### SQL query statistics #####", "info", BOLD_YELLOW)
+    log_and_print(f"{'query':<45}{'calls':>8}{'rows':>10}{'total ms':>12}{'avg ms':>10}")
+    for name, (calls, rows, seconds) in sorted(stats.items(), key=lambda item: item[1][2], reverse=True):
+        log_and_print(f"{name:<45}{calls:>8}{rows:>10}{seconds * 1000:>12.1f}{seconds * 1000 / calls:>10.1f}")
+
+
+if SQL_QUERY_STATS:
+    atexit.register(dump_query_stats)
+
+
+############################# execution #########################
+
+def _connection_of(target):
+    """Accept a pyodbc connection or a cursor (whose .connection is used)."""
+    return getattr(target, "connection", target)
+
+
+def _execute(connection, name, sql, params):
+    cursor = _prepared_cursor(connection, sql)
+    start = time.perf_counter()
+    cursor.execute(sql, *params)
+    rows = cursor.fetchall()
+    seconds = time.perf_counter() - start
+    query_stats.record(name, len(rows), seconds)
+    record_sql_call(rows, seconds)
+    if QUERY_PLAN_CAPTURE:
+        capture_sql_plan(connection, name, sql, params)
+    return rows
+
+
+def execute_query(connection, name, *params):
+    """
+    Execute a catalog query and return all its rows.
+
+    Args:
+        connection: A pyodbc connection (or cursor) to run the query on.
+        name (str): Catalog name of the query.
+        *params: Values for the query's parameter signature, in order.
+    """
+    query = QUERY_CATALOG[name]
+    if query.has_in_list:
+        raise ValueError(f"Query {name} takes an IN-list, use execute_in_query.")
+    query.check_params(params)
+    return _execute(_connection_of(connection), name, query.sql, params)
+
+
+def _in_list_size(count):
+    """Round an IN-list length up to a power of two so only a few statement texts are ever prepared."""
+    size = 1
+    while size < count:
+        size *= 2
+    return min(size, max(count, SQL_IN_LIST_CHUNK_SIZE))
+
+
+def execute_in_query(connection, name, values, *params):
+    """
+    Execute a catalog query with an IN-list once per chunk of `values` and return all rows.
+    Chunks are padded (with their last value) to a power-of-two size, so the same few
+    prepared statements are reused. Round trips = ceil(len(values) / SQL_IN_LIST_CHUNK_SIZE).
+
+    Args:
+        connection: A pyodbc connection (or cursor) to run the query on.
+        name (str): Catalog name of the query.
+        values (iterable): Values of the IN-list.
+        *params: Values for the query's other parameters, in signature order.
+    """
+    query = QUERY_CATALOG[name]
+    query.check_params(params)
+    connection = _connection_of(connection)
+    values = list(values)
+
+    rows = []
+    split = query.params_before_in_list
+    for start in range(0, len(values), SQL_IN_LIST_CHUNK_SIZE):
+        chunk = values[start:start + SQL_IN_LIST_CHUNK_SIZE]
+        chunk = chunk + [chunk[-1]] * (_in_list_size(len(chunk)) - len(chunk))
+        sql = query.sql.format(in_list=", ".join("?" for _ in chunk))
+        rows.extend(_execute(connection, name, sql, (*params[:split], *chunk, *params[split:])))
+    return rows
@@ -0,0 +1,123 @@
+import os
+import sys
+from sql_connection_manager import get_sql_pool
+from sql_query_catalog import execute_in_query
+from lookup_snapshot import lookup
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from config import load_configuration
+from logging_utils import log_and_print, normalize_hebrew
+from logging_utils import BOLD_YELLOW, BOLD_GREEN, BOLD_RED
+from bpm_utils import bpm_process_status_type, activity_type_mapping
+from report_output import emit_record
+from backend_recorder import install_backend_recorder
+
+# Step statuses that mean the step is stuck waiting: 6 = בהמתנה (עבור מטלה), 12 = השהייה
+STUCK_STATUS_TYPES = (6, 12)
+
+# Report steps whose DateForBPETreatment is older than this many hours
+STUCK_STEP_THRESHOLD_HOURS = int(os.getenv("STUCK_STEP_THRESHOLD_HOURS", "72"))
+
+# Rows per keyset page; memory use is bounded by this, not by the size of the court
+STUCK_STEP_PAGE_SIZE = int(os.getenv("STUCK_STEP_PAGE_SIZE", "5000"))
+
+# How many example ProcessIDs to keep per group
+STUCK_STEP_SAMPLES = 5
+
+
+def iter_stuck_steps(connection, node_id, cutoff, page_size=STUCK_STEP_PAGE_SIZE):
+    """
+    Stream the stuck steps of `node_id` page by page, keyed on ProcessStepID, so only one
+    page of rows is held in memory at a time.
+
+    Yields:
+        pyodbc.Row: (ProcessStepID, ProcessID, ProcessTypeID, ActivityTypeID, DateForBPETreatment, StatusTypeID)
+    """
+    last_step_id = 0
+    while True:
+        rows = execute_in_query(connection, "bpm.stuck_steps_page", STUCK_STATUS_TYPES, page_size, last_step_id, node_id, cutoff)
+        if not rows:
+            return
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_step_id = rows[-1][0]
+
+
+def scan_stuck_steps(server_name, database_name, user_name, password, threshold_hours=STUCK_STEP_THRESHOLD_HOURS, node_id=None):
+    """
+    Scan every open step of the court (our NODEID) and group the steps that have been waiting
+    (status 6) or suspended (status 12) for longer than `threshold_hours` by process type
+    and activity.
+
+    Returns:
+        dict: {(ProcessTypeID, ActivityTypeID, StatusTypeID): {"count", "oldest", "samples"}}
+    """
+    node_id = node_id or os.getenv("NODEID")
+    cutoff = datetime.now() - timedelta(hours=threshold_hours)
+    groups = {}
+
+    try:
+        # Borrow a pooled connection to SQL Server
+        sql_pool = get_sql_pool(server_name, database_name, user_name, password)
+        connection = sql_pool.acquire()
+
+        scanned = 0
+        for row in iter_stuck_steps(connection, node_id, cutoff):
+            scanned += 1
+            key = (row[2], row[3], row[5])
+            group = groups.setdefault(key, {"count": 0, "oldest": None, "samples": []})
+            group["count"] += 1
+            if row[4] is not None and (group["oldest"] is None or row[4] < group["oldest"]):
+                group["oldest"] = row[4]
+            if len(group["samples"]) < STUCK_STEP_SAMPLES:
+                group["samples"].append(row[1])
+
+        log_and_print(f"Scanned {scanned} stuck steps older than {threshold_hours}h (before {cutoff:%Y-%m-%d %H:%M}).", "info", BOLD_GREEN)
+
+    except Exception as e:
+        log_and_print(f"Error querying SQL Server: {e}", "error", BOLD_RED)
+
+    finally:
+        # Return the connection to the pool
+        if 'connection' in locals():
+            sql_pool.release(connection)
+
+    return groups
+
+
+def print_stuck_steps_report(groups):
+    """Print the stuck step groups, largest group first."""
+    if not groups:
+        log_and_print("לא נמצאו שלבים תקועים", "info", BOLD_GREEN, is_hebrew=True)
+        return
+
+    for (process_type_id, activity_type_id, status_type_id), group in sorted(groups.items(), key=lambda item: item[1]["count"], reverse=True):
+        process_type_name = lookup("ProcessTypes", process_type_id)
+        heb_activity_type = normalize_hebrew(activity_type_mapping.get(activity_type_id, "Unknown Status"))
+        heb_status = normalize_hebrew(bpm_process_status_type.get(status_type_id, "Unknown Status"))
+        oldest = group["oldest"].strftime("%Y-%m-%d %H:%M") if group["oldest"] else "לא ידוע"
+        log_and_print(f"{process_type_id if process_type_name is None else process_type_name}---{heb_activity_type}[{heb_status}]: {group['count']} שלבים, הוותיק מ-{oldest}", "info", BOLD_YELLOW, is_hebrew=True)
+        for process_id in group["samples"]:
+            log_and_print(f"{process_id}", "info", indent=4)
+        emit_record("stuck_steps", process_type_id=process_type_id, process_type_name=process_type_name, activity_type_id=activity_type_id,
+                    activity_type=activity_type_mapping.logical(activity_type_id, "Unknown Status"),
+                    status_type_id=status_type_id, status=bpm_process_status_type.logical(status_type_id, "Unknown Status"),
+                    count=group["count"], oldest=group["oldest"], sample_process_ids=group["samples"])
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    load_configuration()
+    install_backend_recorder()
+
+    threshold_hours = int(sys.argv[1]) if len(sys.argv) > 1 else STUCK_STEP_THRESHOLD_HOURS
+
+    groups = scan_stuck_steps(
+        os.getenv("DB_SERVER"),
+        os.getenv("DB_NAME"),
+        os.getenv("DB_USER"),
+        os.getenv("DB_PASS"),
+        threshold_hours=threshold_hours
+    )
+    print_stuck_steps_report(groups)
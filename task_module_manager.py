@@ -8,6 +8,9 @@ import json  # Import json module
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from rtl_task_mappings import decision_type_mapping
+from report_output import emit_record
+from http_client import http_session
+from case_context import CaseContext
 
 
 # Disable InsecureRequestWarning
@@ -61,7 +64,7 @@ def fetch_tasks_by_case(case_id):
     }
 
     try:
-        response = requests.get(url, headers=headers, params=params, verify=False)
+        response = http_session.get(url, headers=headers, params=params, verify=False)
         response.raise_for_status()
 
         if response.headers.get("Content-Type", "").startswith("application/json"):
@@ -81,6 +84,9 @@ def fetch_tasks_by_case(case_id):
                     task_assigned_to = task_details.get("assignUserNameForDisplay", "Not Assigned") 
 
                     log_and_print(f"משימה- {task_title}",is_hebrew=True)
+                    emit_record("tasks", case_id=case_id, task_type_id=task_details.get("taskTypeId"),
+                                task_type=task_details.get("taskTypeDescription"), status=task_details.get("status"),
+                                due_date=task_details.get("dueDate"), assigned_to=task_details.get("assignUserNameForDisplay"))
 
             
             #return tasks
@@ -95,31 +101,23 @@ def fetch_tasks_by_case(case_id):
 
 
 
-def fetch_decisions_by_case_id(case_id: str, db) -> List[Dict[str, Any]]:
+def fetch_decisions_by_case_id(case: CaseContext) -> List[Dict[str, Any]]:
     """
-    Fetch Decisions from MongoDB for a given Case ID (_id).
+    Collect the decision types of the Decisions of the case.
     Identify documents fulfilling all these conditions:
     - {'EntityTypeId': 5, 'EntityValue': Decisions[].DecisionId}
     - {'EntityTypeId': 1, 'EntityValue': case_id}
     - {'EntityTypeId': 2, 'EntityValue': DecisionRequests[].RequestId}
     """
     decisions_list = []
+    case_id = case.case_id
 
     try:
-        case_collection = db["Case"]
-        document_collection = db["Document"]
-
-        # Fetch the case document with decisions and requests
-        case_document = case_collection.find_one(
-            {"_id": case_id},
-            {"Decisions": 1, "Requests": 1, "_id": 1}
-        )
-
-        if not case_document:
+        if not case.exists:
             log_and_print(f"No document found for Case ID {case_id}.", "warning")
             return []
 
-        decisions = case_document.get("Decisions", [])
+        decisions = case.decisions
 
         # Sort decisions by PublishDate descending
         decisions = sorted(
@@ -171,7 +169,8 @@ def fetch_decisions_by_case_id(case_id: str, db) -> List[Dict[str, Any]]:
         log_and_print(f"Error processing case document for Case ID {case_id}: {e}", "error", ansi_format=BOLD_RED)
         return []
 
-import pyodbc
+from sql_connection_manager import get_sql_pool
+from sql_query_catalog import execute_query
 
 def check_assignments_for_decisions(decisions_list: List[Dict[str, Any]], server_name, database_name, user_name, password) -> None:
     """
@@ -182,33 +181,11 @@ def check_assignments_for_decisions(decisions_list: List[Dict[str, Any]], server
     """
 
     try:
-        # Establish the SQL Server connection
-        connection = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server_name};"
-            f"DATABASE={database_name};"
-            f"UID={user_name};"
-            f"PWD={password};"
-            f"Trusted_Connection=yes;"
-        )
-        cursor = connection.cursor()
+        # Borrow a pooled connection to SQL Server
+        sql_pool = get_sql_pool(server_name, database_name, user_name, password)
+        connection = sql_pool.acquire()
         #log_and_print("Connection to SQL Server established successfully.\n", "info")
 
-        # SQL query to check for assignments
-        sql_query = """
-        SELECT TOP (1000) [Assignment_Id]
-            ,[Case_Id]
-            ,[Request_Id]
-            ,[Decision_Id]
-            ,[Assignment_Type_Id]
-            ,[Assignment_Status_Id]
-            ,[Process_Step_Id]
-            ,[Process_Id]
-            ,[Is_Active]
-        FROM [Responses].[dbo].[Assignments]
-        WHERE Decision_Id = ? AND Assignment_Type_Id = ? AND Assignment_Status_Id='1'
-        """
-
         try:
             # Iterate over the decisions list to check for each sub_value
             for sub_value in [29, 30, 31, 58]:  # Check sub_value 29, 30, 31, and 58
@@ -239,8 +216,7 @@ def check_assignments_for_decisions(decisions_list: List[Dict[str, Any]], server
 
                     # Run the query for each assignment_id
                     for assignment_id in assignment_ids:
-                        cursor.execute(sql_query, decision_id, assignment_id)
-                        assignment = cursor.fetchall()
+                        assignment = execute_query(connection, "responses.active_assignments_by_decision", decision_id, assignment_id)
 
                         if assignment:
                             # If the assignment exists, log it as active
@@ -256,5 +232,5 @@ def check_assignments_for_decisions(decisions_list: List[Dict[str, Any]], server
     
     finally:
         if 'connection' in locals():
-            connection.close()
+            sql_pool.release(connection)
             #log_and_print("\nSQL Server connection closed.", "info")